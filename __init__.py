@@ -1,3 +1,32 @@
+from .async_client import AsyncClient
+from .bulk import BulkRunner, Job, RateLimiter
+from .cache import MemoryBackend, ResponseCache, SQLiteBackend
 from .client import Client
+from .flow import ApiError
+from .hooks import MetricsCollector
+from .loadgen import LoadGenerator
+from .resilience import CircuitBreaker, HedgePolicy, RetryPolicy
+from .session_store import FileSessionStore, MemorySessionStore
+from .timetable import Timetable
+from .transport import SharedTransport
 
-__all__ = ["Client"]
+__all__ = [
+    "ApiError",
+    "AsyncClient",
+    "BulkRunner",
+    "CircuitBreaker",
+    "Client",
+    "FileSessionStore",
+    "HedgePolicy",
+    "Job",
+    "LoadGenerator",
+    "MemoryBackend",
+    "MemorySessionStore",
+    "MetricsCollector",
+    "RateLimiter",
+    "ResponseCache",
+    "RetryPolicy",
+    "SharedTransport",
+    "SQLiteBackend",
+    "Timetable",
+]
@@ -1,15 +1,111 @@
 import json
 import re
-import time
 import traceback
 from urllib.parse import urljoin
 from pyquery import PyQuery as pq
 from requests import exceptions
 
+from .cache import MemoryBackend
+from .flow import DOWNLOAD_CHUNK_SIZE, EMIT_CHUNKS, Request, endpoint, stream_endpoint
+from .hooks import phase
+
+_CREDIT = re.compile(r"[0-9]+[.][0-9]*|0|&nbsp;")
+_SHOW_KC = "<span id='showKc"
+_SHOW_KC_END = "'></span>"
+
+
+def _last_credit(content, start, end):
+    """[start, end) 内最后一个 ":学分" 的 (冒号位置, 学分)，学分须在 end 之前结束"""
+    colon = content.rfind(":", start, end)
+    while colon != -1:
+        credit = _CREDIT.match(content, colon + 1, end)
+        if credit:
+            return colon, credit.group()
+        colon = content.rfind(":", start, colon)
+    return -1, None
+
+
+def _line_end(content, pos):
+    end = content.find("\n", pos)
+    return len(content) if end == -1 else end
+
+
+def _scan_type_statistics(content):
+    """线性扫描出各类别的 (类别, 要求学分, 获得学分, 未获得学分, showKc id)
+
+    结果与原先的正则
+
+        "(.*)&nbsp.*要求学分.*:(学分).*获得学分.*:(学分).*未获得学分.*:(学分)[\\s\\S]*?<span id='showKc(.*)'></span>
+
+    的 findall 完全一致。正则的贪婪回溯总会选出每一步最靠右、且后续仍能匹配的位置，
+    所以只需在含 "未获得学分" 的行里从行尾往前依次确定各个锚点，每行扫描常数遍。
+    """
+    # 最后一个同一行后面还有 "'></span>" 的 showKc，第三个学分必须在它之前结束
+    last_show_kc = -1
+    close = content.rfind(_SHOW_KC_END)
+    while close != -1:
+        line_start = content.rfind("\n", 0, close) + 1
+        last_show_kc = content.rfind(_SHOW_KC, line_start, close)
+        if last_show_kc != -1:
+            break
+        close = content.rfind(_SHOW_KC_END, 0, line_start)
+    if last_show_kc == -1:
+        return []
+
+    found = []
+    pos = 0
+    while True:
+        line_start = content.find("未获得学分", pos)
+        if line_start == -1 or line_start > last_show_kc:
+            break
+        line_start = content.rfind("\n", 0, line_start) + 1
+        line_end = _line_end(content, line_start)
+        first = max(pos, line_start)
+        missed_colon, missed = _last_credit(content, first, min(line_end, last_show_kc))
+        missed_at = content.rfind("未获得学分", first, missed_colon) if missed else -1
+        earned_colon, earned = (
+            _last_credit(content, first, missed_at) if missed_at != -1 else (-1, None)
+        )
+        earned_at = content.rfind("获得学分", first, earned_colon) if earned else -1
+        required_colon, required = (
+            _last_credit(content, first, earned_at) if earned_at != -1 else (-1, None)
+        )
+        required_at = content.rfind("要求学分", first, required_colon) if required else -1
+        nbsp = content.rfind("&nbsp", first, required_at) if required_at != -1 else -1
+        quote = content.find('"', first, nbsp) if nbsp != -1 else -1
+        if quote == -1:
+            pos = line_end + 1
+            continue
+        # 第三个学分之后第一个可用的 showKc，id 取到该行最后一个 "'></span>" 之前
+        show_kc = missed_colon + 1 + len(missed)
+        while True:
+            show_kc = content.find(_SHOW_KC, show_kc)
+            line_end = _line_end(content, show_kc)
+            close = content.rfind(_SHOW_KC_END, show_kc + len(_SHOW_KC), line_end)
+            if close != -1:
+                break
+            show_kc = line_end
+        found.append(
+            (
+                content[quote + 1 : nbsp],
+                required,
+                earned,
+                missed,
+                content[show_kc + len(_SHOW_KC) : close],
+            )
+        )
+        pos = close + len(_SHOW_KC_END)
+    return found
+
 
 class AcademiaMixin:
     """Academia related APIs."""
 
+    # 已完成成绩总表打印准备的会话，(base_url, JSESSIONID) -> True
+    academia_pdf_sessions = MemoryBackend(maxsize=4096)
+    academia_pdf_ttl = 1800
+
+    @endpoint
     def get_academia(self):
         """获取学业生涯情况"""
         url_main = urljoin(
@@ -20,7 +116,8 @@ class AcademiaMixin:
             self.base_url, "xsxy/xsxyqk_cxJxzxjhxfyqKcxx.html?gnmkdm=N105515"
         )
         try:
-            req_main = self.sess.get(
+            req_main = yield Request(
+                "GET",
                 url_main,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -29,28 +126,44 @@ class AcademiaMixin:
             )
             if req_main.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc_main = pq(req_main.text)
-            if doc_main("h5").text() == "用户登录":
+            with phase("html_parse"):
+                doc_main = pq(req_main.text)
+            if self.is_session_expired(req_main, doc_main):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             if str(doc_main("div.alert-danger")) != "":
                 return {"code": 998, "msg": doc_main("div.alert-danger").text()}
-            sid = doc_main("form#form input#xh_id").attr("value")
-            display_statistics = (
-                str(doc_main("div#alertBox").text()).replace(" ", "").replace("\n", "")
-            )
-            sid = doc_main("input#xh_id").attr("value")
-            statistics = self.get_academia_statistics(display_statistics)
-            type_statistics = self.get_academia_type_statistics(req_main.text)
-            details = {}
-            for type in type_statistics.keys():
-                details[type] = self.sess.post(
+            with phase("html_parse"):
+                sid = doc_main("form#form input#xh_id").attr("value")
+                display_statistics = (
+                    str(doc_main("div#alertBox").text()).replace(" ", "").replace("\n", "")
+                )
+                sid = doc_main("input#xh_id").attr("value")
+            with phase("regex"):
+                statistics = self.get_academia_statistics(display_statistics)
+                type_statistics = self.get_academia_type_statistics(req_main.text)
+            req_details = yield [
+                Request(
+                    "POST",
                     url_info,
                     headers=self.headers,
                     data={"xfyqjd_id": type_statistics[type]["id"]},
                     cookies=self.cookies,
                     timeout=self.timeout,
-                    stream=True,
-                ).json()
+                )
+                for type in type_statistics.keys()
+            ]
+            with phase("json_decode"):
+                details = {
+                    type: req_detail.json()
+                    for type, req_detail in zip(type_statistics.keys(), req_details)
+                }
+            categories = yield from self._fetch_course_categories(
+                i["KCH"]
+                for type in type_statistics.keys()
+                if type in self.detail_category_type
+                for i in details[type]
+                if i.get("KCH")
+            )
             result = {
                 "sid": sid,
                 "statistics": statistics,
@@ -67,7 +180,9 @@ class AcademiaMixin:
                                     sid, i.get("JYXDXNM"), i.get("JYXDXQMC")
                                 ),
                                 "credit": self.align_floats(i.get("XF")),
-                                "category": self.get_course_category(type, i),
+                                "category": categories.get(i.get("KCH"))
+                                if type in self.detail_category_type
+                                else i.get("KCLBMC"),
                                 "nature": i.get("KCXZMC"),
                                 "max_grade": self.parse_int(i.get("MAXCJ")),
                                 "grade_point": self.align_floats(i.get("JD")),
@@ -93,8 +208,19 @@ class AcademiaMixin:
             traceback.print_exc()
             return {"code": 999, "msg": "获取学业情况时未记录的错误：" + str(e)}
 
-    def get_academia_pdf(self):
-        """获取学业生涯（学生成绩总表）pdf"""
+    @endpoint
+    def get_academia_pdf(self, file=None, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+        """获取学业生涯（学生成绩总表）pdf，指定 file（路径或文件对象）时边下载边写入文件"""
+        if file is None:
+            return (yield from self._academia_pdf())
+        return (yield from self._save_pdf(self._academia_pdf, file, chunk_size))
+
+    @stream_endpoint
+    def iter_academia_pdf(self, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+        """逐块产出学生成绩总表pdf内容"""
+        return (yield from self._academia_pdf(EMIT_CHUNKS, chunk_size))
+
+    def _academia_pdf(self, sink=None, chunk_size=None):
         url_view = urljoin(self.base_url, "bysxxcx/xscjzbdy_dyXscjzbView.html")
         url_window = urljoin(self.base_url, "bysxxcx/xscjzbdy_dyCjdyszxView.html")
         url_policy = urljoin(self.base_url, "xtgl/bysxxcx/xscjzbdy_cxXsCount.html")
@@ -102,6 +228,7 @@ class AcademiaMixin:
         url_common = urljoin(self.base_url, "common/common_cxJwxtxx.html")
         url_file = urljoin(self.base_url, "bysxxcx/xscjzbdy_dyList.html")
         url_progress = urljoin(self.base_url, "xtgl/progress_cxProgressStatus.html")
+        # 页面在 policy 之后的请求（含生成文件）都不带 wjlx 字段
         data = {
             "gsdygx": "10628-zw-mrgs",
             "ids": "",
@@ -114,79 +241,71 @@ class AcademiaMixin:
             "djksxmDms": "",
             "cjbzmcDms": "",
             "cjdySzxs": "",
-            "wjlx": "pdf",
         }
+        params = {"gnmkdm": "N558020"}
+        prepared = self._academia_pdf_session()
         try:
-            data_view = {"time": str(round(time.time() * 1000)), "gnmkdm": "N558020"}
-            data_params = data_view
-            del data_params["time"]
-            req_view = self.sess.post(
-                url_view,
-                headers=self.headers,
-                data=data_view,
-                params=data_view,
-                cookies=self.cookies,
-                timeout=self.timeout,
-            )
-            if req_view.status_code != 200:
-                return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_view.text)
-            if doc("h5").text() == "用户登录":
-                return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
-            data_window = {"xh": ""}
-            self.sess.post(
-                url_window,
-                headers=self.headers,
-                data=data_window,
-                params=data_params,
-                cookies=self.cookies,
-                timeout=self.timeout,
-            )
-            data_policy = data
-            del data_policy["wjlx"]
-            self.sess.post(
-                url_policy,
-                headers=self.headers,
-                data=data_policy,
-                params=data_params,
-                cookies=self.cookies,
-                timeout=self.timeout,
-            )
-            data_filetype = data_policy
-            self.sess.post(
-                url_filetype,
-                headers=self.headers,
-                data=data_filetype,
-                params=data_params,
-                cookies=self.cookies,
-                timeout=self.timeout,
-            )
-            self.sess.post(
-                url_common,
-                headers=self.headers,
-                data=data_params,
-                params=data_params,
-                cookies=self.cookies,
-                timeout=self.timeout,
-            )
-            req_file = self.sess.post(
+            if prepared is None or self.academia_pdf_sessions.get(prepared) is None:
+                req_view = yield Request(
+                    "POST",
+                    url_view,
+                    headers=self.headers,
+                    data=params,
+                    params=params,
+                    cookies=self.cookies,
+                    timeout=self.timeout,
+                )
+                if req_view.status_code != 200:
+                    return {"code": 2333, "msg": "教务系统挂了"}
+                if self.is_session_expired(req_view):
+                    return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
+                # 打印设置会改变服务器端的会话状态，按页面原有顺序逐个发送；
+                # 全部成功后同一会话内只需准备一次，任一失败则下次重新准备
+                for url, form in (
+                    (url_window, {"xh": ""}),
+                    (url_policy, data),
+                    (url_filetype, data),
+                    (url_common, params),
+                ):
+                    req_setup = yield Request(
+                        "POST",
+                        url,
+                        headers=self.headers,
+                        data=form,
+                        params=params,
+                        cookies=self.cookies,
+                        timeout=self.timeout,
+                    )
+                    if req_setup.status_code != 200:
+                        return {"code": 2333, "msg": "教务系统挂了"}
+                    if self.is_session_expired(req_setup):
+                        return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
+                if prepared is not None:
+                    self.academia_pdf_sessions.set(prepared, True, self.academia_pdf_ttl)
+            req_file = yield Request(
+                "POST",
                 url_file,
                 headers=self.headers,
                 data=data,
-                params=data_params,
+                params=params,
                 cookies=self.cookies,
                 timeout=self.timeout,
             )
             doc = pq(req_file.text)
+            if self.is_session_expired(req_file, doc):
+                if prepared is not None:
+                    self.academia_pdf_sessions.invalidate(*prepared)
+                return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             if "错误" in doc("title").text():
                 error = doc("p.error_title").text()
                 return {"code": 998, "msg": error}
-            data_progress = {"key": "score_print_processed", "gnmkdm": "N558020"}
-            self.sess.post(
+            progress = {"key": "score_print_processed", "gnmkdm": "N558020"}
+            yield Request(
+                "POST",
                 url_progress,
                 headers=self.headers,
-                data=data_progress,
-                params=data_progress,
+                data=progress,
+                params=progress,
                 cookies=self.cookies,
                 timeout=self.timeout,
             )
@@ -196,12 +315,18 @@ class AcademiaMixin:
                 .replace("/", "\\")
                 .replace("\\\\", "/")
             )
-            req_pdf = self.sess.get(
+            download = {} if sink is None else {"sink": sink, "chunk_size": chunk_size}
+            req_pdf = yield Request(
+                "GET",
                 urljoin(self.base_url, pdf),
                 headers=self.headers,
                 cookies=self.cookies,
                 timeout=self.timeout + 2,
+                **download,
             )
+            if sink is not None and req_pdf.content:
+                # 流式下载时只有 HTML/JSON 响应会被缓冲下来，它们都不是 pdf
+                return self._download_error(req_pdf)
             result = req_pdf.content
             return {"code": 1000, "msg": "获取学生成绩总表pdf成功", "data": result}
         except exceptions.Timeout:
@@ -217,6 +342,13 @@ class AcademiaMixin:
             traceback.print_exc()
             return {"code": 999, "msg": "获取成绩总表pdf时未记录的错误：" + str(e)}
 
+    def _academia_pdf_session(self):
+        """成绩总表打印准备状态的缓存键，按会话（JSESSIONID）区分"""
+        session = self.cookies.get("JSESSIONID") if self.cookies else None
+        if not session:
+            return None
+        return (self.base_url, session, "academia_pdf")
+
     @classmethod
     def get_academia_statistics(cls, display_statistics):
         display_statistics = "".join(display_statistics.split())
@@ -249,10 +381,7 @@ class AcademiaMixin:
 
     @classmethod
     def get_academia_type_statistics(cls, content: str):
-        finder = re.findall(
-            r"\"(.*)&nbsp.*要求学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;).*获得学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;).*未获得学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;)[\s\S]*?<span id='showKc(.*)'></span>",
-            content,
-        )
+        finder = _scan_type_statistics(content)
         finder_list = list({}.fromkeys(finder).keys())
         academia_list = [
             list(i)
@@ -0,0 +1,288 @@
+import asyncio
+import time
+
+import requests
+from requests import exceptions
+from requests.structures import CaseInsensitiveDict
+
+from .client import BaseClient
+from .flow import EMIT_CHUNKS, ApiError, Emit
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AsyncClient(BaseClient):
+    """asyncio counterpart of :class:`Client` built on aiohttp.
+
+    Every API method has the same signature and result contract as on
+    :class:`Client` but returns a coroutine, so one event loop can drive many
+    student sessions concurrently::
+
+        async with AsyncClient(base_url=base_url) as stu:
+            await stu.login(sid, password)
+            result = await stu.get_grade(2024, 1)
+    """
+
+    def __init__(self, cookies=None, **kwargs):
+        if aiohttp is None:
+            raise ImportError("AsyncClient 需要安装 aiohttp：pip install zfn-api[async]")
+        super().__init__(cookies, **kwargs)
+        self.sess = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """关闭底层 aiohttp 会话"""
+        if self.sess is not None:
+            await self.sess.close()
+            self.sess = None
+
+    def _session(self):
+        if self.sess is None:
+            kwargs = {}
+            if self.transport is not None:
+                kwargs = {
+                    "connector": self.transport.connector(),
+                    "connector_owner": False,
+                    "trace_configs": [self.transport.trace_config()],
+                }
+            self.sess = aiohttp.ClientSession(
+                cookie_jar=aiohttp.CookieJar(unsafe=True), **kwargs
+            )
+        return self.sess
+
+    async def _call(self, func, args, kwargs):
+        profile = kwargs.pop("profile", self.profile)
+        deadline = self._deadline_at(kwargs.pop("deadline", self.deadline))
+        key = None if profile else self._cache_key(func, args, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        for delay in self._attempt_delays(func.__name__):
+            if delay:
+                if not self._sleep_fits(delay, deadline):
+                    break
+                await asyncio.sleep(delay)
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+                result = self.circuit_breaker.rejected()
+                break
+            result = await self._run(func(self, *args, **kwargs), profile, deadline)
+            if deadline is not None and deadline.exceeded:
+                # 调用方自己的预算耗尽，不是上游故障：不计入熔断器，也不重试
+                break
+            if not self._attempt_failed(result):
+                break
+        return self._finish_call(key, result)
+
+    async def _run(self, flow, profile=False, deadline=None):
+        """Drive an endpoint flow to completion on the running event loop."""
+        hedge = self._hedge_endpoint(flow)
+        trace, flow = self._trace(flow, profile)
+        try:
+            request = next(flow)
+            while True:
+                try:
+                    response = await self._send(request, trace, deadline, hedge)
+                except Exception as e:
+                    request = flow.throw(self._translate_error(e))
+                else:
+                    request = flow.send(response)
+        except StopIteration as stop:
+            if trace is not None:
+                self._call_finished(trace, stop.value)
+            return stop.value
+
+    async def _stream(self, flow):
+        """Drive a streaming flow, yielding the records it emits."""
+        trace, flow = self._trace(flow)
+        try:
+            request = next(flow)
+            while True:
+                if isinstance(request, Emit):
+                    for item in request.items:
+                        yield item
+                    request = flow.send(None)
+                    continue
+                try:
+                    if getattr(request, "kwargs", {}).get("sink") is EMIT_CHUNKS:
+                        event = None if trace is None else self._request_started(trace, request)
+                        download = []
+                        try:
+                            async for chunk in self._iter_download(request, download):
+                                yield chunk
+                        except Exception as e:
+                            if event is not None:
+                                self._request_finished(event, error=self._translate_error(e))
+                            raise
+                        response = download[0]
+                        if event is not None:
+                            self._request_finished(event, response)
+                    else:
+                        response = await self._send(request, trace)
+                except Exception as e:
+                    request = flow.throw(self._translate_error(e))
+                else:
+                    request = flow.send(response)
+        except StopIteration as stop:
+            if trace is not None:
+                self._call_finished(trace, stop.value)
+            if stop.value is not None and stop.value.get("code") != 1000:
+                raise ApiError(stop.value) from None
+
+    async def _send(self, request, trace=None, deadline=None, hedge=None):
+        if isinstance(request, list):
+            return await self._send_batch(request, trace, deadline)
+        if deadline is None:
+            return await self._traced_send(request, trace, hedge)
+        limited = self._within_deadline(request, deadline)
+        try:
+            return await self._traced_send(limited, trace, hedge)
+        except (asyncio.TimeoutError, exceptions.Timeout) as e:
+            raise self._deadline_timeout(self._translate_error(e), request, limited, deadline) from e
+
+    async def _traced_send(self, request, trace, hedge):
+        if trace is None:
+            return await self._deliver(request, hedge)
+        event = self._request_started(trace, request)
+        try:
+            response = await self._deliver(request, hedge)
+        except Exception as e:
+            self._request_finished(event, error=self._translate_error(e))
+            raise
+        self._request_finished(event, response)
+        return response
+
+    async def _deliver(self, request, hedge=None):
+        sink = request.kwargs.get("sink")
+        if sink is not None:
+            download = []
+            async for chunk in self._iter_download(request, download):
+                sink(chunk)
+            return download[0]
+        if hedge is not None:
+            return await self._hedged(request, hedge)
+        return await self._fetch(request)
+
+    async def _fetch(self, request):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(request.url)
+        kwargs = self._aiohttp_options(request.kwargs)
+        async with self._session().request(request.method, request.url, **kwargs) as resp:
+            content = await resp.read()
+            return self._build_response(resp, content)
+
+    async def _hedged(self, request, endpoint):
+        """请求超过对冲延迟仍未返回时再发一份，取先成功的响应，并取消另一份"""
+        policy = self.hedge
+
+        async def attempt():
+            start = time.perf_counter()
+            response = await self._fetch(request)
+            policy.observe(endpoint, time.perf_counter() - start)
+            return response
+
+        tasks = [asyncio.ensure_future(attempt())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=policy.delay(endpoint))
+            if not done and policy.try_hedge():
+                tasks.append(asyncio.ensure_future(attempt()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _iter_download(self, request, download):
+        """Yield the body of ``request`` chunk by chunk; the response is appended to ``download``.
+
+        Error pages are buffered into ``response.content`` and nothing is
+        yielded; for a streamed body ``response.content`` is left empty.
+        """
+        _, chunk_size, kwargs = self._download_options(request)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(request.url)
+        timeout = kwargs.pop("timeout", None)
+        kwargs = self._aiohttp_options(kwargs)
+        if timeout is not None:
+            # 与 requests 一致：超时针对连接与每次读取，而不是整个下载
+            kwargs["timeout"] = aiohttp.ClientTimeout(sock_connect=timeout, sock_read=timeout)
+        async with self._session().request(request.method, request.url, **kwargs) as resp:
+            first = await resp.content.read(chunk_size)
+            if self._is_document(resp.headers, first):
+                download.append(self._build_response(resp, first + await resp.content.read()))
+                return
+            if first:
+                yield first
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                yield chunk
+            download.append(self._build_response(resp, b""))
+
+    @staticmethod
+    def _aiohttp_options(kwargs):
+        """Translate requests-style keyword arguments for aiohttp."""
+        kwargs = dict(kwargs)
+        kwargs.pop("stream", None)
+        timeout = kwargs.pop("timeout", None)
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        if kwargs.get("headers") is not None:
+            kwargs["headers"] = dict(kwargs["headers"])
+        return kwargs
+
+    async def _send_batch(self, batch, trace=None, deadline=None):
+        limit = asyncio.Semaphore(max(1, self.max_workers))
+
+        async def send(request):
+            async with limit:
+                return await self._send(request, trace, deadline)
+
+        results = await asyncio.gather(
+            *(send(request) for request in batch), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    @staticmethod
+    def _build_response(resp, content):
+        """Wrap an aiohttp response as ``requests.Response`` for the shared flows."""
+        response = requests.Response()
+        response.status_code = resp.status
+        response.reason = resp.reason
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.url = str(resp.url)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = content
+        response.history = [
+            AsyncClient._build_response(r, b"") for r in resp.history
+        ]
+        return response
+
+    @staticmethod
+    def _translate_error(e):
+        """Map aiohttp/asyncio failures onto the requests exceptions flows expect."""
+        if isinstance(e, asyncio.TimeoutError):
+            return exceptions.Timeout(str(e) or "request timed out")
+        if isinstance(e, aiohttp.ClientError):
+            return exceptions.ConnectionError(str(e))
+        return e
+
+    def _session_cookies(self):
+        if self.sess is None:
+            return {}
+        return {cookie.key: cookie.value for cookie in self.sess.cookie_jar}
@@ -2,42 +2,162 @@ import base64
 import json
 import time
 import traceback
-from pyquery import PyQuery as pq
+from urllib.parse import urljoin
 from requests import exceptions
 
+from .flow import Request, endpoint
+from .hooks import phase
+
 
 class AuthMixin:
     """Authentication related APIs."""
 
+    # base_url -> (modulus, exponent)；False 表示该系统每个会话都换公钥，不再缓存
+    public_key_cache = {}
+    public_key_rotations = {}
+
+    @endpoint
     def login(self, sid, password):
         """登录教务系统"""
+        public_key = None
+        if self.cache_public_key:
+            public_key = self.public_key_cache.get(self.base_url) or None
+        result = yield from self._login(sid, password, public_key)
+        if public_key is not None and result["code"] == 1002:
+            # 密码错误也可能是服务器更换了公钥：只有公钥确实变了才再登录一次，
+            # 真正的密码错误不重复提交，以免加快触发账号锁定
+            try:
+                current = yield from self._fetch_public_key()
+            except (exceptions.RequestException, ValueError, KeyError):
+                return result
+            if current != public_key:
+                self._remember_public_key(current)
+                result = yield from self._login(sid, password, current)
+        return result
+
+    @endpoint
+    def ensure_login(self, sid, password):
+        """优先复用会话存储中仍有效的登录状态，确认失效后才重新登录"""
+        if str(self.sid) != str(sid) or not self.cookies:
+            self.sid = sid
+            self.cookies = {}
+            self._restore_session()
+        if self.cookies:
+            alive = time.time() - (self._session_verified_at or 0) < self.session_trust
+            if not alive:
+                # 探测请求超时或出错时无法判断会话状态：保留记录，不重新登录
+                try:
+                    alive = yield from self._probe_session()
+                except exceptions.Timeout:
+                    return {"code": 1003, "msg": "确认登录状态超时"}
+                except exceptions.RequestException:
+                    return {"code": 2333, "msg": "请重试，若多次失败可能是系统错误维护或需更新接口"}
+                if alive is None:
+                    return {"code": 2333, "msg": "教务系统挂了"}
+                if alive:
+                    self._save_session()
+            if alive:
+                return {"code": 1000, "msg": "会话有效", "data": {"cookies": self.cookies}}
+            self._forget_session()
+        return (yield from self.login.flow(self, sid, password))
+
+    def _probe_session(self):
+        """用一次不跟随重定向的轻量请求判断会话是否仍然有效
+
+        只有被重定向到登录页或直接返回登录页才算失效（False）；其他错误状态码
+        无法判断，返回 None；超时等网络错误向上抛出。
+        """
+        url = urljoin(self.base_url, "xsxxxggl/xsxxwh_cxCkDgxsxx.html?gnmkdm=N100801")
+        req_probe = yield Request(
+            "GET",
+            url,
+            headers=self.headers,
+            cookies=self.cookies,
+            timeout=self.timeout,
+            allow_redirects=False,
+        )
+        if req_probe.is_redirect:
+            if "login" in req_probe.headers.get("Location", ""):
+                return False
+            return None
+        if req_probe.status_code != 200:
+            return None
+        return not self.is_session_expired(req_probe)
+
+    def _restore_session(self):
+        if self.session_store is None or not self.sid:
+            return
+        entry = self.session_store.load(self.base_url, self.sid)
+        if entry and entry.get("cookies"):
+            self.cookies = entry["cookies"]
+            self._session_verified_at = entry.get("verified_at")
+
+    def _save_session(self):
+        self._session_verified_at = time.time()
+        if self.session_store is not None and self.sid:
+            self.session_store.save(
+                self.base_url, self.sid, self.cookies, self._session_verified_at
+            )
+
+    def _forget_session(self):
+        self._session_verified_at = None
+        if self.session_store is not None and self.sid:
+            self.session_store.delete(self.base_url, self.sid)
+
+    def _remember_public_key(self, public_key):
+        cached = self.public_key_cache.get(self.base_url)
+        if not self.cache_public_key or cached is False:
+            return
+        if cached is not None and cached != public_key:
+            rotations = self.public_key_rotations.get(self.base_url, 0) + 1
+            self.public_key_rotations[self.base_url] = rotations
+            if rotations >= 3:
+                self.public_key_cache[self.base_url] = False
+                return
+        self.public_key_cache[self.base_url] = public_key
+
+    def _fetch_public_key(self):
+        res_pubkey = yield Request("GET", self.key_url, headers=self.headers, timeout=self.timeout)
+        with phase("json_decode"):
+            req_pubkey = res_pubkey.json()
+        return (req_pubkey["modulus"], req_pubkey["exponent"])
+
+    def _login(self, sid, password, public_key):
         need_verify = False
         try:
-            req_csrf = self.sess.get(self.login_url, headers=self.headers, timeout=self.timeout)
+            req_csrf = yield Request("GET", self.login_url, headers=self.headers, timeout=self.timeout)
             if req_csrf.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_csrf.text)
-            csrf_token = doc("#csrftoken").attr("value")
-            pre_cookies = self.sess.cookies.get_dict()
-            req_pubkey = self.sess.get(self.key_url, headers=self.headers, timeout=self.timeout).json()
-            modulus = req_pubkey["modulus"]
-            exponent = req_pubkey["exponent"]
-            if str(doc("input#yzm")) == "":
-                encrypt_password = self.encrypt_password(password, modulus, exponent)
+            with phase("html_parse"):
+                csrf_token, need_kaptcha = self.parser.login_page(req_csrf.text)
+            pre_cookies = self._session_cookies()
+            if public_key is None or need_kaptcha:
+                # 验证码登录的公钥交给调用方稍后使用，且 login_with_kaptcha 没有换公钥重试，
+                # 因此不用缓存而是取当前公钥
+                public_key = yield from self._fetch_public_key()
+                self._remember_public_key(public_key)
+            modulus, exponent = public_key
+            if not need_kaptcha:
+                with phase("encrypt"):
+                    encrypt_password = self.encrypt_password(password, modulus, exponent)
                 login_data = {"csrftoken": csrf_token, "yhm": sid, "mm": encrypt_password}
-                req_login = self.sess.post(
-                    self.login_url, headers=self.headers, data=login_data, timeout=self.timeout
+                req_login = yield Request(
+                    "POST", self.login_url, headers=self.headers, data=login_data, timeout=self.timeout
                 )
-                doc = pq(req_login.text)
-                tips = doc("p#tips")
-                if str(tips) != "":
-                    if "用户名或密码" in tips.text():
+                with phase("html_parse"):
+                    tips = self.parser.login_tips(req_login.text)
+                if tips is not None:
+                    if "用户名或密码" in tips:
                         return {"code": 1002, "msg": "用户名或密码不正确"}
-                    return {"code": 998, "msg": tips.text()}
-                self.cookies = self.sess.cookies.get_dict()
+                    return {"code": 998, "msg": tips}
+                self.cookies = self._session_cookies()
+                self.sid = sid
+                self._save_session()
                 return {"code": 1000, "msg": "登录成功", "data": {"cookies": self.cookies}}
             need_verify = True
-            req_kaptcha = self.sess.get(self.kaptcha_url, headers=self.headers, timeout=self.timeout)
+            req_kaptcha = yield Request(
+                "GET", self.kaptcha_url, headers=self.headers, timeout=self.timeout
+            )
             kaptcha_pic = base64.b64encode(req_kaptcha.content).decode()
             return {
                 "code": 1001,
@@ -68,14 +188,17 @@ class AuthMixin:
             msg = "获取验证码时未记录的错误" if need_verify else "登录时未记录的错误"
             return {"code": 999, "msg": f"{msg}：{str(e)}"}
 
+    @endpoint
     def login_with_kaptcha(
         self, sid, csrf_token, cookies, password, modulus, exponent, kaptcha, **kwargs
     ):
         """需要验证码的登陆"""
         try:
-            encrypt_password = self.encrypt_password(password, modulus, exponent)
+            with phase("encrypt"):
+                encrypt_password = self.encrypt_password(password, modulus, exponent)
             login_data = {"csrftoken": csrf_token, "yhm": sid, "mm": encrypt_password, "yzm": kaptcha}
-            req_login = self.sess.post(
+            req_login = yield Request(
+                "POST",
                 self.login_url,
                 headers=self.headers,
                 cookies=cookies,
@@ -84,19 +207,22 @@ class AuthMixin:
             )
             if req_login.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_login.text)
-            tips = doc("p#tips")
-            if str(tips) != "":
-                if "验证码" in tips.text():
+            with phase("html_parse"):
+                tips = self.parser.login_tips(req_login.text)
+            if tips is not None:
+                if "验证码" in tips:
                     return {"code": 1004, "msg": "验证码输入错误"}
-                if "用户名或密码" in tips.text():
+                if "用户名或密码" in tips:
                     return {"code": 1002, "msg": "用户名或密码不正确"}
-                return {"code": 998, "msg": tips.text()}
-            self.cookies = self.sess.cookies.get_dict()
+                return {"code": 998, "msg": tips}
+            self.cookies = self._session_cookies()
+            self.sid = sid
             if not self.cookies.get("route") and cookies.get("route"):
                 route_cookies = {"JSESSIONID": self.cookies["JSESSIONID"], "route": cookies["route"]}
                 self.cookies = route_cookies
+                self._save_session()
             else:
+                self._save_session()
                 return {"code": 1000, "msg": "登录成功", "data": {"cookies": self.cookies}}
         except exceptions.Timeout:
             return {"code": 1003, "msg": "登录超时"}
@@ -0,0 +1,70 @@
+"""Wall-clock time of get_academia with sequential vs. concurrent detail fetches.
+
+The stub answers every request after ``--latency`` seconds; each credit
+category costs one ``xsxyqk_cxJxzxjhxfyqKcxx.html`` round trip.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import parse_qs
+
+from common import (
+    ACADEMIA_INFO_PATH,
+    ACADEMIA_MAIN_PATH,
+    StubServer,
+    academia_courses,
+    academia_page,
+    load_package,
+    report,
+)
+
+zfn_api = load_package()
+
+
+def details(handler):
+    category = parse_qs(handler.body.decode())["xfyqjd_id"][0]
+    return academia_courses(f"K{category}", 8)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    assert result["code"] == 1000, result
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    rows = []
+    with StubServer(latency=args.latency) as stub:
+        stub.route(ACADEMIA_MAIN_PATH, academia_page(args.categories), "text/html;charset=utf-8")
+        stub.route(ACADEMIA_INFO_PATH, details)
+        expected = None
+        for workers in (1, 4, 10):
+            client = zfn_api.Client(base_url=stub.base_url, max_workers=workers)
+            elapsed, result = timed(client.get_academia)
+            expected = expected or result
+            assert result == expected
+            rows.append({"client": "sync", "max_workers": workers, "wall_ms": round(elapsed * 1000)})
+
+            async def run():
+                async with zfn_api.AsyncClient(base_url=stub.base_url, max_workers=workers) as stu:
+                    start = time.perf_counter()
+                    result = await stu.get_academia()
+                    return time.perf_counter() - start, result
+
+            elapsed, result = asyncio.run(run())
+            assert result == expected
+            rows.append({"client": "async", "max_workers": workers, "wall_ms": round(elapsed * 1000)})
+    report(
+        f"get_academia, {args.categories} categories, {args.latency * 1000:.0f}ms per round trip",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
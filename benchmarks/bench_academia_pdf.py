@@ -0,0 +1,78 @@
+"""End-to-end time of get_academia_pdf against a latency-injecting stub.
+
+"sequential" replays the original eight strictly ordered requests; the
+client keeps that order but sends the view and print-setting requests only
+once per session.
+"""
+import argparse
+import time
+
+import requests
+
+from common import StubServer, load_package, report
+
+zfn_api = load_package()
+
+PREPARE = [
+    "bysxxcx/xscjzbdy_dyXscjzbView.html",
+    "bysxxcx/xscjzbdy_dyCjdyszxView.html",
+    "xtgl/bysxxcx/xscjzbdy_cxXsCount.html",
+    "bysxxcx/xscjzbdy_cxGswjlx.html",
+    "common/common_cxJwxtxx.html",
+]
+FILE_PATH = "bysxxcx/xscjzbdy_dyList.html"
+PROGRESS_PATH = "xtgl/progress_cxProgressStatus.html"
+PDF_PATH = "temp/cjzb.pdf"
+PDF = b"%PDF-1.4\n" + b"0" * 200_000
+
+
+def sequential(base_url, session, timeout):
+    """The request sequence of get_academia_pdf before sessions were memoized."""
+    for path in PREPARE + [FILE_PATH, PROGRESS_PATH]:
+        session.post(base_url + path, params={"gnmkdm": "N558020"}, timeout=timeout)
+    return session.get(base_url + PDF_PATH, timeout=timeout + 2).content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = []
+    with StubServer(latency=args.latency) as stub:
+        for path in PREPARE + [PROGRESS_PATH]:
+            stub.route(path, "1")
+        stub.route(FILE_PATH, '"\\/temp\\/cjzb.pdf"#成功')
+        stub.route(PDF_PATH, PDF, "application/pdf")
+
+        def measure(label, download):
+            stub.reset()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                assert download() == PDF
+            elapsed = time.perf_counter() - start
+            rows.append(
+                {
+                    "flow": label,
+                    "requests_per_pdf": round(stub.requests / args.repeat, 1),
+                    "ms_per_pdf": round(elapsed / args.repeat * 1000, 1),
+                }
+            )
+
+        session = requests.Session()
+        measure("sequential", lambda: sequential(stub.base_url, session, 3))
+
+        def fresh_session():
+            client = zfn_api.Client({"JSESSIONID": str(time.perf_counter())}, base_url=stub.base_url)
+            return client.get_academia_pdf()["data"]
+
+        measure("client, new session", fresh_session)
+        client = zfn_api.Client({"JSESSIONID": "reused"}, base_url=stub.base_url)
+        client.get_academia_pdf()
+        measure("client, same session", lambda: client.get_academia_pdf()["data"])
+    report(f"get_academia_pdf, {args.latency * 1000:.0f}ms per round trip", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Per-call CPU cost of session-expiry detection on JSON responses.
+
+Compares the old check (parse every body as HTML and read ``h5``) with
+``UtilsMixin.is_session_expired`` on ``get_selected_courses2``-shaped
+payloads of increasing size.
+"""
+import json
+import time
+
+import requests
+from pyquery import PyQuery as pq
+
+from common import load_package, report
+
+zfn_api = load_package()
+from zfn_api.utils import UtilsMixin  # noqa: E402
+
+
+def make_response(rows):
+    items = [
+        {
+            "kch": f"C{i:05d}",
+            "jxb_id": f"{i:032x}",
+            "kcmc": "高等数学（上）",
+            "xf": "4.0",
+            "jsxm": "张老师",
+            "kclbmc": "通识必修",
+            "jxdd": "教一-101",
+        }
+        for i in range(rows)
+    ]
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json;charset=utf-8"
+    response.encoding = "utf-8"
+    response._content = json.dumps({"items": items}, ensure_ascii=False).encode()
+    return response
+
+
+def legacy(response):
+    return pq(response.text)("h5").text() == "用户登录"
+
+
+def cpu_per_call(check, response, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        check(response)
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    rows = []
+    for size in (100, 1000, 5000):
+        response = make_response(size)
+        repeat = max(5, 20000 // size)
+        before = cpu_per_call(legacy, response, repeat)
+        after = cpu_per_call(UtilsMixin.is_session_expired, response, repeat * 100)
+        rows.append(
+            {
+                "rows": size,
+                "body_kb": len(response.content) // 1024,
+                "legacy_us": round(before * 1e6, 1),
+                "fast_path_us": round(after * 1e6, 2),
+                "speedup": f"{before / after:.0f}x",
+            }
+        )
+    report("session-expiry check, CPU per call", rows)
+
+
+if __name__ == "__main__":
+    main()
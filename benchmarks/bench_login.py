@@ -0,0 +1,96 @@
+"""Logins per second with and without the cached RSA public key.
+
+The stub decrypts every submitted password with its private key, so a
+login only succeeds if the client encrypted with the current public key.
+"""
+import argparse
+import base64
+import binascii
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import rsa
+
+from common import StubServer, load_package, report
+
+zfn_api = load_package()
+from zfn_api.auth import AuthMixin  # noqa: E402
+from zfn_api.utils import UtilsMixin  # noqa: E402
+
+LOGIN_PATH = "xtgl/login_slogin.html"
+KEY_PATH = "xtgl/login_getPublicKey.html"
+
+
+def b64_int(value):
+    return base64.b64encode(value.to_bytes((value.bit_length() + 7) // 8, "big")).decode()
+
+
+def legacy_encrypt(pwd, n, e):
+    """encrypt_password as it was before the key object was memoized."""
+    rsa_n = binascii.b2a_hex(binascii.a2b_base64(n))
+    rsa_e = binascii.b2a_hex(binascii.a2b_base64(e))
+    key = rsa.PublicKey(int(rsa_n, 16), int(rsa_e, 16))
+    return binascii.b2a_base64(rsa.encrypt(str(pwd).encode(), key))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    public, private = rsa.newkeys(1024)
+    key = {"modulus": b64_int(public.n), "exponent": b64_int(public.e)}
+
+    def login(handler):
+        if handler.command == "GET":
+            return '<input id="csrftoken" value="token"/>'
+        form = parse_qs(handler.body.decode())
+        rsa.decrypt(base64.b64decode(form["mm"][0]), private)
+        return "<html></html>"
+
+    rows = []
+    with StubServer(latency=args.latency) as stub:
+        stub.route(KEY_PATH, key)
+        stub.route(LOGIN_PATH, login, "text/html;charset=utf-8")
+        transport = zfn_api.SharedTransport(max_connections=args.workers)
+        for cached in (False, True):
+            AuthMixin.public_key_cache.clear()
+
+            def one(_):
+                client = zfn_api.Client(
+                    base_url=stub.base_url, transport=transport, cache_public_key=cached
+                )
+                assert client.login("2101", "secret")["code"] == 1000
+
+            stub.reset()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.workers) as pool:
+                list(pool.map(one, range(args.logins)))
+            elapsed = time.perf_counter() - start
+            rows.append(
+                {
+                    "public_key_cache": cached,
+                    "requests_per_login": round(stub.requests / args.logins, 2),
+                    "logins_per_s": round(args.logins / elapsed),
+                }
+            )
+    report(
+        f"{args.logins} logins, {args.workers} in flight, {args.latency * 1000:.0f}ms per round trip",
+        rows,
+    )
+
+    repeat = 2000
+    cpu = []
+    for label, encrypt in (("rebuild key", legacy_encrypt), ("memoized key", UtilsMixin.encrypt_password)):
+        start = time.process_time()
+        for _ in range(repeat):
+            encrypt("secret", key["modulus"], key["exponent"])
+        cpu.append({"encrypt_password": label, "cpu_us": round((time.process_time() - start) / repeat * 1e6, 1)})
+    report("encrypt_password CPU per call", cpu)
+
+
+if __name__ == "__main__":
+    main()
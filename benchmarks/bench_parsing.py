@@ -0,0 +1,58 @@
+"""HTML field extraction: PyQuery vs the lxml parser backend.
+
+Each page from ``tests/fixtures`` is parsed with the method the client calls
+on it; time is the mean per parse, allocations are the tracemalloc peak of a
+single parse.
+"""
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+from common import load_package, report
+
+load_package()
+from zfn_api.parsing import PARSERS  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+PAGES = [
+    ("login_page", "login_kaptcha.html"),
+    ("login_tips", "login_tips.html"),
+    ("info_fields", "info.html"),
+    ("detail_fields", "info_details.html"),
+    ("hidden_inputs", "block_head.html"),
+    ("course_category", "course_category.html"),
+]
+
+
+def measure(parse, html, repeat):
+    parse(html)
+    tracemalloc.start()
+    parse(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(html)
+    return (time.perf_counter() - start) / repeat, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = []
+    for method, fixture in PAGES:
+        html = (FIXTURES / fixture).read_text(encoding="utf-8")
+        row = {"page": f"{fixture} ({method})"}
+        for name, backend in PARSERS.items():
+            elapsed, peak = measure(getattr(backend, method), html, args.repeat)
+            row[f"{name}_us"] = round(elapsed * 1e6, 1)
+            row[f"{name}_kb"] = round(peak / 1024, 1)
+        rows.append(row)
+    report("parse one page", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Peak memory and latency of buffered vs streamed schedule PDF downloads.
+
+Peak memory is what ``tracemalloc`` sees in this process (the stub's body is
+allocated before tracing starts); "first_byte" is when the caller gets the
+first piece of the PDF it can act on.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from common import StubServer, load_package, report
+
+zfn_api = load_package()
+
+POLICY_PATH = "kbdy/bjkbdy_cxXnxqsfkz.html"
+PDF_PATH = "kbcx/xskbcx_cxXsShcPdf.html"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    pdf = b"%PDF-1.4\n" + os.urandom(args.size_mb * 1024 * 1024)
+    chunk_size = args.chunk_kb * 1024
+    rows = []
+    with StubServer() as stub, tempfile.TemporaryDirectory() as tmp:
+        stub.route(POLICY_PATH, "1")
+        stub.route(PDF_PATH, pdf, "application/pdf")
+        client = zfn_api.Client(base_url=stub.base_url, timeout=30)
+        path = os.path.join(tmp, "schedule.pdf")
+
+        def buffered():
+            return len(client.get_schedule_pdf(2024, 1)["data"]), None
+
+        def to_file():
+            return client.get_schedule_pdf(2024, 1, file=path, chunk_size=chunk_size)["data"]["bytes"], None
+
+        def chunks():
+            first, total = None, 0
+            for chunk in client.iter_schedule_pdf(2024, 1, chunk_size=chunk_size):
+                first = first or time.perf_counter()
+                total += len(chunk)
+            return total, first
+
+        for label, download in (("buffered", buffered), ("file=", to_file), ("iter_schedule_pdf", chunks)):
+            download()
+            tracemalloc.start()
+            start = time.perf_counter()
+            total, first = download()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert total == len(pdf)
+            rows.append(
+                {
+                    "mode": label,
+                    "peak_mb": round(peak / 2**20, 1),
+                    "first_byte_ms": round(((first or start + elapsed) - start) * 1000, 1),
+                    "total_ms": round(elapsed * 1000, 1),
+                }
+            )
+    report(f"{args.size_mb} MB schedule PDF, {args.chunk_kb} KB chunks", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""split_merge_display on synthetic schedules: original vs hash-grouped pass.
+
+Every schedule contains one exact duplicate so both versions take the
+merge/split path. The original is cubic in the number of courses (a
+``list.index`` inside a nested loop), so it is only timed up to
+``--legacy-max`` courses.
+"""
+import argparse
+import copy
+import gc
+import re
+import time
+
+from common import load_package, report
+
+zfn_api = load_package()
+
+
+def legacy_split_merge_display(cls, schedule):
+    """split_merge_display before the hash-grouped rewrite."""
+    repetIndex = []
+    count = 0
+    for items in schedule["courses"]:
+        for index in range(len(schedule["courses"])):
+            if (schedule["courses"]).index(items) == count:
+                continue
+            elif (
+                items["course_id"] == schedule["courses"][index]["course_id"]
+                and items["weekday"] == schedule["courses"][index]["weekday"]
+                and items["weeks"] == schedule["courses"][index]["weeks"]
+            ):
+                repetIndex.append(index)
+        count += 1
+    if len(repetIndex) % 2 != 0:
+        return schedule
+    for r in range(0, len(repetIndex), 2):
+        fir = repetIndex[r]
+        sec = repetIndex[r + 1]
+        if len(re.findall(r"(\d+)", schedule["courses"][fir]["sessions"])) == 4:
+            schedule["courses"][fir]["sessions"] = (
+                re.findall(r"(\d+)", schedule["courses"][fir]["sessions"])[0]
+                + "-"
+                + re.findall(r"(\d+)", schedule["courses"][fir]["sessions"])[1]
+                + "节"
+            )
+            schedule["courses"][fir]["list_sessions"] = cls.list_sessions(
+                schedule["courses"][fir]["sessions"]
+            )
+            schedule["courses"][fir]["time"] = cls.display_course_time(
+                schedule["courses"][fir]["sessions"]
+            )
+            schedule["courses"][sec]["sessions"] = (
+                re.findall(r"(\d+)", schedule["courses"][sec]["sessions"])[2]
+                + "-"
+                + re.findall(r"(\d+)", schedule["courses"][sec]["sessions"])[3]
+                + "节"
+            )
+            schedule["courses"][sec]["list_sessions"] = cls.list_sessions(
+                schedule["courses"][sec]["sessions"]
+            )
+            schedule["courses"][sec]["time"] = cls.display_course_time(
+                schedule["courses"][sec]["sessions"]
+            )
+    return schedule
+
+
+def synthetic_schedule(size):
+    """``size`` courses, two of which are a merged-display duplicate pair."""
+    courses = [
+        {
+            "course_id": f"C{n:05d}",
+            "title": f"课程{n}",
+            "weekday": n % 7 + 1,
+            "sessions": "1-2节",
+            "list_sessions": [1, 2],
+            "weeks": "1-16周",
+            "list_weeks": list(range(1, 17)),
+            "place": f"教{n % 40}",
+        }
+        for n in range(size - 1)
+    ]
+    merged = dict(courses[0], sessions="1-2,3-4节", list_sessions=None)
+    courses[0] = merged
+    courses.append(dict(merged))
+    return {"courses": courses}
+
+
+def timed(split, schedule, runs):
+    """Mean seconds per call; input copies are made up front and, like timeit, GC is paused."""
+    copies = [copy.deepcopy(schedule) for _ in range(runs)]
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for each in copies:
+            split(each)
+        return (time.perf_counter() - start) / runs
+    finally:
+        gc.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--legacy-max", type=int, default=500)
+    args = parser.parse_args()
+
+    client = zfn_api.Client()
+    cls = type(client)
+    rows = []
+    for size in args.sizes:
+        schedule = synthetic_schedule(size)
+        current = timed(cls.split_merge_display, schedule, max(3, 50000 // size))
+        row = {
+            "courses": size,
+            "original_ms": "skipped",
+            "hash_grouped_ms": round(current * 1000, 3),
+            "speedup": "-",
+        }
+        if size <= args.legacy_max:
+            expected = legacy_split_merge_display(cls, copy.deepcopy(schedule))
+            assert cls.split_merge_display(copy.deepcopy(schedule)) == expected
+            runs = max(1, 10**7 // size**3)
+            legacy = timed(lambda s: legacy_split_merge_display(cls, s), schedule, runs)
+            row["original_ms"] = round(legacy * 1000, 3)
+            row["speedup"] = f"{legacy / current:.0f}x"
+        rows.append(row)
+    report("split_merge_display per schedule", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Next-class lookups: scanning get_schedule courses vs a Timetable index.
+
+The scan is what callers had to do per request: walk ``courses``, expand
+weeks/sessions and convert ``raspisanie`` strings to find the next class.
+"""
+import argparse
+import datetime
+import random
+import time
+
+from common import load_package, report
+
+zfn_api = load_package()
+from zfn_api.constants import RASPIANIE  # noqa: E402
+
+TERM_START = datetime.date(2024, 9, 2)
+
+
+def scan_next(schedule, when):
+    best = None
+    for course in schedule["courses"]:
+        weeks = zfn_api.Client.list_weeks(course["weeks"])
+        sessions = zfn_api.Client.list_sessions(course["sessions"])
+        hour, minute = RASPIANIE[sessions[0] - 1][0].split(":")
+        for week in weeks:
+            day = TERM_START + datetime.timedelta(weeks=week - 1, days=course["weekday"] - 1)
+            start = datetime.datetime.combine(day, datetime.time(int(hour), int(minute)))
+            if start > when and (best is None or start < best[0]):
+                best = (start, course)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    schedule = {
+        "courses": [
+            {
+                "title": f"课程{n}",
+                "weekday": rng.randint(1, 5),
+                "sessions": rng.choice(["1-2节", "3-4节", "6-7节", "8-9节", "10-12节"]),
+                "weeks": rng.choice(["1-16周", "1-8周", "9-16周", "1-15周(单)", "2-16周(双)"]),
+            }
+            for n in range(args.courses)
+        ]
+    }
+    queries = [
+        datetime.datetime.combine(TERM_START, datetime.time(8))
+        + datetime.timedelta(minutes=rng.randint(0, 16 * 7 * 24 * 60))
+        for _ in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    timetable = zfn_api.Timetable(schedule, TERM_START, RASPIANIE)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanned = [scan_next(schedule, when) for when in queries]
+    scan = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [timetable.next(when) for when in queries]
+    lookup = time.perf_counter() - start
+    assert [s and s[0] for s in scanned] == [o and o.start for o in indexed]
+
+    report(
+        f"next class, {args.courses} courses, {len(timetable.occurrences)} occurrences",
+        [
+            {"method": "scan courses", "build_ms": "-", "us_per_query": round(scan / len(queries) * 1e6, 2)},
+            {
+                "method": "Timetable.next",
+                "build_ms": round(build * 1000, 2),
+                "us_per_query": round(lookup / len(queries) * 1e6, 2),
+            },
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
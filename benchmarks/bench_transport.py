@@ -0,0 +1,111 @@
+"""Handshake count and latency with and without a SharedTransport.
+
+Simulates many logged-in students whose requests interleave, which is the
+case where a per-client connection pool keeps re-handshaking with the same
+host. ``connect_delay`` stands in for the TCP+TLS handshake round trips.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import StubServer, load_package, report
+
+zfn_api = load_package()
+
+GRADE_PATH = "cjcx/cjcx_cxXsgrcj.html"
+GRADES = {"items": [{"xh": "2101", "xm": "张三", "kch_id": "A1", "kcmc": "高数", "xf": "4"}]}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(label, stub, latencies, elapsed):
+    return {
+        "mode": label,
+        "handshakes": stub.connections,
+        "requests": stub.requests,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "total_s": round(elapsed, 2),
+    }
+
+
+def run_sync(stub, students, rounds, workers, transport):
+    clients = [
+        zfn_api.Client(base_url=stub.base_url, transport=transport) for _ in range(students)
+    ]
+
+    def one(client):
+        start = time.perf_counter()
+        assert client.get_grade(2024, 1)["code"] == 1000
+        return time.perf_counter() - start
+
+    stub.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = list(pool.map(one, clients * rounds))
+    return latencies, time.perf_counter() - start
+
+
+async def run_async(stub, students, rounds, workers, transport):
+    clients = [
+        zfn_api.AsyncClient(base_url=stub.base_url, transport=transport) for _ in range(students)
+    ]
+    limit = asyncio.Semaphore(workers)
+
+    async def one(client):
+        async with limit:
+            start = time.perf_counter()
+            assert (await client.get_grade(2024, 1))["code"] == 1000
+            return time.perf_counter() - start
+
+    stub.reset()
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(c) for c in clients * rounds))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    if transport is not None:
+        await transport.aclose()
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--connect-delay", type=float, default=0.02)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rows = []
+    with StubServer(latency=args.latency, connect_delay=args.connect_delay) as stub:
+        stub.route(GRADE_PATH, GRADES)
+        for label, transport in (
+            ("sync per-client", None),
+            ("sync shared", zfn_api.SharedTransport(max_connections=args.workers)),
+        ):
+            latencies, elapsed = run_sync(stub, args.students, args.rounds, args.workers, transport)
+            rows.append(summarize(label, stub, latencies, elapsed))
+        for label, transport in (
+            ("async per-client", None),
+            ("async shared", zfn_api.SharedTransport(max_connections=args.workers)),
+        ):
+            latencies, elapsed = asyncio.run(
+                run_async(stub, args.students, args.rounds, args.workers, transport)
+            )
+            rows.append(summarize(label, stub, latencies, elapsed))
+    report(
+        f"{args.students} students x {args.rounds} rounds, {args.workers} in flight, "
+        f"{args.connect_delay * 1000:.0f}ms handshake",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Academia category extraction: legacy backtracking regex vs the linear scanner.
+
+``page`` is the real page shape with N categories; ``padded`` adds table
+rows and inline script the way the real page carries them between the
+category headers, which is where the regex spends its time (every quote
+starts a ``.*`` scan to the end of its line). ``adversarial`` is a
+single line of quotes and partial "&nbsp 要求学分:1.0 获得学分:1.0" runs that
+never complete, followed by a valid showKc: every quote is a candidate match
+start and every anchor a backtracking point, so the regex degrades
+polynomially with the line length while the scanner stays linear.
+"""
+import argparse
+import re
+import time
+
+from common import academia_page, load_package, report
+
+load_package()
+from zfn_api.academia import _scan_type_statistics  # noqa: E402
+
+LEGACY = re.compile(
+    r"\"(.*)&nbsp.*要求学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;).*获得学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;).*未获得学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;)[\s\S]*?<span id='showKc(.*)'></span>"
+)
+
+
+def adversarial(size):
+    unit = '"&nbsp要求学分:1.0获得学分:1.0'
+    return unit * (size // len(unit)) + "\n<span id='showKc0'></span>\n"
+
+
+def padded(categories, rows):
+    filler = "".join(
+        f'<tr class="row{i}"><td style="width: 12%; text-align: center;" data-title="课程{i}">'
+        f"<a href=\"javascript:void(0);\" onclick=\"showDetail('{i}', {{page: 1, size: 15}})\">"
+        "详情</a></td></tr>\n"
+        for i in range(rows)
+    )
+    return academia_page(categories).replace("</body>", filler + "</body>")
+
+
+def timed(func, content):
+    start = time.perf_counter()
+    result = func(content)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[125, 250, 500, 64000, 1000000])
+    parser.add_argument(
+        "--legacy-max", type=int, default=500, help="largest adversarial size timed with the regex"
+    )
+    args = parser.parse_args()
+
+    rows = []
+    pages = [
+        ("page, 12 categories", academia_page(12)),
+        ("page, 1000 categories", academia_page(1000)),
+        ("padded, 12 categories + 800 rows", padded(12, 800)),
+    ]
+    for title, content in pages:
+        legacy, expected = timed(LEGACY.findall, content)
+        scanner, found = timed(_scan_type_statistics, content)
+        assert found == expected
+        rows.append(
+            {
+                "input": title,
+                "kb": round(len(content.encode()) / 1024, 1),
+                "regex_ms": round(legacy * 1000, 2),
+                "scanner_ms": round(scanner * 1000, 3),
+            }
+        )
+    for size in args.sizes:
+        content = adversarial(size)
+        scanner, found = timed(_scan_type_statistics, content)
+        legacy = "-"
+        if size <= args.legacy_max:
+            elapsed, expected = timed(LEGACY.findall, content)
+            assert found == expected
+            legacy = round(elapsed * 1000, 2)
+        rows.append(
+            {
+                "input": f"adversarial, {size} chars",
+                "kb": round(len(content.encode()) / 1024, 1),
+                "regex_ms": legacy,
+                "scanner_ms": round(scanner * 1000, 3),
+            }
+        )
+    report("get_academia_type_statistics", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Week/session parsing and conflict checks: lists vs cached bitmasks.
+
+Timetables repeat a handful of week strings across every course, so the
+parse is memoized per distinct string; conflict checks compare int masks
+instead of intersecting lists.
+"""
+import argparse
+import random
+import re
+import time
+
+from common import load_package, report
+
+zfn_api = load_package()
+Client = zfn_api.Client
+
+WEEKS = ["1-16周", "1-8周", "9-16周", "1-15周(单)", "2-16周(双)", "1-4周,6周,9-12周", "3-17周"]
+SESSIONS = ["1-2节", "3-4节", "5-6节", "7-8节", "9-11节", "1-4节"]
+
+
+def legacy_list_weeks(weeks):
+    """list_weeks before parsing was memoized."""
+    args = re.findall(r"[^,]+", weeks)
+    week_list = []
+    for item in args:
+        if "-" in item:
+            weeks_pair = re.findall(r"(\d+)", item)
+            if len(weeks_pair) != 2:
+                continue
+            if "单" in item:
+                for i in range(int(weeks_pair[0]), int(weeks_pair[1]) + 1):
+                    if i % 2 == 1:
+                        week_list.append(i)
+            elif "双" in item:
+                for i in range(int(weeks_pair[0]), int(weeks_pair[1]) + 1):
+                    if i % 2 == 0:
+                        week_list.append(i)
+            else:
+                for i in range(int(weeks_pair[0]), int(weeks_pair[1]) + 1):
+                    week_list.append(i)
+        else:
+            week_num = re.findall(r"(\d+)", item)
+            if len(week_num) == 1:
+                week_list.append(int(week_num[0]))
+    return week_list
+
+
+def legacy_list_sessions(sessions):
+    args = re.findall(r"(\d+)", sessions)
+    return [n for n in range(int(args[0]), int(args[1]) + 1)]
+
+
+def list_conflict(a, b):
+    return (
+        a["weekday"] == b["weekday"]
+        and bool(set(a["list_weeks"]) & set(b["list_weeks"]))
+        and bool(set(a["list_sessions"]) & set(b["list_sessions"]))
+    )
+
+
+def per_call_us(func, calls):
+    start = time.perf_counter()
+    func()
+    return round((time.perf_counter() - start) / calls * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    courses = [
+        {"weekday": rng.randint(1, 7), "weeks": rng.choice(WEEKS), "sessions": rng.choice(SESSIONS)}
+        for _ in range(args.courses)
+    ]
+    n = len(courses)
+    rows = [
+        {
+            "operation": "parse weeks + sessions (per course)",
+            "lists_us": per_call_us(
+                lambda: [(legacy_list_weeks(c["weeks"]), legacy_list_sessions(c["sessions"])) for c in courses], n
+            ),
+            "bitmask_us": per_call_us(
+                lambda: [(Client.week_mask(c["weeks"]), Client.session_mask(c["sessions"])) for c in courses], n
+            ),
+        }
+    ]
+    for c in courses:
+        c["list_weeks"] = Client.list_weeks(c["weeks"])
+        c["list_sessions"] = Client.list_sessions(c["sessions"])
+        c["week_mask"] = Client.week_mask(c["weeks"])
+        c["session_mask"] = Client.session_mask(c["sessions"])
+    timetable = courses[:50]
+    pairs = [(a, b) for a in timetable for b in timetable]
+    assert [list_conflict(a, b) for a, b in pairs] == [Client.courses_conflict(a, b) for a, b in pairs]
+    rows.append(
+        {
+            "operation": "conflict check (per pair)",
+            "lists_us": per_call_us(lambda: [list_conflict(a, b) for a, b in pairs], len(pairs)),
+            "bitmask_us": per_call_us(lambda: [Client.courses_conflict(a, b) for a, b in pairs], len(pairs)),
+        }
+    )
+    week = 7
+    rows.append(
+        {
+            "operation": f"has class in week {week} (per course)",
+            "lists_us": per_call_us(lambda: [week in c["list_weeks"] for c in courses], n),
+            "bitmask_us": per_call_us(lambda: [c["week_mask"] >> week & 1 for c in courses], n),
+        }
+    )
+    report(f"{n} courses, {len(WEEKS)} distinct week strings", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Helpers shared by the benchmark scripts in this directory.
+
+Run the scripts from the repository root, e.g. ``python benchmarks/bench_transport.py``.
+"""
+import importlib.util
+import json
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def load_package():
+    """Import the repository checkout as ``zfn_api`` without installing it."""
+    if "zfn_api" in sys.modules:
+        return sys.modules["zfn_api"]
+    root = Path(__file__).resolve().parent.parent
+    spec = importlib.util.spec_from_file_location(
+        "zfn_api", root / "__init__.py", submodule_search_locations=[str(root)]
+    )
+    pkg = importlib.util.module_from_spec(spec)
+    sys.modules["zfn_api"] = pkg
+    spec.loader.exec_module(pkg)
+    return pkg
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubServer:
+    """Keep-alive HTTP stub with injectable latency and connection counting.
+
+    ``latency`` is slept before every response, ``connect_delay`` once per
+    accepted connection to stand in for the TCP+TLS handshake cost.
+    ``routes`` maps a path (without query string) to a JSON-able object,
+    ``str``/``bytes`` body or a callable receiving the handler.
+    """
+
+    def __init__(self, latency=0.0, connect_delay=0.0):
+        self.latency = latency
+        self.connect_delay = connect_delay
+        self.routes = {}
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = _Server(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def route(self, path, body, content_type="application/json;charset=utf-8"):
+        self.routes[path] = (body, content_type)
+
+    def reset(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+                if stub.connect_delay:
+                    time.sleep(stub.connect_delay)
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.body = self.rfile.read(length) if length else b""
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                path = self.path.split("?")[0].lstrip("/")
+                body, content_type = stub.routes.get(path, (b"not found", "text/html"))
+                if callable(body):
+                    body = body(self)
+                if not isinstance(body, (str, bytes)):
+                    body = json.dumps(body, ensure_ascii=False)
+                if isinstance(body, str):
+                    body = body.encode()
+                self.send_response(200 if path in stub.routes else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+ACADEMIA_MAIN_PATH = "xsxy/xsxyqk_cxXsxyqkIndex.html"
+ACADEMIA_INFO_PATH = "xsxy/xsxyqk_cxJxzxjhxfyqKcxx.html"
+COURSE_CATEGORY_PATH = "jxjhgl/common_cxKcJbxx.html"
+
+
+def academia_page(categories):
+    """Academic-progress page shaped like ``xsxyqk_cxXsxyqkIndex.html``."""
+    blocks = "".join(
+        f'<div class="panel">\n<span title="类别{i}&nbsp;要求学分:{10 + i}.0&nbsp;'
+        f'获得学分:8.0&nbsp;未获得学分:0"></span>\n'
+        f"<span id='showKc{i:04d}'></span>\n</div>\n"
+        for i in range(categories)
+    )
+    return (
+        '<html><body><form id="form"><input id="xh_id" value="2101010101"/></form>\n'
+        '<div id="alertBox">平均学分绩点GPA：3.52 计划总课程50门通过40门，未通过1门；'
+        "未修8门；在读1门；计划外：通过2门，未通过0门</div>\n"
+        f"{blocks}</body></html>"
+    )
+
+
+def academia_courses(prefix, count):
+    """Course rows as returned by ``xsxyqk_cxJxzxjhxfyqKcxx.html``."""
+    return [
+        {
+            "KCH": f"{prefix}{i:03d}",
+            "KCMC": f"课程{prefix}{i}",
+            "XDZT": "4",
+            "JYXDXNM": "2021",
+            "JYXDXQMC": "1",
+            "XF": "2.0",
+            "KCLBMC": "通识",
+            "KCXZMC": "必修",
+            "MAXCJ": "90",
+            "JD": "4.0",
+        }
+        for i in range(count)
+    ]
+
+
+def report(title, rows):
+    """Print ``rows`` (list of dicts with identical keys) as an aligned table."""
+    print(f"\n{title}")
+    if not rows:
+        return
+    keys = list(rows[0])
+    widths = [max(len(str(k)), *(len(str(r[k])) for r in rows)) for k in keys]
+    print("  ".join(str(k).ljust(w) for k, w in zip(keys, widths)))
+    for row in rows:
+        print("  ".join(str(row[k]).ljust(w) for k, w in zip(keys, widths)))
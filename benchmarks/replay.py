@@ -0,0 +1,133 @@
+"""Serve recorded teaching-system responses to a ``Client`` without a network.
+
+A fixture directory holds one file per recorded response plus a
+``manifest.json`` list of ``{"method", "path", "file", "content_type"}``
+entries; an optional ``"form"`` dict restricts an entry to requests whose
+posted form contains those values (``get_academia`` posts one
+``xfyqjd_id`` per category). Both transports plug into ``Client`` the same
+way :class:`zfn_api.SharedTransport` does::
+
+    client = Client(base_url=BASE_URL, transport=ReplayTransport(FIXTURES))
+"""
+import io
+import json
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+# 每次请求都会变化、录制时不保存也不参与匹配的表单字段
+VOLATILE_FIELDS = {"nd", "time"}
+
+
+def _route(url, prefix=""):
+    path = urlsplit(url).path
+    if prefix and path.startswith(prefix):
+        path = path[len(prefix) :]
+    return path.lstrip("/")
+
+
+def _form(body):
+    if not body:
+        return {}
+    if isinstance(body, bytes):
+        body = body.decode()
+    return {key: values[0] for key, values in parse_qs(body).items()}
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Answers every request from the fixture manifest, 404 when nothing matches."""
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = Path(directory)
+        self.entries = json.loads((self.directory / "manifest.json").read_text(encoding="utf-8"))
+        self.bodies = {
+            entry["file"]: (self.directory / entry["file"]).read_bytes() for entry in self.entries
+        }
+        self.requests = 0
+
+    def match(self, method, path, form):
+        for entry in self.entries:
+            if entry["method"] != method or not path.endswith(entry["path"]):
+                continue
+            if all(form.get(key) == value for key, value in entry.get("form", {}).items()):
+                return entry
+        return None
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.requests += 1
+        entry = self.match(request.method, _route(request.url), _form(request.body))
+        if entry is None:
+            status, content_type, body = 404, "text/html", b"not found"
+        else:
+            status, content_type, body = 200, entry["content_type"], self.bodies[entry["file"]]
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers={"Content-Type": content_type, "Content-Length": str(len(body))},
+            status=status,
+            preload_content=False,
+        )
+        return self.build_response(request, raw)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Passes requests through and writes each response into a fixture directory.
+
+    ``replacements`` maps real strings (student id, name, phone number …) to
+    the placeholders stored instead, so recordings can be committed.
+    """
+
+    def __init__(self, directory, replacements=None, prefix=""):
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.replacements = replacements or {}
+        self.prefix = prefix
+        self.entries = []
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        path = _route(request.url, self.prefix)
+        form = {
+            key: value for key, value in _form(request.body).items() if key not in VOLATILE_FIELDS
+        }
+        body = response.content.decode(response.encoding or "utf-8", "replace")
+        for real, fake in self.replacements.items():
+            body = body.replace(real, fake)
+        content_type = response.headers.get("Content-Type", "text/html")
+        suffix = "json" if "json" in content_type else "html"
+        name = f"{len(self.entries):03d}_{path.rsplit('/', 1)[-1].split('.')[0]}.{suffix}"
+        (self.directory / name).write_text(body, encoding="utf-8")
+        entry = {"method": request.method, "path": path, "file": name, "content_type": content_type}
+        if form and request.method == "POST":
+            entry["form"] = form
+        self.entries.append(entry)
+        return response
+
+    def save(self):
+        manifest = json.dumps(self.entries, ensure_ascii=False, indent=2)
+        (self.directory / "manifest.json").write_text(manifest + "\n", encoding="utf-8")
+
+
+class ReplayTransport:
+    """``transport=`` for :class:`zfn_api.Client` that replays a fixture directory."""
+
+    def __init__(self, directory):
+        self.adapter = ReplayAdapter(directory)
+
+    def mount(self, session):
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+        return session
+
+
+class RecordingTransport(ReplayTransport):
+    """``transport=`` that records real responses; call :meth:`save` afterwards."""
+
+    def __init__(self, directory, replacements=None, prefix=""):
+        self.adapter = RecordingAdapter(directory, replacements, prefix)
+
+    def save(self):
+        self.adapter.save()
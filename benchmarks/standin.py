@@ -0,0 +1,570 @@
+"""Local stand-in for a Zhengfang teaching system, for load and integration tests.
+
+Speaks the endpoints the mixins call with the payload shapes of the real
+system: the RSA login handshake (``login_slogin`` / ``login_getPublicKey`` /
+``kaptcha``), grades, exams, schedule, academia, block-course selection,
+personal information and notifications. Sessions behave like the real
+deployment behind a load balancer:
+
+* the login page hands out ``JSESSIONID`` plus a sticky ``route`` cookie;
+  a request whose ``route`` does not match its session lands on "another
+  node" and is treated as logged out,
+* sessions expire after ``session_ttl`` idle seconds (or on
+  :meth:`StandInServer.expire`), after which data pages redirect to the
+  login page, which the client reports as code 1006.
+
+Faults and size are configurable at start-up or at runtime through the
+attributes of the same names: ``latency`` + uniform ``jitter`` seconds per
+request, ``error_rate`` (HTTP 500 / 502 / 503) and ``timeout_rate`` (the
+reply is held for ``hang`` seconds), and ``scale`` multiplying every
+list-shaped payload. Any student id logs in with ``password`` unless
+``accounts`` (sid -> password) is given::
+
+    python benchmarks/standin.py --port 8080 --latency 0.02 --error-rate 0.01 --scale 4
+
+    with StandInServer(latency=0.005) as server:
+        client = Client(base_url=server.base_url)
+        client.login("2101010101", "123456")
+"""
+import argparse
+import base64
+import json
+import random
+import secrets
+import socket
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import rsa
+
+from common import _Server
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+HTML = "text/html;charset=utf-8"
+JSON = "application/json;charset=utf-8"
+LOGIN_PATH = "xtgl/login_slogin.html"
+# 缓存的响应体里学号的占位符，发送时替换为当前会话的学号
+SID = "__SID__"
+
+TITLES = ["高等数学", "大学英语", "线性代数", "概率论与数理统计", "数据结构", "操作系统",
+          "计算机网络", "数据库原理", "编译原理", "软件工程", "离散数学", "大学物理"]
+TEACHERS = ["李老师", "王老师", "赵老师", "钱老师", "孙老师", "周老师"]
+CATEGORIES = ["通识教育必修课", "通识教育选修课", "学科基础课", "专业核心课", "专业选修课",
+              "实践教学环节", "创新创业教育", "第二课堂"]
+# 1×1 的 PNG，充当验证码图片
+KAPTCHA_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html lang="zh-CN"><head><meta charset="utf-8"><title>用户登录</title></head>
+<body><div class="login-box">
+<form class="form-horizontal" role="form" action="/{prefix}xtgl/login_slogin.html" method="post">
+  <input type="hidden" id="csrftoken" name="csrftoken" value="{csrf}"/>
+  <h5>用户登录</h5>
+  {tips}
+  <div class="form-group"><input type="text" class="form-control" name="yhm" id="yhm" value=""/></div>
+  <div class="form-group"><input type="password" class="form-control" name="mm" id="mm" value=""/></div>
+  {kaptcha}
+  <button type="button" class="btn btn-primary btn-block" id="dl">登 录</button>
+</form></div></body></html>
+"""
+TIPS = '<p id="tips" class="bg_danger sl_danger">{}</p>'
+KAPTCHA_INPUT = '<div class="form-group"><input type="text" name="yzm" id="yzm" value=""/></div>'
+ERROR_PAGE = "<html><head><title>错误提示</title></head><body><h1>{status}</h1></body></html>"
+
+
+def _b64_int(value):
+    return base64.b64encode(value.to_bytes((value.bit_length() + 7) // 8, "big")).decode()
+
+
+class _Session:
+    __slots__ = ("id", "route", "csrf", "sid", "seen")
+
+    def __init__(self, route):
+        self.id = secrets.token_hex(16).upper()
+        self.route = route
+        self.csrf = secrets.token_hex(16)
+        self.sid = None
+        self.seen = time.monotonic()
+
+
+class StandInServer:
+    """Threaded HTTP/1.1 keep-alive stand-in; see the module docstring."""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        prefix="jwglxt/",
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        timeout_rate=0.0,
+        hang=30.0,
+        scale=1,
+        session_ttl=1800,
+        kaptcha=False,
+        kaptcha_code="1234",
+        accounts=None,
+        password="123456",
+        nodes=2,
+        key_bits=1024,
+        seed=0,
+    ):
+        self.prefix = prefix
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.session_ttl = session_ttl
+        self.kaptcha = kaptcha
+        self.kaptcha_code = kaptcha_code
+        self.accounts = accounts
+        self.password = password
+        self.nodes = [secrets.token_hex(16) for _ in range(nodes)]
+        self.public_key, self.private_key = rsa.newkeys(key_bits)
+        self.seed = seed
+        self.sessions = {}
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._bodies = {}
+        self.scale = scale
+        self.routes = {
+            LOGIN_PATH: self._login,
+            "xtgl/login_getPublicKey.html": self._public_key,
+            "kaptcha": self._kaptcha,
+            "xtgl/index_initMenu.html": self._index,
+            "cjcx/cjcx_cxXsgrcj.html": self._grades,
+            "cjcx/cjcx_cxDgXscj.html": self._grades,
+            "kwgl/kscx_cxXsksxxIndex.html": self._exams,
+            "kbcx/xskbcx_cxXsKb.html": self._schedule,
+            "xsxy/xsxyqk_cxXsxyqkIndex.html": self._academia,
+            "xsxy/xsxyqk_cxJxzxjhxfyqKcxx.html": self._academia_courses,
+            "jxjhgl/common_cxKcJbxx.html": self._fixture("course_category.html"),
+            "xsxk/zzxkyzb_cxZzxkYzbIndex.html": self._fixture("block_head.html"),
+            "xsxk/zzxkyzb_cxZzxkYzbDisplay.html": self._fixture("block_display.html"),
+            "xsxk/zzxkyzb_cxZzxkYzbPartDisplay.html": self._block_courses,
+            "xsxk/zzxkyzb_cxJxbWithKchZzxkYzb.html": self._block_classes,
+            "xsxk/zzxkyzb_cxZzxkYzbChoosedDisplay.html": self._chosen,
+            "xsxk/zzxkyzb_xkBcZyZzxkYzb.html": self._select,
+            "xsxk/zzxkyzb_tuikBcZzxkYzb.html": self._cancel,
+            "xsxxxggl/xsxxwh_cxXsxkxx.html": self._selected,
+            "xsxxxggl/xsxxwh_cxCkDgxsxx.html": self._info_json,
+            "xsxxxggl/xsgrxxwh_cxXsgrxx.html": self._fixture("info.html"),
+            "xszbbgl/xszbbgl_cxXszbbsqIndex.html": self._fixture("info_details.html"),
+            "xtgl/index_cxDbsy.html": self._notifications,
+        }
+        self.public_routes = {LOGIN_PATH, "xtgl/login_getPublicKey.html", "kaptcha"}
+        self.server = _Server((host, port), self._handler())
+        self.base_url = f"http://{host}:{self.server.server_port}/{prefix}"
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, value):
+        self._scale = value
+        self._bodies = {}
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def expire(self, sid=None):
+        """让某学号（默认所有人）的会话立即失效"""
+        with self._lock:
+            for key, session in list(self.sessions.items()):
+                if sid is None or session.sid == str(sid):
+                    del self.sessions[key]
+
+    # 会话
+
+    def _new_session(self):
+        session = _Session(self._rng.choice(self.nodes))
+        with self._lock:
+            self.sessions[session.id] = session
+        return session
+
+    def _session(self, cookies):
+        session = self.sessions.get(cookies.get("JSESSIONID"))
+        if session is None:
+            return None
+        now = time.monotonic()
+        if now - session.seen > self.session_ttl:
+            with self._lock:
+                self.sessions.pop(session.id, None)
+            return None
+        if cookies.get("route") != session.route:
+            return None
+        session.seen = now
+        return session
+
+    # 登录
+
+    def _login_page(self, session, tips=""):
+        page = LOGIN_PAGE.format(
+            prefix=self.prefix,
+            csrf=session.csrf,
+            tips=TIPS.format(tips) if tips else "",
+            kaptcha=KAPTCHA_INPUT if self.kaptcha else "",
+        )
+        return 200, HTML, page
+
+    def _login(self, request, session):
+        if request.command == "GET" or session is None:
+            return self._login_page(session or request.start_session())
+        form = request.form
+        if form.get("csrftoken") != session.csrf:
+            return self._login_page(session, "页面已过期，请刷新后重试！")
+        if self.kaptcha and form.get("yzm") != self.kaptcha_code:
+            return self._login_page(session, "验证码输入错误！")
+        sid = form.get("yhm", "")
+        try:
+            password = rsa.decrypt(base64.b64decode(form.get("mm", "")), self.private_key).decode()
+        except (ValueError, rsa.DecryptionError):
+            password = None
+        expected = self.password if self.accounts is None else self.accounts.get(sid)
+        if not sid or password is None or password != expected:
+            return self._login_page(session, "用户名或密码不正确，请重新输入！")
+        session.sid = sid
+        return request.redirect("xtgl/index_initMenu.html")
+
+    def _public_key(self, request, session):
+        key = {"modulus": _b64_int(self.public_key.n), "exponent": _b64_int(self.public_key.e)}
+        return 200, JSON, key
+
+    def _kaptcha(self, request, session):
+        return 200, "image/png", KAPTCHA_PNG
+
+    def _index(self, request, session):
+        return 200, HTML, f"<html><head><title>教学管理信息服务平台</title></head><body>{session.sid}</body></html>"
+
+    # 数据
+
+    def _fixture(self, name):
+        body = (FIXTURES / name).read_bytes()
+        return lambda request, session: (200, HTML, body)
+
+    def _cached(self, request, key, build):
+        """同一 key 的响应体只生成一次（按 seed 确定），学号在发送时填入"""
+        body = self._bodies.get(key)
+        if body is None:
+            body = build(random.Random(f"{self.seed}:{key}"))
+            if not isinstance(body, str):
+                body = json.dumps(body, ensure_ascii=False)
+            body = self._bodies[key] = body.encode()
+        return body.replace(SID.encode(), (request.student or "").encode())
+
+    def _paged(self, request, name, total, item):
+        size = int(request.form.get("queryModel.showCount") or 15)
+        page = int(request.form.get("queryModel.currentPage") or 1)
+
+        def build(rng):
+            first = (page - 1) * size
+            return {
+                "currentPage": page,
+                "showCount": size,
+                "totalCount": total,
+                "totalPage": max(1, -(-total // size)),
+                "items": [item(rng, n) for n in range(first, min(total, first + size))],
+            }
+
+        return 200, JSON, self._cached(request, (name, page, size), build)
+
+    def _grades(self, request, session):
+        def item(rng, n):
+            grade = rng.randint(55, 99)
+            return {
+                "xh": SID, "xm": "测试学生", "kch_id": f"K{1000 + n}",
+                "kcmc": rng.choice(TITLES), "jsxm": rng.choice(TEACHERS),
+                "jxbmc": f"(2023-2024-1)-K{1000 + n}-1", "xf": rng.choice(["1.0", "2.0", "3.0", "4.0"]),
+                "kclbmc": rng.choice(CATEGORIES), "kcxzmc": rng.choice(["必修", "选修"]),
+                "cj": str(grade), "jd": f"{max(0, (grade - 50) / 10):.2f}", "ksxz": "正常考试",
+                "kkbmmc": "计算机学院", "kcbj": "主修",
+            }
+
+        return self._paged(request, "grades", 40 * self.scale, item)
+
+    def _exams(self, request, session):
+        def item(rng, n):
+            return {
+                "xh": SID, "xm": "测试学生", "kch": f"K{1000 + n}", "kcmc": rng.choice(TITLES),
+                "kssj": f"2024-01-{n % 28 + 1:02d}(09:00-11:00)", "cdmc": f"教{n % 9 + 1}-101",
+                "cdxqmc": "主校区", "zwh": str(n % 60 + 1), "ksmc": "期末考试",
+                "jsxx": f"2001{n:03d}/{rng.choice(TEACHERS)}", "jxbmc": f"K{1000 + n}-1",
+                "kkxy": "计算机学院", "xf": "3.0", "ksfs": "闭卷", "sjbh": f"SJ{n:04d}",
+            }
+
+        return self._paged(request, "exams", 10 * self.scale, item)
+
+    def _notifications(self, request, session):
+        def item(rng, n):
+            kind = rng.choice(["调课提醒", "考试安排", "成绩发布", "选课通知"])
+            return {
+                "xxnr": f"{kind}:您的课程{rng.choice(TITLES)}有新的安排，请及时查看。",
+                "cjsj": f"2024-{n % 4 + 9:02d}-{n % 28 + 1:02d} 08:00:00",
+            }
+
+        return self._paged(request, "notifications", 50 * self.scale, item)
+
+    def _selected(self, request, session):
+        def item(rng, n):
+            return {
+                "kch": f"K{5000 + n}", "jxb_id": f"{n:032x}", "kcmc": rng.choice(TITLES), "xf": "2.0",
+                "jsxm": rng.choice(TEACHERS), "kclbmc": rng.choice(CATEGORIES), "jxdd": "教1-101",
+            }
+
+        return self._paged(request, "selected", 10 * self.scale, item)
+
+    def _schedule(self, request, session):
+        def build(rng):
+            courses = []
+            for n in range(30 * self.scale):
+                start = rng.choice([1, 3, 5, 7, 9])
+                courses.append(
+                    {
+                        "kch_id": f"K{2000 + n}", "kcmc": rng.choice(TITLES), "xm": rng.choice(TEACHERS),
+                        "jxbmc": f"(2024-2025-1)-K{2000 + n}-1", "xf": "3.0", "xqj": str(n % 5 + 1),
+                        "jc": f"{start}-{start + 1}节", "zcd": rng.choice(["1-16周", "1-8周", "9-16周"]),
+                        "khfsmc": "考试", "xqmc": "主校区", "cdmc": f"教{n % 9 + 1}-{101 + n % 400}",
+                        "kcxszc": "理论:32", "zhxs": "2", "zxs": "32",
+                    }
+                )
+            return {
+                "xsxx": {"XH": SID, "XM": "测试学生"},
+                "kbList": courses,
+                "sjkList": [{"qtkcgs": "军事理论 李老师(共16周)/无"}],
+            }
+
+        return 200, JSON, self._cached(request, ("schedule",), build)
+
+    def _academia(self, request, session):
+        def build(rng):
+            blocks = "".join(
+                f'<div class="panel"><span title="{name}&nbsp;要求学分:{10 + i}.0&nbsp;'
+                f'获得学分:{8 + i}.0&nbsp;未获得学分:0">{name}</span>\n'
+                f"<span id='showKc{i + 1:04d}'></span></div>\n"
+                for i, name in enumerate(CATEGORIES)
+            )
+            rows = "".join(
+                f'<tr class="row{i}"><td style="text-align: center;"><a href="javascript:void(0);" '
+                f"onclick=\"showDetail('{i}')\">详情</a></td></tr>\n"
+                for i in range(100 * self.scale)
+            )
+            return (
+                f'<html><body><form id="form"><input type="hidden" id="xh_id" value="{SID}"/></form>\n'
+                '<div id="alertBox">平均学分绩点GPA：3.52 计划总课程50门通过40门，未通过1门；'
+                "未修8门；在读1门；计划外：通过2门，未通过0门</div>\n"
+                f"{blocks}<table>\n{rows}</table></body></html>"
+            )
+
+        return 200, HTML, self._cached(request, ("academia",), build)
+
+    def _academia_courses(self, request, session):
+        category = request.form.get("xfyqjd_id", "")
+
+        def build(rng):
+            return [
+                {
+                    "KCH": f"K{category}{n:03d}", "KCMC": rng.choice(TITLES), "XDZT": "4",
+                    "JYXDXNM": "2022", "JYXDXQMC": "1", "XF": "2.0", "KCLBMC": "通识教育选修课",
+                    "KCXZMC": "选修", "MAXCJ": str(rng.randint(60, 99)), "JD": "3.00",
+                }
+                for n in range(5 * self.scale)
+            ]
+
+        return 200, JSON, self._cached(request, ("academia", category), build)
+
+    def _block_courses(self, request, session):
+        def build(rng):
+            return {
+                "tmpList": [
+                    {"kch_id": f"K{4000 + n}", "kcmc": rng.choice(TITLES), "xf": "2.0"}
+                    for n in range(10 * self.scale)
+                ]
+            }
+
+        return 200, JSON, self._cached(request, ("block",), build)
+
+    def _block_classes(self, request, session):
+        def build(rng):
+            return [
+                {
+                    "jxb_id": f"{n:032x}", "do_jxb_id": f"{n + 1:032x}",
+                    "jsxx": f"2001{n:03d}/{rng.choice(TEACHERS)}/讲师", "xf": "2.0",
+                    "jxbrl": "100", "yxzrs": str(rng.randint(0, 100)),
+                    "jxdd": "教1-101<br/>教2-202", "sksj": "星期二第3-4节{1-16周}<br/>星期四第1-2节{1-8周}",
+                }
+                for n in range(10 * self.scale)
+            ]
+
+        return 200, JSON, self._cached(request, ("classes",), build)
+
+    def _chosen(self, request, session):
+        def build(rng):
+            return [
+                {
+                    "kch": f"K{4000 + n}", "jxb_id": f"{n:032x}", "do_jxb_id": f"{n + 1:032x}",
+                    "kcmc": rng.choice(TITLES), "jsxx": f"2001{n:03d}/{rng.choice(TEACHERS)}/讲师",
+                    "xf": "2.0", "kklxmc": "板块课", "jxbrs": "100", "yxzrs": "50",
+                    "jxdd": "教1-101", "sksj": "星期二第3-4节{1-16周}", "zixf": "0", "sxbj": "1",
+                }
+                for n in range(5 * self.scale)
+            ]
+
+        return 200, JSON, self._cached(request, ("chosen",), build)
+
+    def _select(self, request, session):
+        return 200, JSON, {"flag": "1", "msg": "选课成功"}
+
+    def _cancel(self, request, session):
+        return 200, HTML, "1"
+
+    def _info_json(self, request, session):
+        return 200, JSON, {"xh": session.sid, "xm": "测试学生", "jg_id": "计算机学院", "zyh_id": "软件工程",
+                           "bh_id": "软件2101", "xjztdm": "在读", "sjhm": "13800000000"}
+
+    # HTTP
+
+    def _fault(self):
+        """按配置返回要注入的错误状态码，或 None"""
+        roll = self._rng.random()
+        if roll < self.timeout_rate:
+            time.sleep(self.hang)
+            return 504
+        if roll < self.timeout_rate + self.error_rate:
+            return self._rng.choice([500, 502, 503])
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode() if length else ""
+                self.form = {key: values[0] for key, values in parse_qs(body).items()}
+                self.set_cookies = []
+                cookies = dict(
+                    part.strip().split("=", 1)
+                    for part in (self.headers.get("Cookie") or "").split(";")
+                    if "=" in part
+                )
+                path = urlsplit(self.path).path.lstrip("/")
+                if path.startswith(server.prefix):
+                    path = path[len(server.prefix) :]
+                delay = server.latency + (server._rng.uniform(0, server.jitter) if server.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+                route = server.routes.get(path)
+                status = server._fault()
+                if status is not None:
+                    reply = (status, HTML, ERROR_PAGE.format(status=status))
+                elif route is None:
+                    reply = (404, HTML, ERROR_PAGE.format(status=404))
+                else:
+                    session = server._session(cookies)
+                    self.student = session.sid if session else None
+                    if path not in server.public_routes and (session is None or session.sid is None):
+                        reply = self.redirect(LOGIN_PATH)
+                    else:
+                        reply = route(self, session)
+                with server._lock:
+                    server.stats[(path, reply[0])] += 1
+                try:
+                    self._send(*reply)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 客户端已超时断开（注入的超时正是为此）
+                    self.close_connection = True
+
+            def start_session(self):
+                session = server._new_session()
+                self.set_cookies.append(f"JSESSIONID={session.id}; Path=/{server.prefix}; HttpOnly")
+                self.set_cookies.append(f"route={session.route}; Path=/")
+                return session
+
+            def redirect(self, path):
+                return 302, HTML, b"", {"Location": f"/{server.prefix}{path}"}
+
+            def _send(self, status, content_type, body, headers=None):
+                if not isinstance(body, (str, bytes)):
+                    body = json.dumps(body, ensure_ascii=False)
+                if isinstance(body, str):
+                    body = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for cookie in self.set_cookies:
+                    self.send_header("Set-Cookie", cookie)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--prefix", default="jwglxt/")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 5xx replies")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of replies held back")
+    parser.add_argument("--hang", type=float, default=30.0, help="seconds a held-back reply waits")
+    parser.add_argument("--scale", type=int, default=1, help="multiplier for list payload sizes")
+    parser.add_argument("--session-ttl", type=float, default=1800, help="idle seconds until expiry")
+    parser.add_argument("--kaptcha", action="store_true", help="require the kaptcha on login")
+    parser.add_argument("--password", default="123456", help="password accepted for every sid")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        host=args.host,
+        port=args.port,
+        prefix=args.prefix,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang=args.hang,
+        scale=args.scale,
+        session_ttl=args.session_ttl,
+        kaptcha=args.kaptcha,
+        password=args.password,
+    )
+    print(f"serving {server.base_url} (any sid, password {args.password!r})")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
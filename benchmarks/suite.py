@@ -0,0 +1,257 @@
+"""Offline regression benchmark over recorded teaching-system responses.
+
+Every endpoint below runs against ``benchmarks/fixtures`` through
+:class:`replay.ReplayTransport`, so no network or server is involved. For
+each one the suite reports
+
+* wall-clock latency (median / p95) and CPU time per call,
+* how that CPU time splits into ``parse`` (HTML / JSON decoding: pyquery,
+  lxml, json, the parser backends), ``transform`` (the rest of this package:
+  building the result) and ``transport`` (requests, urllib3 and the replay
+  adapter); the shares come from a separate ``cProfile`` pass,
+* the tracemalloc peak of a single call.
+
+``--save`` stores the numbers in ``benchmarks/baseline.json``; later runs
+compare against it and exit with status 1 when a method's latency or peak
+memory grows by more than ``--threshold``. Latencies are divided by a fixed
+pure-Python calibration loop measured in the same run, so a baseline saved on
+one machine is roughly usable on another. Refresh the fixtures from a real
+account with ``--record`` (see ``--help``)::
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --save
+    python benchmarks/suite.py --only get_academia --repeat 200
+"""
+import argparse
+import cProfile
+import gc
+import json
+import pstats
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from common import load_package, report
+from replay import RecordingTransport, ReplayTransport
+
+zfn_api = load_package()
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+FIXTURES = HERE / "fixtures"
+BASELINE = HERE / "baseline.json"
+BASE_URL = "https://jwxt.example.edu.cn/jwglxt/"
+
+CASES = {
+    "get_grade": lambda client: client.get_grade(2023, 1),
+    "get_schedule": lambda client: client.get_schedule(2024, 1),
+    "get_academia": lambda client: client.get_academia(),
+    "get_block_courses": lambda client: client.get_block_courses(2024, 1, 1),
+    "_get_info": lambda client: client._get_info(),
+    "get_notifications": lambda client: client.get_notifications(),
+}
+
+PARSE_MODULES = re.compile(r"[/\\](pyquery|lxml|cssselect|json|charset_normalizer|chardet)[/\\]")
+PARSE_FUNCTIONS = {"json", "text", "apparent_encoding"}
+
+
+def make_client(transport):
+    return zfn_api.Client(
+        cookies={"JSESSIONID": "0123456789ABCDEF", "route": "bench"},
+        base_url=BASE_URL,
+        transport=transport,
+        detail_category_type=["通识教育选修课"],
+        max_workers=1,
+    )
+
+
+def calibrate(rounds=7):
+    """固定的纯 Python 负载耗时（毫秒），用于在不同机器间归一化"""
+    payload = json.dumps([{"id": n, "title": f"课程{n}", "weeks": "1-16周"} for n in range(400)])
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(20):
+            items = json.loads(payload)
+            "".join(re.sub(r"\d+", "#", item["title"]) for item in items)
+            sorted(items, key=lambda item: (item["weeks"], -item["id"]))
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def _category(func):
+    filename, _, name = func
+    if filename == "~":
+        return None
+    if PARSE_MODULES.search(filename) or filename.endswith("parsing.py"):
+        return "parse"
+    if filename.endswith("models.py") and name in PARSE_FUNCTIONS:
+        return "parse"
+    if Path(filename).resolve().parent == ROOT:
+        return "transform"
+    return "transport"
+
+
+def breakdown(call, client, rounds):
+    """cProfile 下 parse / transform / transport 各占 CPU 时间的比例
+
+    内置函数（C 实现的 lxml / json 等）没有文件名，按调用方所属部分分摊。
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    for _ in range(rounds):
+        call(client)
+    profile.disable()
+    stats = pstats.Stats(profile).stats
+    totals = {"parse": 0.0, "transform": 0.0, "transport": 0.0}
+    for func, (_, _, tottime, _, callers) in stats.items():
+        category = _category(func)
+        if category is not None:
+            totals[category] += tottime
+            continue
+        share = sum(caller[2] for caller in callers.values()) or 1.0
+        for caller, caller_stats in callers.items():
+            totals[_category(caller) or "transport"] += tottime * caller_stats[2] / share
+    total = sum(totals.values()) or 1.0
+    return {key: value / total for key, value in totals.items()}
+
+
+def measure(name, call, repeat):
+    client = make_client(ReplayTransport(FIXTURES))
+    result = call(client)
+    if result.get("code") != 1000:
+        raise SystemExit(f"{name} 回放失败：{result}")
+    gc.collect()
+    gc.disable()
+    try:
+        wall, cpu = [], []
+        for _ in range(repeat):
+            start, start_cpu = time.perf_counter(), time.process_time()
+            call(client)
+            wall.append((time.perf_counter() - start) * 1000)
+            cpu.append((time.process_time() - start_cpu) * 1000)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    call(client)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    wall.sort()
+    cpu_ms = statistics.median(cpu)
+    shares = breakdown(call, client, max(5, repeat // 10))
+    return {
+        "latency_ms": statistics.median(wall),
+        "p95_ms": wall[min(len(wall) - 1, int(len(wall) * 0.95))],
+        "cpu_ms": cpu_ms,
+        "peak_kb": peak / 1024,
+        **{f"{key}_ms": cpu_ms * share for key, share in shares.items()},
+    }
+
+
+def compare(results, calibration, baseline, threshold):
+    """与基线比较，返回超出阈值的 (方法, 指标, 变化比例)"""
+    regressions = []
+    scale = baseline["calibration_ms"] / calibration
+    for name, current in results.items():
+        previous = baseline["methods"].get(name)
+        if previous is None:
+            continue
+        for metric, factor in (("latency_ms", scale), ("peak_kb", 1.0)):
+            change = current[metric] * factor / previous[metric] - 1
+            current[f"{metric}_change"] = change
+            if change > threshold:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+def record(args):
+    """用真实账号把 CASES 各请求一次并录制为脱敏的 fixtures"""
+    from urllib.parse import urlsplit
+
+    replacements = dict(item.split("=", 1) for item in args.anonymize)
+    transport = RecordingTransport(args.output, replacements, urlsplit(args.record).path)
+    client = zfn_api.Client(
+        cookies=json.loads(args.cookies), base_url=args.record, transport=transport, max_workers=1
+    )
+    for name, call in CASES.items():
+        print(name, call(client).get("code"))
+    transport.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="run these methods only")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed growth, 0.25 = 25%%")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    parser.add_argument("--record", metavar="BASE_URL", help="record fixtures from a live system")
+    parser.add_argument("--cookies", default="{}", help="logged-in cookies (JSON) for --record")
+    parser.add_argument(
+        "--anonymize", nargs="*", default=[], metavar="REAL=FAKE", help="strings replaced when recording"
+    )
+    parser.add_argument("--output", type=Path, default=FIXTURES, help="fixture directory for --record")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args)
+        return
+
+    calibration = calibrate()
+    names = args.only or list(CASES)
+    results = {name: measure(name, CASES[name], args.repeat) for name in names}
+
+    regressions = []
+    if args.baseline.exists() and not args.save:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, calibration, baseline, args.threshold)
+
+    if args.json:
+        print(json.dumps({"calibration_ms": calibration, "methods": results}, indent=2))
+    else:
+        rows = []
+        for name, r in results.items():
+            row = {
+                "method": name,
+                "latency_ms": round(r["latency_ms"], 3),
+                "p95_ms": round(r["p95_ms"], 3),
+                "cpu_ms": round(r["cpu_ms"], 3),
+                "parse_ms": round(r["parse_ms"], 3),
+                "transform_ms": round(r["transform_ms"], 3),
+                "transport_ms": round(r["transport_ms"], 3),
+                "peak_kb": round(r["peak_kb"], 1),
+            }
+            if "latency_ms_change" in r:
+                row["vs_baseline"] = (
+                    f"{r['latency_ms_change']:+.0%} time, {r['peak_kb_change']:+.0%} mem"
+                )
+            rows.append(row)
+        report(f"offline suite, {args.repeat} calls each, calibration {calibration:.2f} ms", rows)
+
+    if args.save:
+        previous = {}
+        if args.baseline.exists():
+            previous = json.loads(args.baseline.read_text(encoding="utf-8"))["methods"]
+        previous.update(
+            {
+                name: {"latency_ms": round(r["latency_ms"], 4), "peak_kb": round(r["peak_kb"], 1)}
+                for name, r in results.items()
+            }
+        )
+        baseline = {"calibration_ms": round(calibration, 4), "methods": previous}
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"\nbaseline saved to {args.baseline}")
+    for name, metric, change in regressions:
+        print(f"REGRESSION {name}: {metric} {change:+.0%} (threshold {args.threshold:+.0%})")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
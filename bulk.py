@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from .async_client import AsyncClient
+from .client import Client
+from .transport import SharedTransport
+
+
+class RateLimiter:
+    """Per-host token bucket shared by every client that is handed it.
+
+    Clients built with ``rate_limiter=`` take one token before each upstream
+    request, so ``rate`` caps requests per second per host regardless of how
+    many students are being served; ``burst`` requests may go out back to back.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.interval = 1.0 / rate
+        self.burst = max(1, burst)
+        self._tat = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat.get(host, now), now)
+            self._tat[host] = tat + self.interval
+            return max(0.0, tat - now - (self.burst - 1) * self.interval)
+
+    def acquire(self, url):
+        delay = self._reserve(url)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, url):
+        delay = self._reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class Job:
+    """One unit of bulk work: an API method call for one student.
+
+    Give either ``cookies`` of an existing session or ``sid``/``password`` to
+    log in first (through ``ensure_login`` so a ``session_store`` is reused).
+    ``tag`` is passed through untouched to identify the result.
+    """
+
+    __slots__ = ("operation", "args", "kwargs", "cookies", "sid", "password", "base_url", "tag")
+
+    def __init__(
+        self,
+        operation,
+        args=(),
+        kwargs=None,
+        cookies=None,
+        sid=None,
+        password=None,
+        base_url=None,
+        tag=None,
+    ):
+        self.operation = operation
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.cookies = cookies
+        self.sid = sid
+        self.password = password
+        self.base_url = base_url
+        self.tag = tag
+
+    def __repr__(self):
+        return f"<Job {self.operation}{self.args} sid={self.sid} tag={self.tag}>"
+
+
+class BulkRunner:
+    """Runs many :class:`Job` objects with bounded concurrency.
+
+    Results are streamed back as ``(job, result)`` pairs in completion order,
+    from :meth:`run` (threads + :class:`Client`) or :meth:`arun` (an async
+    iterator over :class:`AsyncClient`)::
+
+        runner = BulkRunner(base_url, concurrency=50, rate_limit=200)
+        for job, result in runner.run(Job("get_grade", (2024, 1), sid=s, password=p) for s, p in accounts):
+            ...
+        print(runner.summary())
+
+    :param concurrency: jobs in flight at once
+    :param rate_limit: upstream requests per second per host, ``None`` for no limit
+    :param client_options: extra keyword arguments for every client
+    """
+
+    def __init__(self, base_url, concurrency=20, rate_limit=None, burst=None, **client_options):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rate_limiter = (
+            RateLimiter(rate_limit, burst or concurrency) if rate_limit else None
+        )
+        client_options.setdefault("transport", SharedTransport(max_connections=concurrency))
+        self.client_options = client_options
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清空统计数据"""
+        with self._lock:
+            self.started = None
+            self.finished = None
+            self.completed = 0
+            self.codes = {}
+
+    def summary(self):
+        """吞吐量与返回码分布"""
+        with self._lock:
+            end = self.finished or time.perf_counter()
+            elapsed = end - self.started if self.started else 0.0
+            return {
+                "completed": self.completed,
+                "elapsed": round(elapsed, 3),
+                "throughput": round(self.completed / elapsed, 2) if elapsed else 0.0,
+                "codes": dict(sorted(self.codes.items(), key=lambda item: str(item[0]))),
+            }
+
+    def _client_kwargs(self, job):
+        return {
+            "base_url": job.base_url or self.base_url,
+            "sid": job.sid,
+            "rate_limiter": self.rate_limiter,
+            **self.client_options,
+        }
+
+    def _record(self, result):
+        code = result.get("code") if isinstance(result, dict) else "other"
+        with self._lock:
+            self.completed += 1
+            self.codes[code] = self.codes.get(code, 0) + 1
+
+    def _execute(self, job):
+        try:
+            client = Client(job.cookies, **self._client_kwargs(job))
+            if not job.cookies and job.password is not None:
+                login = client.ensure_login(job.sid, job.password)
+                if login["code"] != 1000:
+                    return login
+            return getattr(client, job.operation)(*job.args, **job.kwargs)
+        except Exception as e:
+            return {"code": 999, "msg": f"批量任务未记录的错误：{str(e)}"}
+
+    async def _aexecute(self, job):
+        try:
+            async with AsyncClient(job.cookies, **self._client_kwargs(job)) as client:
+                if not job.cookies and job.password is not None:
+                    login = await client.ensure_login(job.sid, job.password)
+                    if login["code"] != 1000:
+                        return login
+                return await getattr(client, job.operation)(*job.args, **job.kwargs)
+        except Exception as e:
+            return {"code": 999, "msg": f"批量任务未记录的错误：{str(e)}"}
+
+    def run(self, jobs):
+        """在线程池中执行任务，按完成顺序逐个产出 ``(job, result)``"""
+        jobs = iter(jobs)
+        self.started = self.started or time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            pending = {}
+            while True:
+                while len(pending) < self.concurrency:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    pending[pool.submit(self._execute, job)] = job
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    self._record(result)
+                    yield pending.pop(future), result
+        self.finished = time.perf_counter()
+
+    async def arun(self, jobs):
+        """在事件循环中执行任务，按完成顺序逐个产出 ``(job, result)``"""
+        jobs = iter(jobs)
+        self.started = self.started or time.perf_counter()
+        pending = {}
+        try:
+            while True:
+                while len(pending) < self.concurrency:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    pending[asyncio.ensure_future(self._aexecute(job))] = job
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    self._record(result)
+                    yield pending.pop(task), result
+        finally:
+            for task in pending:
+                task.cancel()
+            transport = self.client_options.get("transport")
+            if transport is not None:
+                await transport.aclose()
+        self.finished = time.perf_counter()
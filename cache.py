@@ -0,0 +1,185 @@
+import copy
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 默认缓存的读接口及其有效期（秒）
+DEFAULT_TTL = {
+    "get_info": 3600,
+    "get_schedule": 600,
+    "get_grade": 300,
+}
+
+
+class MemoryBackend:
+    """In-process LRU store with per-entry expiry."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (copy.deepcopy(value), time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, base_url=None, sid=None, endpoint=None):
+        pattern = (base_url, sid, endpoint)
+        with self._lock:
+            for key in list(self._data):
+                if all(p is None or p == k for p, k in zip(pattern, key)):
+                    del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """On-disk LRU store that several worker processes can share."""
+
+    def __init__(self, path, maxsize=100000):
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "base_url TEXT, sid TEXT, endpoint TEXT, args TEXT, value TEXT, "
+                "expires REAL, accessed REAL, "
+                "PRIMARY KEY (base_url, sid, endpoint, args))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires FROM responses "
+                "WHERE base_url = ? AND sid = ? AND endpoint = ? AND args = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM responses "
+                    "WHERE base_url = ? AND sid = ? AND endpoint = ? AND args = ?",
+                    key,
+                )
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed = ? "
+                "WHERE base_url = ? AND sid = ? AND endpoint = ? AND args = ?",
+                (now, *key),
+            )
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, json.dumps(value, ensure_ascii=False), now + ttl, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.maxsize:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE rowid IN "
+                    "(SELECT rowid FROM responses ORDER BY accessed LIMIT ?)",
+                    (count - self.maxsize,),
+                )
+
+    def invalidate(self, base_url=None, sid=None, endpoint=None):
+        clauses, params = [], []
+        for column, value in (("base_url", base_url), ("sid", sid), ("endpoint", endpoint)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses" + where, params)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+class ResponseCache:
+    """Per-student TTL cache for read endpoints.
+
+    Entries are keyed by ``(base_url, sid, endpoint, args)`` and only
+    successful (``code == 1000``) results are stored. One cache can be shared
+    by any number of clients::
+
+        cache = ResponseCache(ttl={"get_grade": 120})
+        stu = Client(base_url=base_url, cache=cache)
+
+    :param backend: ``MemoryBackend`` (default) or ``SQLiteBackend``
+    :param ttl: endpoint name -> seconds, merged over ``DEFAULT_TTL``; a TTL
+        of ``0`` disables caching for that endpoint
+    """
+
+    def __init__(self, backend=None, ttl=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+    def caches(self, endpoint):
+        return self.ttl.get(endpoint, 0) > 0
+
+    @staticmethod
+    def make_key(base_url, sid, endpoint, arguments):
+        return (base_url, str(sid), endpoint, json.dumps(arguments, sort_keys=True, default=str))
+
+    def get(self, key):
+        value = self.backend.get(key)
+        counter = self.misses if value is None else self.hits
+        with self._lock:
+            counter[key[2]] = counter.get(key[2], 0) + 1
+        return value
+
+    def set(self, key, result):
+        if isinstance(result, dict) and result.get("code") == 1000:
+            self.backend.set(key, result, self.ttl[key[2]])
+
+    def invalidate(self, base_url=None, sid=None, endpoint=None):
+        """按 base_url / 学号 / 接口名清除缓存，参数留空表示不限"""
+        self.backend.invalidate(base_url, None if sid is None else str(sid), endpoint)
+
+    def stats(self):
+        """各接口的命中与未命中次数"""
+        with self._lock:
+            endpoints = sorted(set(self.hits) | set(self.misses))
+            return {
+                "size": len(self.backend),
+                "endpoints": {
+                    name: {"hits": self.hits.get(name, 0), "misses": self.misses.get(name, 0)}
+                    for name in endpoints
+                },
+            }
@@ -1,4 +1,12 @@
+import functools
+import inspect
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests import exceptions
 from urllib.parse import urljoin
 
 from .academia import AcademiaMixin
@@ -10,9 +18,30 @@ from .notifications import NotificationMixin
 from .schedule import ScheduleMixin
 from .utils import UtilsMixin
 from .constants import RASPIANIE
+from .parsing import get_parser
+from .flow import DOWNLOAD_CHUNK_SIZE, EMIT_CHUNKS, ApiError, Emit, Request
+from .hooks import CallEvent, RequestEvent
+from .resilience import CircuitBreaker
+from .timetable import Timetable
+
+_signature = functools.lru_cache(maxsize=None)(inspect.signature)
+
+
+class DeadlineExceeded(exceptions.Timeout):
+    """调用方设定的截止时间耗尽导致的超时，接口仍按超时（1003）返回"""
+
+
+class _Deadline:
+    """一次调用的截止时间（monotonic 秒），并记录是否因预算耗尽而超时"""
+
+    __slots__ = ("at", "exceeded")
 
+    def __init__(self, seconds):
+        self.at = time.monotonic() + seconds
+        self.exceeded = False
 
-class Client(
+
+class BaseClient(
     UtilsMixin,
     AuthMixin,
     InfoMixin,
@@ -22,7 +51,7 @@ class Client(
     NotificationMixin,
     CourseMixin,
 ):
-    """Main client for interacting with the teaching system."""
+    """Configuration and API surface shared by the sync and async clients."""
 
     raspisanie = []
     ignore_type = []
@@ -34,9 +63,29 @@ class Client(
         self.raspisanie = kwargs.get("raspisanie", RASPIANIE)
         self.ignore_type = kwargs.get("ignore_type", [])
         self.detail_category_type = kwargs.get("detail_category_type", [])
+        if "category_cache" in kwargs:
+            self.category_cache = kwargs["category_cache"]
+        self.category_ttl = kwargs.get("category_ttl", self.category_ttl)
         self.timeout = kwargs.get("timeout", 3)
-        Client.raspisanie = self.raspisanie
-        Client.ignore_type = self.ignore_type
+        self.transport = kwargs.get("transport")
+        self.cache = kwargs.get("cache")
+        self.sid = kwargs.get("sid")
+        self.max_workers = kwargs.get("max_workers", 4)
+        self.cache_public_key = kwargs.get("cache_public_key", True)
+        self.rate_limiter = kwargs.get("rate_limiter")
+        self.parser = get_parser(kwargs.get("parser"))
+        self.hooks = list(kwargs.get("hooks") or ())
+        self.profile = kwargs.get("profile", False)
+        self.deadline = kwargs.get("deadline")
+        self.retry = kwargs.get("retry")
+        self.hedge = kwargs.get("hedge")
+        self.circuit_breaker = kwargs.get("circuit_breaker")
+        if self.circuit_breaker is True:
+            self.circuit_breaker = CircuitBreaker.shared(self.base_url)
+        elif not self.circuit_breaker:
+            self.circuit_breaker = None
+        BaseClient.raspisanie = self.raspisanie
+        BaseClient.ignore_type = self.ignore_type
 
         self.key_url = urljoin(self.base_url, "xtgl/login_getPublicKey.html")
         self.login_url = urljoin(self.base_url, "xtgl/login_slogin.html")
@@ -55,5 +104,345 @@ class Client(
             "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,"
             "application/signed-exchange;v=b3"
         )
-        self.sess = requests.Session()
         self.cookies = cookies
+        self.session_store = kwargs.get("session_store")
+        self.session_trust = kwargs.get("session_trust", 60)
+        self._session_verified_at = None
+        if not self.cookies and self.sid:
+            self._restore_session()
+
+    def add_hook(self, hook):
+        """注册钩子，见 :class:`MetricsCollector`
+
+        钩子对象可实现 ``before_request(event)`` / ``after_request(event)``
+        （每个上游请求，:class:`RequestEvent`）与 ``after_parse(event)``
+        （每次接口调用，:class:`CallEvent`）中的任意几个。
+        """
+        self.hooks.append(hook)
+        return hook
+
+    def _emit(self, name, event):
+        for hook in self.hooks:
+            method = getattr(hook, name, None)
+            if method is not None:
+                method(event)
+
+    def _trace(self, flow, profile=False):
+        """注册了钩子或开启 profile 时为本次调用建立 CallEvent 并包装流程，否则原样返回"""
+        if not self.hooks and not profile:
+            return None, flow
+        trace = CallEvent(flow.__name__, profile)
+        return trace, trace.wrap(flow)
+
+    def _request_started(self, trace, request):
+        event = RequestEvent(trace.endpoint, request)
+        trace.requests.append(event)
+        self._emit("before_request", event)
+        return event
+
+    def _request_finished(self, event, response=None, error=None):
+        event.finish(response, error)
+        self._emit("after_request", event)
+
+    def _call_finished(self, trace, result):
+        trace.finish(result)
+        if trace.phases is not None and isinstance(result, dict):
+            result["profile"] = trace.profile()
+        self._emit("after_parse", trace)
+
+    @staticmethod
+    def _deadline_at(deadline):
+        return None if deadline is None else _Deadline(deadline)
+
+    @staticmethod
+    def _within_deadline(request, deadline):
+        """按剩余预算收紧请求的超时；预算已用完时抛出 DeadlineExceeded，接口按超时（1003）返回"""
+        remaining = deadline.at - time.monotonic()
+        if remaining <= 0:
+            deadline.exceeded = True
+            raise DeadlineExceeded("已超过本次调用的截止时间")
+        timeout = request.kwargs.get("timeout")
+        if isinstance(timeout, tuple):
+            timeout = tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        else:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return Request(request.method, request.url, **{**request.kwargs, "timeout": timeout})
+
+    @staticmethod
+    def _deadline_timeout(error, request, limited, deadline):
+        """超时发生在被预算收紧的请求上时归因于截止时间，而不是上游故障"""
+        if limited.kwargs.get("timeout") == request.kwargs.get("timeout"):
+            return error
+        deadline.exceeded = True
+        return DeadlineExceeded(str(error))
+
+    @staticmethod
+    def _sleep_fits(delay, deadline):
+        return deadline is None or time.monotonic() + delay < deadline.at
+
+    def _hedge_endpoint(self, flow):
+        """需要对冲的接口返回其名称，否则为 None"""
+        if self.hedge is None or not self.hedge.hedges_endpoint(flow.__name__):
+            return None
+        return flow.__name__
+
+    def _attempt_delays(self, endpoint):
+        if self.retry is None:
+            return (0.0,)
+        return self.retry.delays(endpoint)
+
+    def _attempt_failed(self, result):
+        """记录调用结果，返回是否应当重试"""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(result)
+        return self.retry is not None and self.retry.should_retry(result)
+
+    def timetable(self, schedule, term_start):
+        """按本客户端的上下课时间 ``raspisanie`` 为课表结果建立 :class:`Timetable`"""
+        return Timetable(schedule, term_start, self.raspisanie)
+
+    def invalidate_cache(self, endpoint=None):
+        """清除当前学生（可指定接口）的响应缓存"""
+        identity = self._cache_identity()
+        if self.cache is not None and identity:
+            self.cache.invalidate(self.base_url, identity, endpoint)
+
+    def _cache_identity(self):
+        return self.sid or self.cookies.get("JSESSIONID")
+
+    def _cache_key(self, func, args, kwargs):
+        if self.cache is None or not self.cache.caches(func.__name__):
+            return None
+        identity = self._cache_identity()
+        if not identity:
+            return None
+        bound = _signature(func).bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        del arguments["self"]
+        return self.cache.make_key(self.base_url, identity, func.__name__, arguments)
+
+    def _finish_call(self, key, result):
+        """缓存成功结果；会话失效时同时清除会话存储中的记录"""
+        if key is not None:
+            self.cache.set(key, result)
+        if isinstance(result, dict) and result.get("code") == 1006:
+            self._forget_session()
+        return result
+
+    @staticmethod
+    def _download_options(request):
+        """Split a sink request into (sink, chunk size, kwargs for the HTTP library)."""
+        kwargs = dict(request.kwargs)
+        sink = kwargs.pop("sink", None)
+        chunk_size = kwargs.pop("chunk_size", None) or DOWNLOAD_CHUNK_SIZE
+        return sink, chunk_size, kwargs
+
+    @staticmethod
+    def _is_document(headers, first_chunk):
+        """HTML/JSON 响应（通常是错误页）不作为文件流式下载"""
+        content_type = headers.get("Content-Type", "").lower()
+        if "html" in content_type or "json" in content_type:
+            return True
+        return first_chunk.lstrip()[:1] in (b"<", b"{")
+
+    def _call(self, func, args, kwargs):
+        raise NotImplementedError
+
+    def _session_cookies(self):
+        raise NotImplementedError
+
+
+class Client(BaseClient):
+    """Main client for interacting with the teaching system."""
+
+    def __init__(self, cookies=None, **kwargs):
+        super().__init__(cookies, **kwargs)
+        self.sess = requests.Session()
+        if self.transport is not None:
+            self.transport.mount(self.sess)
+
+    def _call(self, func, args, kwargs):
+        profile = kwargs.pop("profile", self.profile)
+        deadline = self._deadline_at(kwargs.pop("deadline", self.deadline))
+        key = None if profile else self._cache_key(func, args, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        for delay in self._attempt_delays(func.__name__):
+            if delay:
+                if not self._sleep_fits(delay, deadline):
+                    break
+                time.sleep(delay)
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+                result = self.circuit_breaker.rejected()
+                break
+            result = self._run(func(self, *args, **kwargs), profile, deadline)
+            if deadline is not None and deadline.exceeded:
+                # 调用方自己的预算耗尽，不是上游故障：不计入熔断器，也不重试
+                break
+            if not self._attempt_failed(result):
+                break
+        return self._finish_call(key, result)
+
+    def _run(self, flow, profile=False, deadline=None):
+        """Drive an endpoint flow to completion with blocking requests."""
+        hedge = self._hedge_endpoint(flow)
+        trace, flow = self._trace(flow, profile)
+        try:
+            request = next(flow)
+            while True:
+                try:
+                    response = self._send(request, trace, deadline, hedge)
+                except Exception as e:
+                    request = flow.throw(e)
+                else:
+                    request = flow.send(response)
+        except StopIteration as stop:
+            if trace is not None:
+                self._call_finished(trace, stop.value)
+            return stop.value
+
+    def _stream(self, flow):
+        """Drive a streaming flow, yielding the records it emits."""
+        trace, flow = self._trace(flow)
+        try:
+            request = next(flow)
+            while True:
+                if isinstance(request, Emit):
+                    yield from request.items
+                    request = flow.send(None)
+                    continue
+                try:
+                    if getattr(request, "kwargs", {}).get("sink") is EMIT_CHUNKS:
+                        if trace is None:
+                            response = yield from self._iter_download(request)
+                        else:
+                            response = yield from self._traced_download(trace, request)
+                    else:
+                        response = self._send(request, trace)
+                except Exception as e:
+                    request = flow.throw(e)
+                else:
+                    request = flow.send(response)
+        except StopIteration as stop:
+            if trace is not None:
+                self._call_finished(trace, stop.value)
+            if stop.value is not None and stop.value.get("code") != 1000:
+                raise ApiError(stop.value) from None
+
+    def _send(self, request, trace=None, deadline=None, hedge=None):
+        if isinstance(request, list):
+            return self._send_batch(request, trace, deadline)
+        if deadline is None:
+            return self._traced_send(request, trace, hedge)
+        limited = self._within_deadline(request, deadline)
+        try:
+            return self._traced_send(limited, trace, hedge)
+        except exceptions.Timeout as e:
+            raise self._deadline_timeout(e, request, limited, deadline) from e
+
+    def _traced_send(self, request, trace, hedge):
+        if trace is None:
+            return self._deliver(request, hedge)
+        event = self._request_started(trace, request)
+        try:
+            response = self._deliver(request, hedge)
+        except Exception as e:
+            self._request_finished(event, error=e)
+            raise
+        self._request_finished(event, response)
+        return response
+
+    def _deliver(self, request, hedge=None):
+        sink = request.kwargs.get("sink")
+        if sink is not None:
+            chunks = self._iter_download(request)
+            try:
+                while True:
+                    sink(next(chunks))
+            except StopIteration as stop:
+                return stop.value
+        if hedge is not None:
+            return self._hedged(request, hedge)
+        return self._fetch(request)
+
+    def _fetch(self, request):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(request.url)
+        return self.sess.request(request.method, request.url, **request.kwargs)
+
+    def _hedged(self, request, endpoint):
+        """请求超过对冲延迟仍未返回时再发一份，取先成功的响应"""
+        policy = self.hedge
+        outcomes = queue.Queue()
+
+        def attempt():
+            start = time.perf_counter()
+            try:
+                response = self._fetch(request)
+            except Exception as e:
+                outcomes.put((None, e))
+                return
+            policy.observe(endpoint, time.perf_counter() - start)
+            outcomes.put((response, None))
+
+        threading.Thread(target=attempt, daemon=True).start()
+        try:
+            response, error = outcomes.get(timeout=policy.delay(endpoint))
+        except queue.Empty:
+            if not policy.try_hedge():
+                response, error = outcomes.get()
+            else:
+                threading.Thread(target=attempt, daemon=True).start()
+                response, error = outcomes.get()
+                if error is not None:
+                    response, second_error = outcomes.get()
+                    if second_error is None:
+                        error = None
+        if error is not None:
+            raise error
+        return response
+
+    def _iter_download(self, request):
+        """Yield the body of ``request`` chunk by chunk, then return the response.
+
+        Error pages are buffered into ``response.content`` and nothing is
+        yielded; for a streamed body ``response.content`` is left empty.
+        """
+        _, chunk_size, kwargs = self._download_options(request)
+        kwargs["stream"] = True
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(request.url)
+        with self.sess.request(request.method, request.url, **kwargs) as response:
+            chunks = response.iter_content(chunk_size)
+            first = next(chunks, b"")
+            if self._is_document(response.headers, first):
+                response._content = first + b"".join(chunks)
+                return response
+            if first:
+                yield first
+            yield from chunks
+            response._content = b""
+            return response
+
+    def _traced_download(self, trace, request):
+        event = self._request_started(trace, request)
+        try:
+            response = yield from self._iter_download(request)
+        except Exception as e:
+            self._request_finished(event, error=e)
+            raise
+        self._request_finished(event, response)
+        return response
+
+    def _send_batch(self, batch, trace=None, deadline=None):
+        if len(batch) <= 1 or self.max_workers <= 1:
+            return [self._send(request, trace, deadline) for request in batch]
+        with ThreadPoolExecutor(min(self.max_workers, len(batch))) as pool:
+            futures = [pool.submit(self._send, request, trace, deadline) for request in batch]
+        return [future.result() for future in futures]
+
+    def _session_cookies(self):
+        return self.sess.cookies.get_dict()
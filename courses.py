@@ -3,13 +3,21 @@ import re
 import time
 import traceback
 from urllib.parse import urljoin
-from pyquery import PyQuery as pq
 from requests import exceptions
 
+from .cache import MemoryBackend
+from .flow import Request, endpoint
+from .hooks import phase
+
 
 class CourseMixin:
     """Course selection related APIs."""
 
+    # 课程类别与学生无关，默认按 (base_url, 课程号) 在所有客户端间共享
+    category_cache = MemoryBackend(maxsize=8192)
+    category_ttl = 86400
+
+    @endpoint
     def get_selected_courses(self, year: int, term: int):
         """获取已选课程信息"""
         try:
@@ -20,7 +28,8 @@ class CourseMixin:
             temp_term = term
             term = term**2 * 3
             data = {"xkxnm": str(year), "xkxqm": str(term)}
-            req_selected = self.sess.post(
+            req_selected = yield Request(
+                "POST",
                 url,
                 data=data,
                 headers=self.headers,
@@ -29,8 +38,7 @@ class CourseMixin:
             )
             if req_selected.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_selected.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_selected):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             selected = req_selected.json()
             result = {
@@ -71,6 +79,7 @@ class CourseMixin:
             traceback.print_exc()
             return {"code": 999, "msg": f"获取已选课程时未记录的错误：{str(e)}"}
 
+    @endpoint
     def get_selected_courses2(self, year: int = 0, term: int = 0):
         """获取已选课程信息2"""
         try:
@@ -97,7 +106,8 @@ class CourseMixin:
                 "queryModel.sortOrder": "asc",
                 "time": 1,
             }
-            req_selected = self.sess.post(
+            req_selected = yield Request(
+                "POST",
                 url,
                 data=data,
                 headers=self.headers,
@@ -106,8 +116,7 @@ class CourseMixin:
             )
             if req_selected.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_selected.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_selected):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             selected = req_selected.json()
             result = {
@@ -144,6 +153,7 @@ class CourseMixin:
             traceback.print_exc()
             return {"code": 999, "msg": f"获取已选课程2时未记录的错误：{str(e)}"}
 
+    @endpoint
     def get_block_courses(self, year: int, term: int, block: int):
         """获取板块课选课列表"""
         try:
@@ -151,7 +161,8 @@ class CourseMixin:
                 self.base_url,
                 "xsxk/zzxkyzb_cxZzxkYzbIndex.html?gnmkdm=N253512&layout=default",
             )
-            req_head_data = self.sess.get(
+            req_head_data = yield Request(
+                "GET",
                 url_head,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -159,20 +170,20 @@ class CourseMixin:
             )
             if req_head_data.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_head_data.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_head_data):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
-            if str(doc("div.nodata")) != "":
-                return {"code": 998, "msg": doc("div.nodata").text()}
-            got_credit_list = [i for i in doc("font[color='red']").items()]
+            with phase("html_parse"):
+                nodata, got_credit_list, tabs, hidden = self.parser.block_head(req_head_data.text)
+            if nodata is not None:
+                return {"code": 998, "msg": nodata}
             if len(got_credit_list) == 0:
                 return {"code": 1005, "msg": "板块课内容为空"}
-            head_data = {"got_credit": got_credit_list[2].text()}
+            head_data = {"got_credit": got_credit_list[2]}
             kklxdm_list = []
             xkkz_id_list = []
-            for tab_content in doc("a[role='tab']").items():
-                onclick_content = tab_content.attr("onclick")
-                r = re.findall(r"'(.*?)'", str(onclick_content))
+            for onclick_content in tabs:
+                with phase("regex"):
+                    r = re.findall(r"'(.*?)'", str(onclick_content))
                 kklxdm_list.append(r[0].strip())
                 xkkz_id_list.append(r[1].strip())
             head_data["bkk1_kklxdm"] = kklxdm_list[0]
@@ -181,10 +192,7 @@ class CourseMixin:
             head_data["bkk1_xkkz_id"] = xkkz_id_list[0]
             head_data["bkk2_xkkz_id"] = xkkz_id_list[1]
             head_data["bkk3_xkkz_id"] = xkkz_id_list[2]
-            for head_data_content in doc("input[type='hidden']"):
-                name = head_data_content.attr("name")
-                value = head_data_content.attr("value")
-                head_data[str(name)] = str(value)
+            head_data.update(hidden)
             url_display = urljoin(
                 self.base_url, "xsxk/zzxkyzb_cxZzxkYzbDisplay.html?gnmkdm=N253512"
             )
@@ -193,20 +201,16 @@ class CourseMixin:
                 "xszxzt": "1",
                 "kspage": "0",
             }
-            req_display_data = self.sess.post(
+            req_display_data = yield Request(
+                "POST",
                 url_display,
                 headers=self.headers,
                 data=display_req_data,
                 cookies=self.cookies,
                 timeout=self.timeout,
             )
-            doc_display = pq(req_display_data.text)
-            display_data = {}
-            for display_data_content in doc_display("input[type='hidden']").items():
-                name = display_data_content.attr("name")
-                value = display_data_content.attr("value")
-                display_data[str(name)] = str(value)
-            head_data.update(display_data)
+            with phase("html_parse"):
+                head_data.update(self.parser.hidden_inputs(req_display_data.text))
             url_kch = urljoin(
                 self.base_url, "xsxk/zzxkyzb_cxZzxkYzbPartDisplay.html?gnmkdm=N253512"
             )
@@ -232,14 +236,16 @@ class CourseMixin:
                 "kspage": "1",
                 "jspage": "10",
             }
-            kch_res = self.sess.post(
+            kch_res = yield Request(
+                "POST",
                 url_kch,
                 headers=self.headers,
                 data=kch_data,
                 cookies=self.cookies,
                 timeout=self.timeout,
             )
-            jkch_res = kch_res.json()
+            with phase("json_decode"):
+                jkch_res = kch_res.json()
             bkk_data = {
                 "bklx_id": head_data["bklx_id"],
                 "xkxnm": str(year),
@@ -259,14 +265,16 @@ class CourseMixin:
                 "rwlx": head_data["rwlx"],
                 "zyh_id": head_data["zyh_id"],
             }
-            bkk_res = self.sess.post(
+            bkk_res = yield Request(
+                "POST",
                 url_bkk,
                 headers=self.headers,
                 data=bkk_data,
                 cookies=self.cookies,
                 timeout=self.timeout,
             )
-            jbkk_res = bkk_res.json()
+            with phase("json_decode"):
+                jbkk_res = bkk_res.json()
             if block != 3 and (len(jkch_res["tmpList"]) != len(jbkk_res)):
                 return {"code": 999, "msg": "板块课编号及长度错误"}
             temp_list = jkch_res["tmpList"]
@@ -307,6 +315,7 @@ class CourseMixin:
             traceback.print_exc()
             return {"code": 999, "msg": f"获取板块课信息时未记录的错误：{str(e)}"}
 
+    @endpoint
     def select_course(
         self,
         sid: str,
@@ -332,7 +341,8 @@ class CourseMixin:
                 "zyh_id": str(sid[2:6]),
                 "kklxdm": str(kklxdm),
             }
-            req_select = self.sess.post(
+            req_select = yield Request(
+                "POST",
                 url_select,
                 headers=self.headers,
                 data=select_data,
@@ -341,8 +351,7 @@ class CourseMixin:
             )
             if req_select.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_select.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_select):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             result = req_select.json()
             return {"code": 1000, "msg": "选课成功", "data": result}
@@ -359,6 +368,7 @@ class CourseMixin:
             traceback.print_exc()
             return {"code": 999, "msg": f"选课时未记录的错误：{str(e)}"}
 
+    @endpoint
     def cancel_course(self, do_id: str, course_id: str, year: int, term: int):
         """取消选课"""
         try:
@@ -372,7 +382,8 @@ class CourseMixin:
                 "xkxnm": str(year),
                 "xkxqm": str(term),
             }
-            req_cancel = self.sess.post(
+            req_cancel = yield Request(
+                "POST",
                 url_cancel,
                 headers=self.headers,
                 data=cancel_data,
@@ -381,8 +392,7 @@ class CourseMixin:
             )
             if req_cancel.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_cancel.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_cancel):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             result = {"status": re.findall(r"(\d+)", req_cancel.text)[0]}
             return {"code": 1000, "msg": "退课成功", "data": result}
@@ -399,23 +409,46 @@ class CourseMixin:
             traceback.print_exc()
             return {"code": 999, "msg": f"选课时未记录的错误：{str(e)}"}
 
+    @endpoint
     def get_course_category(self, type, item):
         """根据课程号获取类别"""
         if type not in self.detail_category_type:
             return item.get("KCLBMC")
         if not item.get("KCH"):
             return None
-        url = urljoin(self.base_url, f"jxjhgl/common_cxKcJbxx.html?id={item['KCH']}")
-        req_category = self.sess.get(
-            url,
-            headers=self.headers,
-            cookies=self.cookies,
-            timeout=self.timeout,
-        )
-        doc = pq(req_category.text)
-        ths = doc("th")
-        try:
-            data_list = [(th.text).strip() for th in ths]
-            return data_list[6]
-        except Exception:
-            return None
+        categories = yield from self._fetch_course_categories([item["KCH"]])
+        return categories[item["KCH"]]
+
+    def _fetch_course_categories(self, course_ids):
+        """查询一批课程号的类别：命中缓存的直接返回，其余并发请求后写入缓存"""
+        categories = {}
+        missing = []
+        for course_id in dict.fromkeys(course_ids):
+            cached = self.category_cache.get((self.base_url, None, "course_category", course_id))
+            if cached is not None:
+                categories[course_id] = cached
+            else:
+                missing.append(course_id)
+        req_categories = []
+        if missing:
+            req_categories = yield [
+                Request(
+                    "GET",
+                    urljoin(self.base_url, f"jxjhgl/common_cxKcJbxx.html?id={course_id}"),
+                    headers=self.headers,
+                    cookies=self.cookies,
+                    timeout=self.timeout,
+                )
+                for course_id in missing
+            ]
+        for course_id, req_category in zip(missing, req_categories):
+            with phase("html_parse"):
+                category = self.parser.course_category(req_category.text)
+            categories[course_id] = category
+            if category is not None:
+                self.category_cache.set(
+                    (self.base_url, None, "course_category", course_id),
+                    category,
+                    self.category_ttl,
+                )
+        return categories
@@ -0,0 +1,92 @@
+import functools
+
+
+class Request:
+    """Description of a single upstream HTTP call yielded by an endpoint flow.
+
+    Endpoint methods are written as generators that ``yield`` a ``Request``
+    and receive the response back, so the same parsing logic can be driven
+    by the blocking :class:`Client` and the asyncio :class:`AsyncClient`.
+    Yielding a list of requests asks the driver to send them concurrently
+    (at most ``client.max_workers`` at a time) and returns the responses in
+    the same order; if any of them fails, its exception is raised instead.
+
+    Two options are consumed by the driver rather than sent upstream:
+    ``sink`` makes it stream the body in ``chunk_size`` pieces to a callable
+    (or, with :data:`EMIT_CHUNKS`, out of a streaming method) instead of
+    buffering it. HTML/JSON bodies, i.e. error pages, are still buffered and
+    returned as usual so the flow can inspect them.
+    """
+
+    __slots__ = ("method", "url", "kwargs")
+
+    def __init__(self, method, url, **kwargs):
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        return f"<Request {self.method} {self.url}>"
+
+
+# ``Request(sink=EMIT_CHUNKS)``: hand the body chunks to the caller of a
+# streaming method as they arrive
+EMIT_CHUNKS = object()
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def endpoint(func):
+    """Turn a request flow generator into a client method.
+
+    The decorated method hands the flow to the client's driver, which sends
+    each yielded request and feeds the response back. The raw generator
+    function stays reachable as ``method.flow`` so one flow can delegate to
+    another with ``yield from self.other.flow(self, ...)``.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self._call(func, args, kwargs)
+
+    wrapper.flow = func
+    return wrapper
+
+
+class Emit:
+    """Records a streaming flow hands to the caller before it finishes.
+
+    Streaming methods (``iter_*``) ``yield Emit(records)`` between requests;
+    the driver passes the records on to the caller's iterator and resumes
+    the flow with ``None``.
+    """
+
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+
+class ApiError(Exception):
+    """Raised by streaming methods when the flow ends with an error result."""
+
+    def __init__(self, result):
+        super().__init__(result.get("msg"))
+        self.code = result.get("code")
+        self.msg = result.get("msg")
+        self.result = result
+
+
+def stream_endpoint(func):
+    """Like :func:`endpoint` for flows that ``yield Emit(...)``.
+
+    The method returns an iterator (an async iterator on :class:`AsyncClient`)
+    over the emitted records; an error result ends it with :class:`ApiError`.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self._stream(func(self, *args, **kwargs))
+
+    wrapper.flow = func
+    return wrapper
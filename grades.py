@@ -5,10 +5,13 @@ from urllib.parse import urljoin
 from pyquery import PyQuery as pq
 from requests import exceptions
 
+from .flow import Request, endpoint, stream_endpoint
+
 
 class GradeMixin:
     """Grade related APIs."""
 
+    @endpoint
     def get_grade(self, year: int, term: int = 0, use_personal_info: bool = False):
         """获取成绩"""
         url = urljoin(
@@ -32,7 +35,8 @@ class GradeMixin:
             "time": "0",
         }
         try:
-            req_grade = self.sess.post(
+            req_grade = yield Request(
+                "POST",
                 url,
                 headers=self.headers,
                 data=data,
@@ -41,8 +45,7 @@ class GradeMixin:
             )
             if req_grade.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_grade.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_grade):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             grade = req_grade.json()
             grade_items = grade.get("items")
@@ -54,23 +57,7 @@ class GradeMixin:
                 "year": year,
                 "term": temp_term,
                 "count": len(grade_items),
-                "courses": [
-                    {
-                        "course_id": i.get("kch_id"),
-                        "title": i.get("kcmc"),
-                        "teacher": i.get("jsxm"),
-                        "class_name": i.get("jxbmc"),
-                        "credit": self.align_floats(i.get("xf")),
-                        "category": i.get("kclbmc"),
-                        "nature": i.get("kcxzmc"),
-                        "grade": self.parse_int(i.get("cj")),
-                        "grade_point": self.align_floats(i.get("jd")),
-                        "grade_nature": i.get("ksxz"),
-                        "start_college": i.get("kkbmmc"),
-                        "mark": i.get("kcbj"),
-                    }
-                    for i in grade_items
-                ],
+                "courses": [self.parse_grade_item(i) for i in grade_items],
             }
             return {"code": 1000, "msg": "获取成绩成功", "data": result}
         except exceptions.Timeout:
@@ -86,20 +73,70 @@ class GradeMixin:
             traceback.print_exc()
             return {"code": 999, "msg": "获取成绩时未记录的错误：" + str(e)}
 
+    @stream_endpoint
+    def iter_grade(
+        self,
+        year: int,
+        term: int = 0,
+        use_personal_info: bool = False,
+        page_size: int = 100,
+        concurrent_pages: int = 1,
+    ):
+        """逐页获取成绩，按服务器返回的 totalPage 翻页并逐条产出课程成绩"""
+        url = urljoin(
+            self.base_url,
+            "cjcx/cjcx_cxDgXscj.html?doType=query&gnmkdm=N305005"
+            if use_personal_info
+            else "cjcx/cjcx_cxXsgrcj.html?doType=query&gnmkdm=N305005",
+        )
+        term_param = term**2 * 3
+        data = {
+            "xnm": str(year),
+            "xqm": "" if term_param == 0 else str(term_param),
+            "_search": "false",
+            "queryModel.sortName": "",
+            "queryModel.sortOrder": "asc",
+            "time": "0",
+        }
+        return (
+            yield from self._iter_pages(
+                url, data, page_size, concurrent_pages, self.parse_grade_item, "成绩"
+            )
+        )
+
+    @classmethod
+    def parse_grade_item(cls, i):
+        return {
+            "course_id": i.get("kch_id"),
+            "title": i.get("kcmc"),
+            "teacher": i.get("jsxm"),
+            "class_name": i.get("jxbmc"),
+            "credit": cls.align_floats(i.get("xf")),
+            "category": i.get("kclbmc"),
+            "nature": i.get("kcxzmc"),
+            "grade": cls.parse_int(i.get("cj")),
+            "grade_point": cls.align_floats(i.get("jd")),
+            "grade_nature": i.get("ksxz"),
+            "start_college": i.get("kkbmmc"),
+            "mark": i.get("kcbj"),
+        }
+
+    @endpoint
     def get_gpa(self):
         """获取GPA"""
         url = urljoin(
             self.base_url,
             "xsxy/xsxyqk_cxXsxyqkIndex.html?gnmkdm=N105515&layout=default",
         )
-        req_gpa = self.sess.get(
+        req_gpa = yield Request(
+            "GET",
             url,
             headers=self.headers,
             cookies=self.cookies,
             timeout=self.timeout,
         )
         doc = pq(req_gpa.text)
-        if doc("h5").text() == "用户登录":
+        if self.is_session_expired(req_gpa, doc):
             return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
         allc_str = [allc.text() for allc in doc("font[size='2px']").items()]
         try:
@@ -0,0 +1,298 @@
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+from urllib.parse import urlsplit
+
+# 直方图默认分桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 当前线程 / 协程中正在执行流程代码的 CallEvent
+_current = contextvars.ContextVar("zfn_api_call", default=None)
+
+
+@contextlib.contextmanager
+def phase(name):
+    """在开启 profile 的调用中把代码块的耗时计入阶段 ``name``"""
+    event = _current.get()
+    if event is None or event.phases is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        event.add_phase(name, time.perf_counter() - start)
+
+
+class RequestEvent:
+    """One upstream round trip, passed to ``before_request`` / ``after_request``.
+
+    ``status``, ``latency`` (seconds), ``bytes`` and ``error`` (the exception,
+    e.g. ``requests.exceptions.Timeout``) are filled in before
+    ``after_request``; a failed request has ``status`` ``None``. ``ttfb`` is
+    the time until the response headers arrived when the HTTP library
+    reports it (``requests`` does, aiohttp does not).
+    """
+
+    __slots__ = (
+        "endpoint", "method", "url", "path", "status", "latency", "ttfb", "bytes", "error", "_start"
+    )
+
+    def __init__(self, endpoint, request):
+        self.endpoint = endpoint
+        self.method = request.method
+        self.url = request.url
+        self.path = urlsplit(request.url).path
+        self.status = None
+        self.latency = None
+        self.ttfb = None
+        self.bytes = 0
+        self.error = None
+        self._start = time.perf_counter()
+
+    def finish(self, response=None, error=None):
+        self.latency = time.perf_counter() - self._start
+        self.error = error
+        if response is not None:
+            self.status = response.status_code
+            if response.elapsed:
+                self.ttfb = response.elapsed.total_seconds()
+            content = response._content
+            if content:
+                self.bytes = len(content)
+            else:
+                self.bytes = int(response.headers.get("Content-Length") or 0)
+
+
+class CallEvent:
+    """One API method call, passed to ``after_parse`` once its result is built.
+
+    ``parse`` is the time spent inside the method's own code (HTML / JSON
+    parsing and building the result), ``elapsed`` the whole call including
+    the ``requests`` round trips; ``code`` is the business code of ``result``.
+    For a profiled call ``phases`` maps each :func:`phase` name to
+    ``[seconds, count]``, otherwise it is ``None``.
+    """
+
+    __slots__ = ("endpoint", "requests", "parse", "phases", "elapsed", "code", "result", "_start")
+
+    def __init__(self, endpoint, profile=False):
+        self.endpoint = endpoint
+        self.requests = []
+        self.parse = 0.0
+        self.phases = {} if profile else None
+        self.elapsed = None
+        self.code = None
+        self.result = None
+        self._start = time.perf_counter()
+
+    def wrap(self, flow):
+        """包装接口流程，累计流程自身代码的耗时"""
+        return _TimedFlow(flow, self)
+
+    def add_phase(self, name, seconds):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def finish(self, result):
+        self.elapsed = time.perf_counter() - self._start
+        self.result = result
+        if isinstance(result, dict):
+            self.code = result.get("code")
+
+    def profile(self):
+        """耗时分解（毫秒）：网络等待、各解析阶段、其余转换代码，以及每个上游请求"""
+        phases = {
+            name: {"ms": round(seconds * 1000, 3), "count": count}
+            for name, (seconds, count) in self.phases.items()
+        }
+        measured = sum(seconds for seconds, _ in self.phases.values())
+        phases["transform"] = {"ms": round(max(0.0, self.parse - measured) * 1000, 3)}
+        return {
+            "elapsed_ms": round(self.elapsed * 1000, 3),
+            "network_ms": round(max(0.0, self.elapsed - self.parse) * 1000, 3),
+            "cpu_ms": round(self.parse * 1000, 3),
+            "phases": phases,
+            "request_count": len(self.requests),
+            "requests": [
+                {
+                    "method": event.method,
+                    "path": event.path,
+                    "status": event.status if event.error is None else type(event.error).__name__,
+                    "ms": None if event.latency is None else round(event.latency * 1000, 3),
+                    "ttfb_ms": None if event.ttfb is None else round(event.ttfb * 1000, 3),
+                    "bytes": event.bytes,
+                }
+                for event in self.requests
+            ],
+        }
+
+
+class _TimedFlow:
+    __slots__ = ("flow", "event", "__name__")
+
+    def __init__(self, flow, event):
+        self.flow = flow
+        self.event = event
+        self.__name__ = flow.__name__
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def send(self, value):
+        token = _current.set(self.event)
+        start = time.perf_counter()
+        try:
+            return self.flow.send(value)
+        finally:
+            self.event.parse += time.perf_counter() - start
+            _current.reset(token)
+
+    def throw(self, error):
+        token = _current.set(self.event)
+        start = time.perf_counter()
+        try:
+            return self.flow.throw(error)
+        finally:
+            self.event.parse += time.perf_counter() - start
+            _current.reset(token)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+def _labels(names, values):
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _order(item):
+    (name, labels), _ = item
+    return name, tuple(map(str, labels))
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsCollector:
+    """Built-in hook aggregating counters and histograms for Prometheus.
+
+    Register it on any number of clients and serve :meth:`render` (with
+    :data:`PROMETHEUS_CONTENT_TYPE`) from a ``/metrics`` endpoint::
+
+        metrics = MetricsCollector()
+        stu = Client(base_url=base_url, hooks=[metrics])
+        ...
+        body = metrics.render()
+
+    Upstream requests are labelled by endpoint, method and URL path; calls by
+    endpoint and business code. Cache hits do not reach the hooks.
+    """
+
+    LABELS = {
+        "upstream_requests_total": ("endpoint", "method", "path", "status"),
+        "upstream_response_bytes_total": ("endpoint", "path"),
+        "upstream_request_duration_seconds": ("endpoint", "path"),
+        "calls_total": ("endpoint", "code"),
+        "call_duration_seconds": ("endpoint",),
+        "parse_duration_seconds": ("endpoint",),
+    }
+
+    HELP = {
+        "upstream_requests_total": "Upstream HTTP requests by status or exception.",
+        "upstream_response_bytes_total": "Bytes received from upstream.",
+        "upstream_request_duration_seconds": "Upstream round trip latency.",
+        "calls_total": "API method calls by business code.",
+        "call_duration_seconds": "API method call duration including upstream requests.",
+        "parse_duration_seconds": "Time spent parsing responses and building results.",
+    }
+
+    def __init__(self, namespace="zfn_api", buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def _inc(self, name, labels, value=1):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def _observe(self, name, labels, value):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = _Histogram(self.buckets)
+        histogram.counts[bisect.bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    def after_request(self, event):
+        status = event.status if event.error is None else type(event.error).__name__
+        with self._lock:
+            self._inc("upstream_requests_total", (event.endpoint, event.method, event.path, status))
+            self._inc("upstream_response_bytes_total", (event.endpoint, event.path), event.bytes)
+            self._observe("upstream_request_duration_seconds", (event.endpoint, event.path), event.latency)
+
+    def after_parse(self, event):
+        with self._lock:
+            self._inc("calls_total", (event.endpoint, event.code))
+            self._observe("call_duration_seconds", (event.endpoint,), event.elapsed)
+            self._observe("parse_duration_seconds", (event.endpoint,), event.parse)
+
+    def render(self):
+        """以 Prometheus 文本格式导出所有指标"""
+        with self._lock:
+            counters = sorted(self._counters.items(), key=_order)
+            histograms = sorted(
+                (
+                    (key, (list(h.counts), h.sum, h.count))
+                    for key, h in self._histograms.items()
+                ),
+                key=_order,
+            )
+        lines = []
+        for kind, items in (("counter", counters), ("histogram", histograms)):
+            current = None
+            for (name, labels), value in items:
+                metric = f"{self.namespace}_{name}"
+                names = self.LABELS[name]
+                if name != current:
+                    current = name
+                    lines.append(f"# HELP {metric} {self.HELP[name]}")
+                    lines.append(f"# TYPE {metric} {kind}")
+                if kind == "counter":
+                    lines.append(f"{metric}{_labels(names, labels)} {_number(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket
+                    le = "+Inf" if bound == float("inf") else _number(float(bound))
+                    lines.append(
+                        f"{metric}_bucket{_labels(names + ('le',), labels + (le,))} {cumulative}"
+                    )
+                lines.append(f"{metric}_sum{_labels(names, labels)} {_number(total)}")
+                lines.append(f"{metric}_count{_labels(names, labels)} {count}")
+        return "\n".join(lines) + "\n"
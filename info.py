@@ -1,18 +1,22 @@
 import json
 import traceback
 from urllib.parse import urljoin
-from pyquery import PyQuery as pq
 from requests import exceptions
 
+from .flow import Request, endpoint
+from .hooks import phase
+
 
 class InfoMixin:
     """Personal information APIs."""
 
+    @endpoint
     def get_info(self):
         """获取个人信息"""
         url = urljoin(self.base_url, "xsxxxggl/xsxxwh_cxCkDgxsxx.html?gnmkdm=N100801")
         try:
-            req_info = self.sess.get(
+            req_info = yield Request(
+                "GET",
                 url,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -20,12 +24,12 @@ class InfoMixin:
             )
             if req_info.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_info.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_info):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
-            info = req_info.json()
+            with phase("json_decode"):
+                info = req_info.json()
             if info is None:
-                return self._get_info()
+                return (yield from self._get_info.flow(self))
             result = {
                 "sid": info.get("xh"),
                 "name": info.get("xm"),
@@ -61,29 +65,20 @@ class InfoMixin:
             traceback.print_exc()
             return {"code": 999, "msg": "获取个人信息时未记录的错误：" + str(e)}
 
+    @endpoint
     def _get_info(self):
         """获取个人信息"""
         url = urljoin(self.base_url, "xsxxxggl/xsgrxxwh_cxXsgrxx.html?gnmkdm=N100801")
         try:
-            req_info = self.sess.get(url, headers=self.headers, cookies=self.cookies, timeout=self.timeout)
+            req_info = yield Request(
+                "GET", url, headers=self.headers, cookies=self.cookies, timeout=self.timeout
+            )
             if req_info.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_info.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_info):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
-            pending_result = {}
-            for ul_item in doc.find("div.col-sm-6").items():
-                content = pq(ul_item).find("div.form-group")
-                key = pq(content).find("label.col-sm-4.control-label").text()
-                value = pq(content).find("div.col-sm-8 p.form-control-static").text()
-                if key:
-                    pending_result[key] = value
-            for ul_item in doc.find("div.col-sm-4").items():
-                content = pq(ul_item).find("div.form-group")
-                key = pq(content).find("label.col-sm-4.control-label").text()
-                value = pq(content).find("div.col-sm-8 p.form-control-static").text()
-                if key:
-                    pending_result[key] = value
+            with phase("html_parse"):
+                pending_result = self.parser.info_fields(req_info.text)
             if pending_result.get("学号：") == "":
                 return {
                     "code": 1014,
@@ -112,21 +107,18 @@ class InfoMixin:
                     self.base_url,
                     "xszbbgl/xszbbgl_cxXszbbsqIndex.html?doType=details&gnmkdm=N106005",
                 )
-                _req_info = self.sess.post(
+                _req_info = yield Request(
+                    "POST",
                     _url,
                     headers=self.headers,
                     cookies=self.cookies,
                     timeout=self.timeout,
                     data={"offDetails": "1", "gnmkdm": "N106005", "czdmKey": "00"},
                 )
-                _doc = pq(_req_info.text)
-                if _doc("p.error_title").text() != "无功能权限，":
-                    for ul_item in _doc.find("div.col-sm-6").items():
-                        content = pq(ul_item).find("div.form-group")
-                        key = pq(content).find("label.col-sm-4.control-label").text() + "："
-                        value = pq(content).find("div.col-sm-8 label.control-label").text()
-                        if key:
-                            pending_result[key] = value
+                with phase("html_parse"):
+                    error_title, details = self.parser.detail_fields(_req_info.text)
+                if error_title != "无功能权限，":
+                    pending_result.update(details)
                     result.update(
                         {
                             "college_name": pending_result.get("学院：") or "无",
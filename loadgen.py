@@ -0,0 +1,316 @@
+import argparse
+import json
+import math
+import random
+import threading
+import time
+
+from .bulk import RateLimiter
+from .client import Client
+from .transport import SharedTransport
+
+DEFAULT_MIX = {
+    "login": 1,
+    "get_schedule": 4,
+    "get_grade": 3,
+    "get_notifications": 2,
+    "select_course": 2,
+}
+
+
+def parse_mix(text):
+    """把 ``"login=1,get_grade=3"`` 解析为 {操作: 权重}"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"未知的操作：{name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(samples, q):
+    """已排序样本的 q 分位数（最近秩法）"""
+    if not samples:
+        return None
+    return samples[max(0, math.ceil(q / 100 * len(samples)) - 1)]
+
+
+class LoadGenerator:
+    """Simulates concurrent students hitting one teaching system.
+
+    Each of ``students`` threads owns a :class:`Client` (one session per
+    student, all sharing one :class:`SharedTransport`), logs in, then keeps
+    picking operations from ``mix`` by weight until ``duration`` seconds or
+    ``iterations`` operations per student are done. Only a 1006 result or a
+    failed login is followed by a fresh login, as a real caller would do::
+
+        generator = LoadGenerator(base_url, students=200, duration=60)
+        report = generator.run()
+        print(generator.format(report))
+
+    :param accounts: ``[(sid, password), ...]``; students beyond the list
+        reuse it round-robin. Defaults to sequential ids from ``sid_start``
+        with ``password``
+    :param mix: operation -> weight, see :data:`DEFAULT_MIX`
+    :param think: seconds each student waits between operations
+    :param ramp_up: seconds over which student start times are spread
+    :param select: ``(course_id, do_id, kklxdm)`` for ``select_course``;
+        discovered once from ``get_block_courses(year, term, 1)`` if omitted
+    :param rate_limit: upstream requests per second for the whole run
+    :param client_options: extra keyword arguments for every client
+    """
+
+    def __init__(
+        self,
+        base_url,
+        students=10,
+        mix=None,
+        duration=None,
+        iterations=None,
+        accounts=None,
+        sid_start=2100000001,
+        password="123456",
+        year=2024,
+        term=1,
+        think=0.0,
+        ramp_up=0.0,
+        select=None,
+        rate_limit=None,
+        seed=None,
+        **client_options,
+    ):
+        if duration is None and iterations is None:
+            iterations = 10
+        self.base_url = base_url
+        self.students = students
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.duration = duration
+        self.iterations = iterations
+        self.accounts = accounts or [(str(sid_start + n), password) for n in range(students)]
+        self.year = year
+        self.term = term
+        self.think = think
+        self.ramp_up = ramp_up
+        self.select = [tuple(select)] if select else None
+        self.seed = seed
+        client_options.setdefault("transport", SharedTransport(max_connections=students))
+        if rate_limit:
+            client_options.setdefault("rate_limiter", RateLimiter(rate_limit, students))
+        self.client_options = client_options
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.codes = {}
+
+    def _record(self, operation, elapsed, result):
+        code = result.get("code") if isinstance(result, dict) else "other"
+        with self._lock:
+            stat = self.samples.setdefault(operation, {"latencies": [], "codes": {}})
+            stat["latencies"].append(elapsed)
+            stat["codes"][code] = stat["codes"].get(code, 0) + 1
+            self.codes[code] = self.codes.get(code, 0) + 1
+        return code
+
+    def _timed(self, operation, call):
+        start = time.perf_counter()
+        try:
+            result = call()
+        except Exception as e:
+            result = {"code": 999, "msg": f"压测时未记录的错误：{str(e)}"}
+        return self._record(operation, time.perf_counter() - start, result), result
+
+    def _select_args(self, client):
+        with self._lock:
+            if self.select is not None:
+                return self.select
+        result = client.get_block_courses(self.year, self.term, 1)
+        courses = (result.get("data") or {}).get("courses") or []
+        with self._lock:
+            if self.select is None and courses:
+                self.select = [(c["course_id"], c["do_id"], c["kklxdm"]) for c in courses]
+            return self.select
+
+    def _operation(self, client, operation, sid, password, rng):
+        if operation == "login":
+            return lambda: client.login(sid, password)
+        if operation == "get_schedule":
+            return lambda: client.get_schedule(self.year, self.term)
+        if operation == "get_grade":
+            return lambda: client.get_grade(self.year, self.term)
+        if operation == "get_notifications":
+            return client.get_notifications
+        courses = self._select_args(client)
+        if not courses:
+            return lambda: {"code": 1005, "msg": "没有可选的课程"}
+        course_id, do_id, kklxdm = rng.choice(courses)
+        return lambda: client.select_course(sid, course_id, do_id, kklxdm, self.year, self.term)
+
+    def _student(self, index, deadline, start_at):
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        sid, password = self.accounts[index % len(self.accounts)]
+        delay = start_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        client = Client(base_url=self.base_url, **self.client_options)
+        code, _ = self._timed("login", lambda: client.login(sid, password))
+        logged_in = code == 1000
+        operations, weights = list(self.mix), list(self.mix.values())
+        done = 0
+        while (self.iterations is None or done < self.iterations) and (
+            deadline is None or time.perf_counter() < deadline
+        ):
+            if not logged_in:
+                code, _ = self._timed("login", lambda: client.login(sid, password))
+                logged_in = code == 1000
+            else:
+                operation = rng.choices(operations, weights)[0]
+                code, _ = self._timed(operation, self._operation(client, operation, sid, password, rng))
+                # 只有会话失效才重新登录；2333 / 1003 等错误不改变登录状态
+                if code == 1006:
+                    logged_in = False
+            done += 1
+            if self.think:
+                time.sleep(self.think)
+
+    def run(self):
+        """运行压测并返回报告"""
+        self.samples, self.codes = {}, {}
+        started = time.perf_counter()
+        deadline = started + self.ramp_up + self.duration if self.duration else None
+        threads = [
+            threading.Thread(
+                target=self._student,
+                args=(n, deadline, started + self.ramp_up * n / max(1, self.students)),
+                daemon=True,
+            )
+            for n in range(self.students)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        """吞吐量、各操作的延迟分位数与返回码分布、连接复用情况"""
+        operations = {}
+        total = 0
+        for operation, stat in sorted(self.samples.items()):
+            latencies = sorted(stat["latencies"])
+            total += len(latencies)
+            operations[operation] = {
+                "count": len(latencies),
+                "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p90_ms": round(percentile(latencies, 90) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2),
+                "codes": dict(sorted(stat["codes"].items(), key=lambda item: str(item[0]))),
+            }
+        report = {
+            "students": self.students,
+            "elapsed": round(elapsed, 3),
+            "operations": total,
+            "throughput": round(total / elapsed, 2) if elapsed else 0.0,
+            "codes": dict(sorted(self.codes.items(), key=lambda item: str(item[0]))),
+            "per_operation": operations,
+        }
+        transport = self.client_options.get("transport")
+        if transport is not None:
+            stats = transport.stats()
+            requests = stats["requests"]
+            report["connections"] = {
+                **stats,
+                "requests_per_connection": round(requests / stats["connections"], 2)
+                if stats["connections"]
+                else None,
+            }
+        return report
+
+    @staticmethod
+    def format(report):
+        """把报告排成便于阅读的文本表格"""
+        lines = [
+            f"{report['students']} students, {report['operations']} operations in "
+            f"{report['elapsed']} s, {report['throughput']} ops/s",
+            f"codes: {report['codes']}",
+        ]
+        if "connections" in report:
+            c = report["connections"]
+            lines.append(
+                f"connections: {c['connections']} opened for {c['requests']} requests "
+                f"({c['requests_per_connection']} requests per connection)"
+            )
+        columns = ["count", "throughput", "p50_ms", "p90_ms", "p99_ms", "max_ms", "codes"]
+        rows = [
+            [name] + [str(stat[column]) for column in columns]
+            for name, stat in report["per_operation"].items()
+        ]
+        header = ["operation"] + columns
+        widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+        lines.append("")
+        for row in [header] + rows:
+            lines.append("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+        return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m zfn_api.loadgen",
+        description="模拟多名学生并发访问教务系统，报告吞吐量、延迟分位数、返回码分布与连接复用",
+    )
+    parser.add_argument("base_url")
+    parser.add_argument("-n", "--students", type=int, default=10)
+    parser.add_argument("-d", "--duration", type=float, help="seconds to run")
+    parser.add_argument("-i", "--iterations", type=int, help="operations per student")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=dict(DEFAULT_MIX),
+        help="operation weights, e.g. login=1,get_schedule=4,get_grade=3,"
+        "get_notifications=2,select_course=2",
+    )
+    parser.add_argument("--accounts", help="CSV file with one 'sid,password' per line")
+    parser.add_argument("--sid-start", type=int, default=2100000001)
+    parser.add_argument("--password", default="123456")
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--term", type=int, default=1)
+    parser.add_argument("--select", help="course_id,do_id,kklxdm for select_course")
+    parser.add_argument("--think", type=float, default=0.0, help="pause between operations")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds to start all students")
+    parser.add_argument("--rate-limit", type=float, help="upstream requests per second")
+    parser.add_argument("--timeout", type=float, default=3)
+    parser.add_argument("--max-connections", type=int, help="connection pool size per host")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    accounts = None
+    if args.accounts:
+        with open(args.accounts, encoding="utf-8") as f:
+            accounts = [tuple(line.strip().split(",", 1)) for line in f if line.strip()]
+    generator = LoadGenerator(
+        args.base_url,
+        students=args.students,
+        mix=args.mix,
+        duration=args.duration,
+        iterations=args.iterations,
+        accounts=accounts,
+        sid_start=args.sid_start,
+        password=args.password,
+        year=args.year,
+        term=args.term,
+        think=args.think,
+        ramp_up=args.ramp_up,
+        select=tuple(args.select.split(",")) if args.select else None,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+        timeout=args.timeout,
+        transport=SharedTransport(max_connections=args.max_connections or args.students),
+    )
+    report = generator.run()
+    print(json.dumps(report, ensure_ascii=False, indent=2) if args.json else generator.format(report))
+
+
+if __name__ == "__main__":
+    main()
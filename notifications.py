@@ -6,10 +6,13 @@ from urllib.parse import urljoin
 from pyquery import PyQuery as pq
 from requests import exceptions
 
+from .flow import Request, endpoint, stream_endpoint
+
 
 class NotificationMixin:
     """Notification related APIs."""
 
+    @endpoint
     def get_notifications(self):
         """获取通知消息"""
         url = urljoin(self.base_url, "xtgl/index_cxDbsy.html?doType=query")
@@ -25,7 +28,8 @@ class NotificationMixin:
             "time": "0",
         }
         try:
-            req_notification = self.sess.post(
+            req_notification = yield Request(
+                "POST",
                 url,
                 headers=self.headers,
                 data=data,
@@ -34,14 +38,13 @@ class NotificationMixin:
             )
             if req_notification.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_notification.text)
-            if doc("h5").text() == "用户登录" or "错误" in doc("title").text():
+            if self.is_session_expired(req_notification) or (
+                self.is_html(req_notification)
+                and "错误" in pq(req_notification.text)("title").text()
+            ):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             notifications = req_notification.json()
-            result = [
-                {**self.split_notifications(i), "create_time": i.get("cjsj")}
-                for i in notifications.get("items")
-            ]
+            result = [self.parse_notification_item(i) for i in notifications.get("items")]
             return {"code": 1000, "msg": "获取消息成功", "data": result}
         except exceptions.Timeout:
             return {"code": 1003, "msg": "获取消息超时"}
@@ -56,6 +59,28 @@ class NotificationMixin:
             traceback.print_exc()
             return {"code": 999, "msg": "获取消息时未记录的错误：" + str(e)}
 
+    @stream_endpoint
+    def iter_notifications(self, page_size: int = 100, concurrent_pages: int = 1):
+        """逐页获取通知消息，避免一次请求上千条"""
+        url = urljoin(self.base_url, "xtgl/index_cxDbsy.html?doType=query")
+        data = {
+            "sfyy": "0",
+            "flag": "1",
+            "_search": "false",
+            "queryModel.sortName": "cjsj",
+            "queryModel.sortOrder": "desc",
+            "time": "0",
+        }
+        return (
+            yield from self._iter_pages(
+                url, data, page_size, concurrent_pages, self.parse_notification_item, "消息"
+            )
+        )
+
+    @classmethod
+    def parse_notification_item(cls, item):
+        return {**cls.split_notifications(item), "create_time": item.get("cjsj")}
+
     @classmethod
     def split_notifications(cls, item):
         if not item.get("xxnr"):
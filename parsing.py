@@ -0,0 +1,253 @@
+import re
+
+import lxml.html
+from lxml import etree
+from pyquery import PyQuery as pq
+
+# 与 PyQuery ``.text()`` 相同的规则：行内元素直接相连，块级元素与 <br> 处换行，
+# 其余空白折叠为一个空格
+_INLINE_TAGS = frozenset(
+    {
+        "a", "abbr", "acronym", "b", "bdo", "big", "br", "button", "cite",
+        "code", "dfn", "em", "i", "img", "input", "kbd", "label", "map",
+        "object", "q", "samp", "script", "select", "small", "span", "strong",
+        "sub", "sup", "textarea", "time", "tt", "var",
+    }
+)
+_WHITESPACE = re.compile("[\x20\x09\x0c\u200b\x0a\x0d]+")
+# 文本片段之间的分隔：块级元素边界（连续的合并为一个）与 <br>
+_BLOCK, _BREAK = object(), object()
+
+
+def _text_parts(element, parts):
+    tag = element.tag
+    if not isinstance(tag, str):
+        return
+    if tag == "br":
+        parts.append(_BREAK)
+    elif tag not in _INLINE_TAGS:
+        parts.append(_BLOCK)
+    if element.text is not None:
+        parts.append(element.text)
+    for child in element:
+        _text_parts(child, parts)
+        if child.tail is not None:
+            parts.append(child.tail)
+    if tag != "br" and tag not in _INLINE_TAGS:
+        parts.append(_BLOCK)
+
+
+def _element_text(element):
+    """元素的可见文本，结果与 PyQuery 的 ``.text()`` 一致"""
+    raw = []
+    _text_parts(element, raw)
+    parts, buffer = [], []
+    for part in raw + [_BLOCK]:
+        if isinstance(part, str):
+            buffer.append(part)
+            continue
+        text = _WHITESPACE.sub(" ", "".join(buffer)).strip()
+        buffer.clear()
+        if text:
+            parts.append(text)
+        if part is _BREAK or not parts or parts[-1] is not _BLOCK:
+            parts.append(part)
+    while parts and not isinstance(parts[0], str):
+        parts.pop(0)
+    while parts and not isinstance(parts[-1], str):
+        parts.pop()
+    return "".join(part if isinstance(part, str) else "\n" for part in parts).strip()
+
+
+class PyQueryParser:
+    """Extracts fields from the teaching system's HTML pages with PyQuery.
+
+    This is the default backend and mirrors the selectors the mixins have
+    always used. :class:`LxmlParser` returns the same values without building
+    PyQuery objects; pick one per client with ``Client(parser="lxml")``.
+    """
+
+    name = "pyquery"
+
+    def login_page(self, html):
+        """登录页的 (csrftoken, 是否需要验证码)"""
+        doc = pq(html)
+        return doc("#csrftoken").attr("value"), str(doc("input#yzm")) != ""
+
+    def login_tips(self, html):
+        """登录结果页 p#tips 的文本，没有该元素时为 None"""
+        tips = pq(html)("p#tips")
+        return tips.text() if str(tips) != "" else None
+
+    def hidden_inputs(self, html):
+        """页面中所有隐藏 input 的 name -> value"""
+        return self._hidden_fields(pq(html))
+
+    @staticmethod
+    def _hidden_fields(doc):
+        fields = {}
+        for item in doc("input[type='hidden']").items():
+            fields[str(item.attr("name"))] = str(item.attr("value"))
+        return fields
+
+    def block_head(self, html):
+        """板块课首页的 (无数据提示, 红字内容列表, 各板块标签的 onclick, 隐藏 input)"""
+        doc = pq(html)
+        nodata = doc("div.nodata")
+        return (
+            nodata.text() if str(nodata) != "" else None,
+            [item.text() for item in doc("font[color='red']").items()],
+            [item.attr("onclick") for item in doc("a[role='tab']").items()],
+            self._hidden_fields(doc),
+        )
+
+    def info_fields(self, html):
+        """个人信息页中各字段的标签 -> 值"""
+        doc = pq(html)
+        fields = {}
+        for column in ("div.col-sm-6", "div.col-sm-4"):
+            for item in doc.find(column).items():
+                content = item.find("div.form-group")
+                key = content.find("label.col-sm-4.control-label").text()
+                value = content.find("div.col-sm-8 p.form-control-static").text()
+                if key:
+                    fields[key] = value
+        return fields
+
+    def detail_fields(self, html):
+        """学籍异动详情页的 (错误提示, 标签 -> 值)"""
+        doc = pq(html)
+        fields = {}
+        for item in doc.find("div.col-sm-6").items():
+            content = item.find("div.form-group")
+            key = content.find("label.col-sm-4.control-label").text() + "："
+            fields[key] = content.find("div.col-sm-8 label.control-label").text()
+        return doc("p.error_title").text(), fields
+
+    def course_category(self, html):
+        """课程基本信息页中的课程类别（第 7 个表头）"""
+        try:
+            return [th.text.strip() for th in pq(html)("th")][6]
+        except Exception:
+            return None
+
+
+def _has_class(*names):
+    return " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names
+    )
+
+
+class LxmlParser(PyQueryParser):
+    """Same fields as :class:`PyQueryParser` via precompiled XPath on a bare lxml tree.
+
+    Text follows the same whitespace rules as PyQuery's ``.text()``; only
+    the CSS translation and wrapper objects that PyQuery builds on every
+    query are skipped.
+    """
+
+    name = "lxml"
+
+    _csrf = etree.XPath("//*[@id='csrftoken']")
+    _kaptcha = etree.XPath("//input[@id='yzm']")
+    _tips = etree.XPath("//p[@id='tips']")
+    _hidden = etree.XPath("//input[@type='hidden']")
+    _nodata = etree.XPath(f"//div[{_has_class('nodata')}]")
+    _red = etree.XPath("//font[@color='red']")
+    _tabs = etree.XPath("//a[@role='tab']")
+    _columns = (
+        etree.XPath(f"//div[{_has_class('col-sm-6')}]"),
+        etree.XPath(f"//div[{_has_class('col-sm-4')}]"),
+    )
+    _form_group = etree.XPath(f"descendant::div[{_has_class('form-group')}]")
+    _label = etree.XPath(f"descendant::label[{_has_class('col-sm-4', 'control-label')}]")
+    _static_value = etree.XPath(
+        f"descendant::div[{_has_class('col-sm-8')}]"
+        f"/descendant::p[{_has_class('form-control-static')}]"
+    )
+    _label_value = etree.XPath(
+        f"descendant::div[{_has_class('col-sm-8')}]"
+        f"/descendant::label[{_has_class('control-label')}]"
+    )
+    _error_title = etree.XPath(f"//p[{_has_class('error_title')}]")
+    _th = etree.XPath("//th")
+
+    @staticmethod
+    def _text(elements):
+        return " ".join(_element_text(element) for element in elements)
+
+    @staticmethod
+    def _find(elements, xpath):
+        found = []
+        for element in elements:
+            found.extend(xpath(element))
+        return found
+
+    def login_page(self, html):
+        root = lxml.html.fromstring(html)
+        csrf = self._csrf(root)
+        return (csrf[0].get("value") if csrf else None), bool(self._kaptcha(root))
+
+    def login_tips(self, html):
+        tips = self._tips(lxml.html.fromstring(html))
+        return self._text(tips) if tips else None
+
+    def hidden_inputs(self, html):
+        return self._hidden_fields(lxml.html.fromstring(html))
+
+    def _hidden_fields(self, root):
+        fields = {}
+        for item in self._hidden(root):
+            fields[str(item.get("name"))] = str(item.get("value"))
+        return fields
+
+    def block_head(self, html):
+        root = lxml.html.fromstring(html)
+        nodata = self._nodata(root)
+        return (
+            self._text(nodata) if nodata else None,
+            [_element_text(item) for item in self._red(root)],
+            [item.get("onclick") for item in self._tabs(root)],
+            self._hidden_fields(root),
+        )
+
+    def info_fields(self, html):
+        root = lxml.html.fromstring(html)
+        fields = {}
+        for column in self._columns:
+            for item in column(root):
+                content = self._form_group(item)
+                key = self._text(self._find(content, self._label))
+                if key:
+                    fields[key] = self._text(self._find(content, self._static_value))
+        return fields
+
+    def detail_fields(self, html):
+        root = lxml.html.fromstring(html)
+        fields = {}
+        for item in self._columns[0](root):
+            content = self._form_group(item)
+            key = self._text(self._find(content, self._label)) + "："
+            fields[key] = self._text(self._find(content, self._label_value))
+        return self._text(self._error_title(root)), fields
+
+    def course_category(self, html):
+        try:
+            return [th.text.strip() for th in self._th(lxml.html.fromstring(html))][6]
+        except Exception:
+            return None
+
+
+PARSERS = {"pyquery": PyQueryParser(), "lxml": LxmlParser()}
+
+
+def get_parser(parser=None):
+    """按名称（``"pyquery"`` / ``"lxml"``）或实例取得 HTML 解析后端"""
+    if parser is None:
+        return PARSERS["pyquery"]
+    if isinstance(parser, str):
+        try:
+            return PARSERS[parser]
+        except KeyError:
+            raise ValueError(f"未知的 HTML 解析后端：{parser}") from None
+    return parser
@@ -0,0 +1,253 @@
+import random
+import threading
+import time
+from collections import deque
+
+# 只读、可安全重放的接口；选课、登录与写入文件的 PDF 导出不重试
+DEFAULT_RETRY_ENDPOINTS = frozenset(
+    {
+        "get_info",
+        "_get_info",
+        "get_grade",
+        "get_gpa",
+        "get_schedule",
+        "get_exam_schedule",
+        "get_academia",
+        "get_notifications",
+        "get_selected_courses",
+        "get_selected_courses2",
+        "get_block_courses",
+        "get_course_category",
+    }
+)
+
+# 视为上游故障的返回码：超时与“教务系统挂了 / 请重试”
+FAILURE_CODES = (1003, 2333)
+
+
+class RetryPolicy:
+    """Retries idempotent reads that failed with a timeout or upstream error.
+
+    The first attempt runs immediately; before retry ``n`` the client sleeps
+    a random time between 0 and ``min(max_backoff, backoff * 2 ** (n - 1))``
+    ("full jitter"), so students retrying after one outage spread out instead
+    of hitting the recovering server in lockstep::
+
+        stu = Client(base_url=base_url, retry=RetryPolicy(attempts=3))
+
+    :param attempts: total attempts including the first one
+    :param retry_on: result codes worth retrying
+    :param endpoints: method names that may be retried
+    """
+
+    def __init__(
+        self,
+        attempts=3,
+        backoff=0.2,
+        max_backoff=5.0,
+        retry_on=FAILURE_CODES,
+        endpoints=DEFAULT_RETRY_ENDPOINTS,
+    ):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on = frozenset(retry_on)
+        self.endpoints = frozenset(endpoints)
+
+    def delays(self, endpoint):
+        """每次尝试前的等待秒数（第一次为 0）"""
+        yield 0.0
+        if endpoint not in self.endpoints:
+            return
+        for attempt in range(1, self.attempts):
+            yield random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def should_retry(self, result):
+        return isinstance(result, dict) and result.get("code") in self.retry_on
+
+
+class CircuitBreaker:
+    """Fails fast while one teaching system keeps erroring.
+
+    Outcomes of the last ``window`` calls are kept; once at least
+    ``min_calls`` are recorded and the share of 1003/2333 results reaches
+    ``failure_rate`` the breaker opens and calls return 2333 without
+    contacting the server. After ``reset_timeout`` seconds one probe call is
+    let through (half-open): success closes the breaker, failure opens it
+    again. :meth:`shared` returns one breaker per ``base_url`` for the whole
+    process, which is what ``Client(..., circuit_breaker=True)`` uses.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        failure_rate=0.5,
+        window=20,
+        min_calls=10,
+        reset_timeout=30.0,
+        failure_codes=FAILURE_CODES,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.failure_codes = frozenset(failure_codes)
+        self.state = "closed"
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._probe_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, base_url, **options):
+        """进程内 base_url 对应的熔断器，首次调用时按 options 创建"""
+        with cls._shared_lock:
+            breaker = cls._shared.get(base_url)
+            if breaker is None:
+                breaker = cls._shared[base_url] = cls(**options)
+            return breaker
+
+    def allow(self):
+        """当前是否允许发出调用；半开状态下同一时间只放行一个探测调用"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if now - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._probe_at = None
+            if self._probe_at is not None and now - self._probe_at < self.reset_timeout:
+                return False
+            self._probe_at = now
+            return True
+
+    def record(self, result):
+        """记录一次调用结果"""
+        failed = isinstance(result, dict) and result.get("code") in self.failure_codes
+        with self._lock:
+            if self.state == "half_open":
+                if failed:
+                    self._open()
+                else:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                return
+            if self.state == "open":
+                return
+            self._outcomes.append(failed)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) >= self.failure_rate * len(self._outcomes)
+            ):
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._probe_at = None
+        self._outcomes.clear()
+
+    def retry_after(self):
+        """距离下一次允许探测还有多少秒"""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def rejected(self):
+        """熔断期间直接返回的结果"""
+        return {
+            "code": 2333,
+            "msg": f"教务系统连续出错，已暂停请求，请 {self.retry_after():.0f} 秒后重试",
+        }
+
+
+# 默认可对冲的只读查询接口
+DEFAULT_HEDGE_ENDPOINTS = frozenset({"get_schedule", "get_grade", "get_exam_schedule"})
+
+
+class HedgePolicy:
+    """Sends a second copy of a slow read request and takes the first answer.
+
+    The hedge goes out once a request has been running longer than the
+    ``quantile`` of recently observed latencies for that endpoint
+    (``initial_delay`` until ``min_samples`` are collected, never less than
+    ``min_delay``). Every request earns ``budget`` hedge tokens, at most
+    ``burst`` of them are banked and each hedge spends one, so hedges stay
+    below ``budget`` × requests (10% by default) even when the whole server
+    is slow. One policy is meant to be shared by all clients of a teaching
+    system, like :class:`RateLimiter`::
+
+        hedge = HedgePolicy()
+        stu = Client(base_url=base_url, hedge=hedge)
+    """
+
+    def __init__(
+        self,
+        quantile=0.95,
+        budget=0.1,
+        burst=3,
+        min_delay=0.05,
+        initial_delay=1.0,
+        window=256,
+        min_samples=20,
+        endpoints=DEFAULT_HEDGE_ENDPOINTS,
+    ):
+        self.quantile = quantile
+        self.budget = budget
+        self.burst = burst
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.endpoints = frozenset(endpoints)
+        self.requests = 0
+        self.hedges = 0
+        self._tokens = 0.0
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def hedges_endpoint(self, endpoint):
+        return endpoint in self.endpoints
+
+    def delay(self, endpoint):
+        """发出对冲请求前等待的秒数，同时为本次请求累积对冲额度"""
+        with self._lock:
+            self.requests += 1
+            # 取整避免 0.1 累加十次得到 0.999… 而少给一次额度
+            self._tokens = min(round(self._tokens + self.budget, 9), self.burst)
+            samples = self._latencies.get(endpoint)
+            if samples is None or len(samples) < self.min_samples:
+                return max(self.min_delay, self.initial_delay)
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self.quantile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    def observe(self, endpoint, seconds):
+        """记录一次成功请求的耗时"""
+        with self._lock:
+            samples = self._latencies.get(endpoint)
+            if samples is None:
+                samples = self._latencies[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def try_hedge(self):
+        """额度足够时占用一次对冲"""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+
+    def stats(self):
+        """请求数、对冲数与对冲比例"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "ratio": self.hedges / self.requests if self.requests else 0.0,
+            }
@@ -1,3 +1,4 @@
+import functools
 import json
 import re
 import time
@@ -6,10 +7,58 @@ from urllib.parse import urljoin
 from pyquery import PyQuery as pq
 from requests import exceptions
 
+from .flow import DOWNLOAD_CHUNK_SIZE, EMIT_CHUNKS, Request, endpoint, stream_endpoint
+
+
+def _freeze(value):
+    """把课程条目转换为可哈希的形式，相等的条目得到相等的结果"""
+    if isinstance(value, dict):
+        return frozenset((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_weeks(weeks):
+    """解析周次字符串，相同字符串只解析一次"""
+    week_list = []
+    for item in weeks.split(","):
+        if not item:
+            continue
+        numbers = [int(n) for n in re.findall(r"(\d+)", item)]
+        if "-" in item:
+            if len(numbers) != 2:
+                continue
+            week_range = range(numbers[0], numbers[1] + 1)
+            if "单" in item:
+                week_list.extend(i for i in week_range if i % 2 == 1)
+            elif "双" in item:
+                week_list.extend(i for i in week_range if i % 2 == 0)
+            else:
+                week_list.extend(week_range)
+        elif len(numbers) == 1:
+            week_list.append(numbers[0])
+    return tuple(week_list)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_sessions(sessions):
+    args = re.findall(r"(\d+)", sessions)
+    return tuple(range(int(args[0]), int(args[1]) + 1))
+
+
+def _bitmask(numbers):
+    mask = 0
+    for n in numbers:
+        mask |= 1 << n
+    return mask
+
 
 class ScheduleMixin:
     """Schedule related APIs."""
 
+    @endpoint
     def get_exam_schedule(self, year: int, term: int = 0):
         """获取考试信息"""
         url = urljoin(
@@ -31,7 +80,8 @@ class ScheduleMixin:
             "time": "0",
         }
         try:
-            req_grade = self.sess.post(
+            req_grade = yield Request(
+                "POST",
                 url,
                 headers=self.headers,
                 data=data,
@@ -40,8 +90,7 @@ class ScheduleMixin:
             )
             if req_grade.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_grade.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_grade):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             grade = req_grade.json()
             grade_items = grade.get("items")
@@ -53,26 +102,7 @@ class ScheduleMixin:
                 "year": year,
                 "term": temp_term,
                 "count": len(grade_items),
-                "courses": [
-                    {
-                        "course_id": i.get("kch"),
-                        "title": i.get("kcmc"),
-                        "time": i.get("kssj"),
-                        "location": i.get("cdmc"),
-                        "xq": i.get("cdxqmc"),
-                        "zwh": i.get("zwh"),
-                        "cxbj": i.get("cxbj", ""),
-                        "exam_name": i.get("ksmc"),
-                        "teacher": i.get("jsxx"),
-                        "class_name": i.get("jxbmc"),
-                        "kkxy": i.get("kkxy"),
-                        "credit": self.align_floats(i.get("xf")),
-                        "ksfs": i.get("ksfs"),
-                        "sjbh": i.get("sjbh"),
-                        "bz": i.get("bz1", ""),
-                    }
-                    for i in grade_items
-                ],
+                "courses": [self.parse_exam_item(i) for i in grade_items],
             }
             return {"code": 1000, "msg": "获取考试信息成功", "data": result}
         except exceptions.Timeout:
@@ -88,14 +118,60 @@ class ScheduleMixin:
             traceback.print_exc()
             return {"code": 999, "msg": "获取考试信息时未记录的错误：" + str(e)}
 
-    def get_schedule(self, year: int, term: int):
-        """获取课程表信息"""
+    @stream_endpoint
+    def iter_exam_schedule(
+        self, year: int, term: int = 0, page_size: int = 100, concurrent_pages: int = 1
+    ):
+        """逐页获取考试信息，按服务器返回的 totalPage 翻页并逐条产出"""
+        url = urljoin(
+            self.base_url,
+            "kwgl/kscx_cxXsksxxIndex.html?doType=query&gnmkdm=N358105",
+        )
+        term_param = term**2 * 3
+        data = {
+            "xnm": str(year),
+            "xqm": "" if term_param == 0 else str(term_param),
+            "_search": "false",
+            "queryModel.sortName": "",
+            "queryModel.sortOrder": "asc",
+            "time": "0",
+        }
+        return (
+            yield from self._iter_pages(
+                url, data, page_size, concurrent_pages, self.parse_exam_item, "考试信息"
+            )
+        )
+
+    @classmethod
+    def parse_exam_item(cls, i):
+        return {
+            "course_id": i.get("kch"),
+            "title": i.get("kcmc"),
+            "time": i.get("kssj"),
+            "location": i.get("cdmc"),
+            "xq": i.get("cdxqmc"),
+            "zwh": i.get("zwh"),
+            "cxbj": i.get("cxbj", ""),
+            "exam_name": i.get("ksmc"),
+            "teacher": i.get("jsxx"),
+            "class_name": i.get("jxbmc"),
+            "kkxy": i.get("kkxy"),
+            "credit": cls.align_floats(i.get("xf")),
+            "ksfs": i.get("ksfs"),
+            "sjbh": i.get("sjbh"),
+            "bz": i.get("bz1", ""),
+        }
+
+    @endpoint
+    def get_schedule(self, year: int, term: int, bitmask: bool = False):
+        """获取课程表信息，bitmask 为真时每门课附带 week_mask / session_mask"""
         url = urljoin(self.base_url, "kbcx/xskbcx_cxXsKb.html?gnmkdm=N2151")
         temp_term = term
         term = term**2 * 3
         data = {"xnm": str(year), "xqm": str(term)}
         try:
-            req_schedule = self.sess.post(
+            req_schedule = yield Request(
+                "POST",
                 url,
                 headers=self.headers,
                 data=data,
@@ -104,8 +180,7 @@ class ScheduleMixin:
             )
             if req_schedule.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_schedule.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_schedule):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             schedule = req_schedule.json()
             if not schedule.get("kbList"):
@@ -141,6 +216,10 @@ class ScheduleMixin:
                 "extra_courses": [i.get("qtkcgs") for i in schedule.get("sjkList")],
             }
             result = self.split_merge_display(result)
+            if bitmask:
+                for course in result["courses"]:
+                    course["week_mask"] = self.week_mask(course["weeks"])
+                    course["session_mask"] = self.session_mask(course["sessions"])
             return {"code": 1000, "msg": "获取课表成功", "data": result}
         except exceptions.Timeout:
             return {"code": 1003, "msg": "获取课表超时"}
@@ -155,8 +234,32 @@ class ScheduleMixin:
             traceback.print_exc()
             return {"code": 999, "msg": "获取课表时未记录的错误：" + str(e)}
 
-    def get_schedule_pdf(self, year: int, term: int, name: str = "导出"):
-        """获取课表pdf"""
+    @endpoint
+    def get_schedule_pdf(
+        self,
+        year: int,
+        term: int,
+        name: str = "导出",
+        file=None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ):
+        """获取课表pdf，指定 file（路径或文件对象）时边下载边写入文件"""
+        if file is None:
+            return (yield from self._schedule_pdf(year, term, name))
+        return (
+            yield from self._save_pdf(
+                functools.partial(self._schedule_pdf, year, term, name), file, chunk_size
+            )
+        )
+
+    @stream_endpoint
+    def iter_schedule_pdf(
+        self, year: int, term: int, name: str = "导出", chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ):
+        """逐块产出课表pdf内容"""
+        return (yield from self._schedule_pdf(year, term, name, EMIT_CHUNKS, chunk_size))
+
+    def _schedule_pdf(self, year, term, name, sink=None, chunk_size=None):
         url_policy = urljoin(self.base_url, "kbdy/bjkbdy_cxXnxqsfkz.html")
         url_file = urljoin(self.base_url, "kbcx/xskbcx_cxXsShcPdf.html")
         origin_term = term
@@ -185,7 +288,8 @@ class ScheduleMixin:
         }
         try:
             pilicy_params = {"gnmkdm": "N2151"}
-            req_policy = self.sess.post(
+            req_policy = yield Request(
+                "POST",
                 url_policy,
                 headers=self.headers,
                 data=data,
@@ -195,22 +299,28 @@ class ScheduleMixin:
             )
             if req_policy.status_code != 200:
                 return {"code": 2333, "msg": "教务系统挂了"}
-            doc = pq(req_policy.text)
-            if doc("h5").text() == "用户登录":
+            if self.is_session_expired(req_policy):
                 return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
             file_params = {"doType": "table"}
-            req_file = self.sess.post(
+            download = {} if sink is None else {"sink": sink, "chunk_size": chunk_size}
+            req_file = yield Request(
+                "POST",
                 url_file,
                 headers=self.headers,
                 data=data,
                 params=file_params,
                 cookies=self.cookies,
                 timeout=self.timeout,
+                **download,
             )
-            doc = pq(req_file.text)
-            if "错误" in doc("title").text():
-                error = doc("p.error_title").text()
-                return {"code": 998, "msg": error}
+            if sink is not None and req_file.content:
+                # 流式下载时只有 HTML/JSON 响应会被缓冲下来，它们都不是 pdf
+                return self._download_error(req_file)
+            if self.is_html(req_file):
+                doc = pq(req_file.text)
+                if "错误" in doc("title").text():
+                    error = doc("p.error_title").text()
+                    return {"code": 998, "msg": error}
             result = req_file.content
             return {"code": 1000, "msg": "获取课程表pdf成功", "data": result}
         except exceptions.Timeout:
@@ -228,48 +338,62 @@ class ScheduleMixin:
 
     @classmethod
     def display_course_time(cls, sessions):
+        """节次（如 ``1-2节``）的上课时间 ~ 下课时间，第 n 节对应 raspisanie[n - 1]"""
         if not sessions:
             return None
         args = re.findall(r"(\d+)", sessions)
-        start_time = cls.raspisanie[int(args[0]) + 1][0]
-        end_time = cls.raspisanie[int(args[0]) + 1][1]
-        return f"{start_time}~{end_time}"
+        first, last = int(args[0]), int(args[-1])
+        if not 1 <= first <= last <= len(cls.raspisanie):
+            return None
+        return f"{cls.raspisanie[first - 1][0]}~{cls.raspisanie[last - 1][1]}"
 
     @classmethod
     def list_sessions(cls, sessions):
         if not sessions:
             return None
-        args = re.findall(r"(\d+)", sessions)
-        return [n for n in range(int(args[0]), int(args[1]) + 1)]
+        return list(_parse_sessions(sessions))
 
     @classmethod
     def list_weeks(cls, weeks):
         """返回课程所含周列表"""
         if not weeks:
             return None
-        args = re.findall(r"[^,]+", weeks)
-        week_list = []
-        for item in args:
-            if "-" in item:
-                weeks_pair = re.findall(r"(\d+)", item)
-                if len(weeks_pair) != 2:
-                    continue
-                if "单" in item:
-                    for i in range(int(weeks_pair[0]), int(weeks_pair[1]) + 1):
-                        if i % 2 == 1:
-                            week_list.append(i)
-                elif "双" in item:
-                    for i in range(int(weeks_pair[0]), int(weeks_pair[1]) + 1):
-                        if i % 2 == 0:
-                            week_list.append(i)
-                else:
-                    for i in range(int(weeks_pair[0]), int(weeks_pair[1]) + 1):
-                        week_list.append(i)
-            else:
-                week_num = re.findall(r"(\d+)", item)
-                if len(week_num) == 1:
-                    week_list.append(int(week_num[0]))
-        return week_list
+        return list(_parse_weeks(weeks))
+
+    @staticmethod
+    def week_mask(weeks):
+        """周次字符串（如 ``1-16周(单)``）的位掩码，第 n 周对应第 n 位"""
+        return _bitmask(_parse_weeks(weeks)) if weeks else 0
+
+    @staticmethod
+    def session_mask(sessions):
+        """节次字符串（如 ``3-4节``）的位掩码，第 n 节对应第 n 位"""
+        return _bitmask(_parse_sessions(sessions)) if sessions else 0
+
+    @staticmethod
+    def mask_to_list(mask):
+        """位掩码转换回升序列表"""
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(low.bit_length() - 1)
+            mask ^= low
+        return result
+
+    @classmethod
+    def courses_conflict(cls, a, b):
+        """两门课是否在同一星期几的同一周、同一节次上课"""
+        if a.get("weekday") != b.get("weekday"):
+            return False
+        weeks_a, sessions_a = cls._course_masks(a)
+        weeks_b, sessions_b = cls._course_masks(b)
+        return bool(weeks_a & weeks_b and sessions_a & sessions_b)
+
+    @classmethod
+    def _course_masks(cls, course):
+        if "week_mask" in course and "session_mask" in course:
+            return course["week_mask"], course["session_mask"]
+        return cls.week_mask(course.get("weeks")), cls.session_mask(course.get("sessions"))
 
     @classmethod
     def get_display_term(cls, sid, year, term):
@@ -288,47 +412,57 @@ class ScheduleMixin:
 
     @classmethod
     def split_merge_display(cls, schedule):
-        repetIndex = []
-        count = 0
-        for items in schedule["courses"]:
-            for index in range(len(schedule["courses"])):
-                if (schedule["courses"]).index(items) == count:
-                    continue
-                elif (
-                    items["course_id"] == schedule["courses"][index]["course_id"]
-                    and items["weekday"] == schedule["courses"][index]["weekday"]
-                    and items["weeks"] == schedule["courses"][index]["weeks"]
-                ):
-                    repetIndex.append(index)
-            count += 1
-        if len(repetIndex) % 2 != 0:
+        """拆分教务系统合并显示的课程节次
+
+        只有与前面某条完全相同的课程条目会触发拆分：收集与它（课程号、星期、周次）
+        相同的全部条目，两两配对，把含四个数字的节次拆成前后两段。
+        """
+        courses = schedule["courses"]
+        groups = {}
+        for index, course in enumerate(courses):
+            key = (course.get("course_id"), course.get("weekday"), course.get("weeks"))
+            groups.setdefault(key, []).append(index)
+        duplicates = []
+        for group in groups.values():
+            if len(group) > 1:
+                duplicates.extend(cls._repeated_positions(courses, group))
+        if not duplicates:
+            return schedule
+        duplicates.sort()
+        repeat_index = []
+        for position in duplicates:
+            course = courses[position]
+            repeat_index.extend(groups[(course["course_id"], course["weekday"], course["weeks"])])
+        if len(repeat_index) % 2 != 0:
             return schedule
-        for r in range(0, len(repetIndex), 2):
-            fir = repetIndex[r]
-            sec = repetIndex[r + 1]
-            if len(re.findall(r"(\d+)", schedule["courses"][fir]["sessions"])) == 4:
-                schedule["courses"][fir]["sessions"] = (
-                    re.findall(r"(\d+)", schedule["courses"][fir]["sessions"])[0]
-                    + "-"
-                    + re.findall(r"(\d+)", schedule["courses"][fir]["sessions"])[1]
-                    + "节"
-                )
-                schedule["courses"][fir]["list_sessions"] = cls.list_sessions(
-                    schedule["courses"][fir]["sessions"]
-                )
-                schedule["courses"][fir]["time"] = cls.display_course_time(
-                    schedule["courses"][fir]["sessions"]
-                )
-                schedule["courses"][sec]["sessions"] = (
-                    re.findall(r"(\d+)", schedule["courses"][sec]["sessions"])[2]
-                    + "-"
-                    + re.findall(r"(\d+)", schedule["courses"][sec]["sessions"])[3]
-                    + "节"
-                )
-                schedule["courses"][sec]["list_sessions"] = cls.list_sessions(
-                    schedule["courses"][sec]["sessions"]
-                )
-                schedule["courses"][sec]["time"] = cls.display_course_time(
-                    schedule["courses"][sec]["sessions"]
-                )
+        for fir, sec in zip(repeat_index[0::2], repeat_index[1::2]):
+            sessions = re.findall(r"(\d+)", courses[fir]["sessions"])
+            if len(sessions) != 4:
+                continue
+            cls._set_sessions(courses[fir], f"{sessions[0]}-{sessions[1]}节")
+            sessions = re.findall(r"(\d+)", courses[sec]["sessions"])
+            cls._set_sessions(courses[sec], f"{sessions[2]}-{sessions[3]}节")
         return schedule
+
+    @staticmethod
+    def _repeated_positions(courses, group):
+        """group 中与更早条目完全相同的条目下标"""
+        seen = {}
+        for position in group:
+            course = courses[position]
+            try:
+                earlier = seen.setdefault(_freeze(course), [])
+            except TypeError:  # 含不可哈希的值时退回逐条比较
+                earlier = [courses[i] for i in group if i < position]
+            if any(other is course or other == course for other in earlier):
+                yield position
+            else:
+                earlier.append(course)
+
+    @classmethod
+    def _set_sessions(cls, course, sessions):
+        course["sessions"] = sessions
+        course["list_sessions"] = cls.list_sessions(sessions)
+        course["time"] = cls.display_course_time(sessions)
+        if "session_mask" in course:
+            course["session_mask"] = cls.session_mask(sessions)
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class MemorySessionStore:
+    """Keeps login cookies per (base_url, sid) for the life of the process."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def load(self, base_url, sid):
+        with self._lock:
+            entry = self._data.get((base_url, str(sid)))
+            return dict(entry) if entry else None
+
+    def save(self, base_url, sid, cookies, verified_at=None):
+        with self._lock:
+            self._data[(base_url, str(sid))] = {
+                "cookies": dict(cookies),
+                "verified_at": verified_at or time.time(),
+            }
+
+    def delete(self, base_url, sid):
+        with self._lock:
+            self._data.pop((base_url, str(sid)), None)
+
+
+class FileSessionStore:
+    """Persists login cookies as one JSON file per (base_url, sid).
+
+    Files are replaced atomically, so several worker processes can share a
+    directory and a restarted worker picks up the sessions of the old one.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, base_url, sid):
+        digest = hashlib.sha1(f"{base_url}\n{sid}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def load(self, base_url, sid):
+        try:
+            with open(self._path(base_url, sid), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, base_url, sid, cookies, verified_at=None):
+        entry = {
+            "base_url": base_url,
+            "sid": str(sid),
+            "cookies": dict(cookies),
+            "verified_at": verified_at or time.time(),
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, self._path(base_url, sid))
+
+    def delete(self, base_url, sid):
+        try:
+            os.remove(self._path(base_url, sid))
+        except FileNotFoundError:
+            pass
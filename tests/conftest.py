@@ -0,0 +1,81 @@
+import importlib.util
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+
+root = Path(__file__).resolve().parent.parent
+spec = importlib.util.spec_from_file_location(
+    "zfn_api", root / "__init__.py", submodule_search_locations=[str(root)]
+)
+pkg = importlib.util.module_from_spec(spec)
+sys.modules["zfn_api"] = pkg
+spec.loader.exec_module(pkg)
+
+
+class Upstream:
+    """Tiny canned-response server standing in for the teaching system."""
+
+    def __init__(self):
+        self.routes = {}
+        self.hits = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def route(self, path, body, status=200, content_type="application/json;charset=utf-8"):
+        """Serve ``body`` at ``path``; a callable body receives the posted form."""
+        if callable(body):
+            self.routes[path] = (status, content_type, body)
+            return
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body, ensure_ascii=False)
+        if isinstance(body, str):
+            body = body.encode()
+        self.routes[path] = (status, content_type, body)
+
+    def _handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode()) if length else {}
+                path = self.path.split("?")[0].lstrip("/")
+                upstream.hits.append(path)
+                status, content_type, body = upstream.routes.get(
+                    path, (404, "text/html", b"not found")
+                )
+                if callable(body):
+                    body = body(form)
+                    if not isinstance(body, (str, bytes)):
+                        body = json.dumps(body, ensure_ascii=False)
+                    if isinstance(body, str):
+                        body = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def upstream():
+    server = Upstream()
+    thread = threading.Thread(target=server.server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
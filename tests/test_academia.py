@@ -0,0 +1,160 @@
+import random
+import re
+import threading
+
+from zfn_api import Client, MemoryBackend, SharedTransport
+from zfn_api.academia import _scan_type_statistics
+
+MAIN_PATH = "xsxy/xsxyqk_cxXsxyqkIndex.html"
+INFO_PATH = "xsxy/xsxyqk_cxJxzxjhxfyqKcxx.html"
+
+
+def academia_page(categories):
+    blocks = "".join(
+        f'<div>\n<span title="类别{i}&nbsp;要求学分:{10 + i}.0&nbsp;获得学分:8.0&nbsp;'
+        f"未获得学分:0\"></span>\n<span id='showKc{i}'></span>\n</div>\n"
+        for i in range(categories)
+    )
+    return (
+        '<html><body><input id="xh_id" value="2101010101"/>'
+        f'<div id="alertBox">GPA：3.52</div>\n{blocks}</body></html>'
+    )
+
+
+def test_get_academia_fetches_details_concurrently_in_order(upstream):
+    upstream.route(MAIN_PATH, academia_page(6), content_type="text/html;charset=utf-8")
+    upstream.route(
+        INFO_PATH,
+        lambda form: [{"KCH": "K" + form["xfyqjd_id"][0], "KCMC": "课程", "XF": "2"}],
+    )
+    result = Client(base_url=upstream.base_url, max_workers=3).get_academia()
+    assert result["code"] == 1000
+    details = result["data"]["details"]
+    assert [d["type"] for d in details] == [f"类别{i}" for i in range(6)]
+    assert [d["courses"][0]["course_id"] for d in details] == [f"K{i}" for i in range(6)]
+    assert result["data"]["statistics"] == {"gpa": 3.52}
+
+
+def test_get_academia_details_do_not_exhaust_small_shared_pool(upstream):
+    # 详情响应在整批返回前若未读完会一直占用连接，类别数超过连接池大小时会卡死
+    upstream.route(MAIN_PATH, academia_page(6), content_type="text/html;charset=utf-8")
+    upstream.route(INFO_PATH, lambda form: [{"KCH": "K" + form["xfyqjd_id"][0]}])
+    for max_workers in (4, 1):
+        transport = SharedTransport(max_connections=2)
+        client = Client(base_url=upstream.base_url, transport=transport, max_workers=max_workers)
+        results = []
+        worker = threading.Thread(target=lambda: results.append(client.get_academia()), daemon=True)
+        worker.start()
+        worker.join(5)
+        assert results and results[0]["code"] == 1000
+
+
+def test_course_categories_are_fetched_once_per_distinct_course(upstream):
+    upstream.route(MAIN_PATH, academia_page(3), content_type="text/html;charset=utf-8")
+    upstream.route(
+        INFO_PATH,
+        lambda form: [{"KCH": "A"}, {"KCH": "B"}, {"KCH": "K" + form["xfyqjd_id"][0]}],
+    )
+    ths = "".join(f"<th>{h}</th>" for h in ["课程号", "名称", "学分", "学时", "性质", "归属", "网络课程"])
+    upstream.route(
+        "jxjhgl/common_cxKcJbxx.html",
+        f"<table><tr>{ths}</tr></table>",
+        content_type="text/html;charset=utf-8",
+    )
+    client = Client(
+        base_url=upstream.base_url,
+        detail_category_type=["类别0", "类别1"],
+        category_cache=MemoryBackend(),
+    )
+    result = client.get_academia()
+    categories = [[c["category"] for c in d["courses"]] for d in result["data"]["details"]]
+    assert categories == [["网络课程"] * 3, ["网络课程"] * 3, [None] * 3]
+    assert upstream.hits.count("jxjhgl/common_cxKcJbxx.html") == 4
+    client.get_academia()
+    assert upstream.hits.count("jxjhgl/common_cxKcJbxx.html") == 4
+
+
+def test_academia_pdf_prepares_each_session_once(upstream):
+    prepare = [
+        "bysxxcx/xscjzbdy_dyXscjzbView.html",
+        "bysxxcx/xscjzbdy_dyCjdyszxView.html",
+        "xtgl/bysxxcx/xscjzbdy_cxXsCount.html",
+        "bysxxcx/xscjzbdy_cxGswjlx.html",
+        "common/common_cxJwxtxx.html",
+    ]
+    progress = "xtgl/progress_cxProgressStatus.html"
+    for path in prepare + [progress]:
+        upstream.route(path, "1")
+    upstream.route("bysxxcx/xscjzbdy_dyList.html", '"\\/temp\\/cjzb.pdf"#成功')
+    upstream.route("temp/cjzb.pdf", b"%PDF-1.4 transcript", content_type="application/pdf")
+
+    client = Client({"JSESSIONID": "S1"}, base_url=upstream.base_url)
+    assert client.get_academia_pdf()["data"] == b"%PDF-1.4 transcript"
+    # 准备请求按原有顺序逐个发送
+    assert upstream.hits == prepare + ["bysxxcx/xscjzbdy_dyList.html", progress, "temp/cjzb.pdf"]
+
+    upstream.hits.clear()
+    assert client.get_academia_pdf()["code"] == 1000
+    assert upstream.hits == ["bysxxcx/xscjzbdy_dyList.html", progress, "temp/cjzb.pdf"]
+
+    upstream.hits.clear()
+    upstream.route(
+        "bysxxcx/xscjzbdy_dyList.html", "<h5>用户登录</h5>", content_type="text/html;charset=utf-8"
+    )
+    assert client.get_academia_pdf()["code"] == 1006
+    assert client.get_academia_pdf()["code"] == 1006
+    assert upstream.hits[1] == prepare[0]
+
+
+def test_academia_pdf_failed_setup_is_not_memoized(upstream):
+    prepare = [
+        "bysxxcx/xscjzbdy_dyXscjzbView.html",
+        "bysxxcx/xscjzbdy_dyCjdyszxView.html",
+        "xtgl/bysxxcx/xscjzbdy_cxXsCount.html",
+        "bysxxcx/xscjzbdy_cxGswjlx.html",
+        "common/common_cxJwxtxx.html",
+    ]
+    for path in prepare + ["xtgl/progress_cxProgressStatus.html"]:
+        upstream.route(path, "1")
+    upstream.route("bysxxcx/xscjzbdy_cxGswjlx.html", "error", status=500)
+    upstream.route("bysxxcx/xscjzbdy_dyList.html", '"\\/temp\\/cjzb.pdf"#成功')
+    upstream.route("temp/cjzb.pdf", b"%PDF-1.4 transcript", content_type="application/pdf")
+
+    client = Client({"JSESSIONID": "S2"}, base_url=upstream.base_url)
+    assert client.get_academia_pdf()["code"] == 2333
+    assert upstream.hits == prepare[:4]
+
+    upstream.hits.clear()
+    upstream.route("bysxxcx/xscjzbdy_cxGswjlx.html", "1")
+    assert client.get_academia_pdf()["code"] == 1000
+    assert upstream.hits[:5] == prepare
+
+    upstream.hits.clear()
+    upstream.route(
+        "common/common_cxJwxtxx.html", "<h5>用户登录</h5>", content_type="text/html;charset=utf-8"
+    )
+    client = Client({"JSESSIONID": "S3"}, base_url=upstream.base_url)
+    assert client.get_academia_pdf()["code"] == 1006
+    assert client.get_academia_pdf()["code"] == 1006
+    assert upstream.hits == prepare + prepare
+
+
+LEGACY_TYPE_STATISTICS = re.compile(
+    r"\"(.*)&nbsp.*要求学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;).*获得学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;).*未获得学分.*:([0-9]{1,}[.][0-9]*|0|&nbsp;)[\s\S]*?<span id='showKc(.*)'></span>"
+)
+
+
+def test_type_statistics_scanner_matches_legacy_regex():
+    tokens = ['"', "&nbsp", "&nbsp;", "要求学分", "获得学分", "未获得学分", ":", "0", "1", "."]
+    tokens += ["\n", "<span id='showKc", "'></span>", "x", ":1.5", ":0", ":&nbsp;"]
+    rng = random.Random(17)
+    pages = [academia_page(5)] + [
+        "".join(rng.choice(tokens) for _ in range(rng.randint(0, 60))) for _ in range(3000)
+    ]
+    for page in pages:
+        assert _scan_type_statistics(page) == LEGACY_TYPE_STATISTICS.findall(page), page
+    statistics = Client.get_academia_type_statistics(academia_page(2))
+    assert statistics["类别1"] == {
+        "id": "1",
+        "credits": {"required": "11.0", "earned": "8.0", "missed": None},
+    }
@@ -0,0 +1,33 @@
+import asyncio
+
+from zfn_api import AsyncClient, Client
+
+GRADE_PATH = "cjcx/cjcx_cxXsgrcj.html"
+GRADES = {
+    "items": [
+        {"xh": "2101", "xm": "张三", "kch_id": "A1", "kcmc": "高数", "xf": "4", "cj": "95", "jd": "4.5"},
+        {"xh": "2101", "xm": "张三", "kch_id": "B2", "kcmc": "英语", "xf": "2", "cj": "优", "jd": "4"},
+    ]
+}
+
+
+def test_async_client_matches_sync_client(upstream):
+    upstream.route(GRADE_PATH, GRADES)
+
+    async def fetch():
+        async with AsyncClient(base_url=upstream.base_url) as stu:
+            return await stu.get_grade(2024, 1)
+
+    expected = Client(base_url=upstream.base_url).get_grade(2024, 1)
+    assert expected["code"] == 1000
+    assert asyncio.run(fetch()) == expected
+
+
+def test_async_client_reports_expired_session(upstream):
+    upstream.route(GRADE_PATH, "<h5>用户登录</h5>", content_type="text/html;charset=utf-8")
+
+    async def fetch():
+        async with AsyncClient(base_url=upstream.base_url) as stu:
+            return await stu.get_grade(2024, 1)
+
+    assert asyncio.run(fetch())["code"] == 1006
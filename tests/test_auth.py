@@ -0,0 +1,114 @@
+import base64
+import time
+
+import rsa
+
+from zfn_api import Client, FileSessionStore
+
+LOGIN_PATH = "xtgl/login_slogin.html"
+KEY_PATH = "xtgl/login_getPublicKey.html"
+
+
+def b64_int(value):
+    return base64.b64encode(value.to_bytes((value.bit_length() + 7) // 8, "big")).decode()
+
+
+class LoginServer:
+    def __init__(self, upstream):
+        self.rotate()
+        upstream.route(KEY_PATH, lambda form: self.public_key)
+        upstream.route(LOGIN_PATH, self.login, content_type="text/html;charset=utf-8")
+
+    def rotate(self):
+        public, self.private = rsa.newkeys(512)
+        self.public_key = {"modulus": b64_int(public.n), "exponent": b64_int(public.e)}
+
+    def login(self, form):
+        if not form:
+            return '<input id="csrftoken" value="token"/>'
+        try:
+            password = rsa.decrypt(base64.b64decode(form["mm"][0]), self.private)
+        except rsa.DecryptionError:
+            password = None
+        if password != b"secret":
+            return '<p id="tips">用户名或密码不正确</p>'
+        return "<html></html>"
+
+
+def test_login_reuses_cached_public_key_until_it_rotates(upstream):
+    server = LoginServer(upstream)
+    assert Client(base_url=upstream.base_url).login("2101", "secret")["code"] == 1000
+    assert upstream.hits == [LOGIN_PATH, KEY_PATH, LOGIN_PATH]
+
+    upstream.hits.clear()
+    assert Client(base_url=upstream.base_url).login("2101", "secret")["code"] == 1000
+    assert upstream.hits == [LOGIN_PATH, LOGIN_PATH]
+
+    server.rotate()
+    upstream.hits.clear()
+    assert Client(base_url=upstream.base_url).login("2101", "secret")["code"] == 1000
+    assert upstream.hits == [LOGIN_PATH, LOGIN_PATH, KEY_PATH, LOGIN_PATH, LOGIN_PATH]
+
+    # 公钥未变时密码错误只提交一次
+    upstream.hits.clear()
+    assert Client(base_url=upstream.base_url).login("2101", "wrong")["code"] == 1002
+    assert upstream.hits == [LOGIN_PATH, LOGIN_PATH, KEY_PATH]
+
+
+def test_kaptcha_login_gets_current_public_key(upstream):
+    server = LoginServer(upstream)
+    assert Client(base_url=upstream.base_url).login("2101", "secret")["code"] == 1000
+    server.rotate()
+    upstream.route(
+        LOGIN_PATH,
+        '<input id="csrftoken" value="token"/><input id="yzm"/>',
+        content_type="text/html;charset=utf-8",
+    )
+    upstream.route("kaptcha", b"GIF89a", content_type="image/gif")
+    upstream.hits.clear()
+    result = Client(base_url=upstream.base_url).login("2101", "secret")
+    assert result["code"] == 1001
+    data = result["data"]
+    assert {"modulus": data["modulus"], "exponent": data["exponent"]} == server.public_key
+    assert upstream.hits == [LOGIN_PATH, KEY_PATH, "kaptcha"]
+
+
+def test_ensure_login_restores_persisted_session(upstream, tmp_path):
+    LoginServer(upstream)
+    probe_path = "xsxxxggl/xsxxwh_cxCkDgxsxx.html"
+    upstream.route(probe_path, {"xh": "2101"})
+    store = FileSessionStore(str(tmp_path))
+    store.save(upstream.base_url, "2101", {"JSESSIONID": "abc"}, verified_at=1)
+
+    client = Client(base_url=upstream.base_url, sid="2101", session_store=store)
+    assert client.cookies == {"JSESSIONID": "abc"}
+    assert client.ensure_login("2101", "secret")["msg"] == "会话有效"
+    assert upstream.hits == [probe_path]
+    assert client.ensure_login("2101", "secret")["msg"] == "会话有效"
+    assert upstream.hits == [probe_path]
+
+    upstream.route(probe_path, "<h5>用户登录</h5>", content_type="text/html;charset=utf-8")
+    upstream.hits.clear()
+    restarted = Client(base_url=upstream.base_url, sid="2101", session_store=store, session_trust=0)
+    assert restarted.ensure_login("2101", "secret")["msg"] == "登录成功"
+    assert upstream.hits[0] == probe_path and LOGIN_PATH in upstream.hits
+    assert store.load(upstream.base_url, "2101")["cookies"] == restarted.cookies
+
+
+def test_ensure_login_keeps_session_when_probe_fails(upstream, tmp_path):
+    LoginServer(upstream)
+    probe_path = "xsxxxggl/xsxxwh_cxCkDgxsxx.html"
+    store = FileSessionStore(str(tmp_path))
+    store.save(upstream.base_url, "2101", {"JSESSIONID": "abc"}, verified_at=1)
+
+    def slow(form):
+        time.sleep(0.3)
+        return {"xh": "2101"}
+
+    upstream.route(probe_path, slow)
+    client = Client(base_url=upstream.base_url, sid="2101", session_store=store, timeout=0.1)
+    assert client.ensure_login("2101", "secret")["code"] == 1003
+    upstream.route(probe_path, "服务器错误", status=500, content_type="text/html;charset=utf-8")
+    assert client.ensure_login("2101", "secret")["code"] == 2333
+    assert LOGIN_PATH not in upstream.hits
+    assert store.load(upstream.base_url, "2101")["cookies"] == {"JSESSIONID": "abc"}
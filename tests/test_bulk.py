@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+from zfn_api import BulkRunner, Job, RateLimiter
+
+GRADE_PATH = "cjcx/cjcx_cxXsgrcj.html"
+
+
+def grade_jobs(count):
+    return [
+        Job("get_grade", (2024, 1), cookies={"JSESSIONID": str(n)}, tag=n) for n in range(count)
+    ]
+
+
+def test_bulk_runner_streams_results_and_counts_codes(upstream):
+    upstream.route(
+        GRADE_PATH,
+        lambda form: {"items": [{"xh": "1", "xm": "张三"}] if form["xqm"] == ["12"] else []},
+    )
+    runner = BulkRunner(upstream.base_url, concurrency=4)
+    jobs = grade_jobs(10) + [Job("get_grade", (2024, 2), cookies={"JSESSIONID": "x"}, tag="other")]
+    tags = [job.tag for job, result in runner.run(jobs)]
+    assert sorted(map(str, tags)) == sorted(map(str, range(10))) + ["other"]
+    summary = runner.summary()
+    assert summary["completed"] == 11
+    assert summary["codes"] == {1000: 1, 1005: 10}
+
+
+def test_bulk_runner_async_respects_rate_limit(upstream):
+    upstream.route(GRADE_PATH, {"items": []})
+    runner = BulkRunner(upstream.base_url, concurrency=8, rate_limit=50, burst=1)
+
+    async def collect():
+        return [result async for job, result in runner.arun(grade_jobs(10))]
+
+    start = time.perf_counter()
+    results = asyncio.run(collect())
+    assert len(results) == 10 and runner.summary()["codes"] == {1005: 10}
+    assert time.perf_counter() - start >= 9 / 50
+
+
+def test_rate_limiter_allows_burst_then_spaces_requests():
+    limiter = RateLimiter(rate=10, burst=3)
+    delays = [limiter._reserve("http://jw.example/") for _ in range(5)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert 0.05 < delays[3] <= 0.1 and 0.15 < delays[4] <= 0.2
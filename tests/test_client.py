@@ -1,18 +1,88 @@
-import importlib.util
-import sys
-from pathlib import Path
+import asyncio
 
-root = Path(__file__).resolve().parent.parent
-spec = importlib.util.spec_from_file_location(
-    "zfn_api", root / "__init__.py", submodule_search_locations=[str(root)]
-)
-pkg = importlib.util.module_from_spec(spec)
-sys.modules["zfn_api"] = pkg
-spec.loader.exec_module(pkg)
+import requests
 
-from zfn_api import Client
+from zfn_api import AsyncClient, Client, MemoryBackend, ResponseCache, SharedTransport, SQLiteBackend
 
 
 def test_client_can_instantiate():
     client = Client()
     assert isinstance(client, Client)
+
+
+def test_shared_transport_reuses_connections(upstream):
+    upstream.route("cjcx/cjcx_cxXsgrcj.html", {"items": []})
+    transport = SharedTransport(max_connections=2)
+    first = Client(base_url=upstream.base_url, transport=transport)
+    second = Client(base_url=upstream.base_url, transport=transport)
+    assert first.sess.cookies is not second.sess.cookies
+    for client in (first, second, first):
+        assert client.get_grade(2024, 1)["code"] == 1005
+    assert transport.stats() == {"connections": 1, "requests": 3}
+
+
+def test_exhausted_shared_pool_does_not_block(upstream):
+    upstream.route("cjcx/cjcx_cxXsgrcj.html", {"items": []})
+    transport = SharedTransport(max_connections=1)
+    holder = Client(base_url=upstream.base_url, transport=transport)
+    held = holder.sess.get(upstream.base_url + "cjcx/cjcx_cxXsgrcj.html", stream=True)
+    try:
+        client = Client(base_url=upstream.base_url, transport=transport)
+        assert client.get_grade(2024, 1)["code"] == 1005
+    finally:
+        held.close()
+
+
+def test_shared_transport_stats_cover_async_and_evicted_pools(upstream):
+    upstream.route("cjcx/cjcx_cxXsgrcj.html", {"items": []})
+    transport = SharedTransport(max_hosts=1)
+    localhost = upstream.base_url.replace("127.0.0.1", "localhost")
+    for base_url in (upstream.base_url, localhost, upstream.base_url):
+        assert Client(base_url=base_url, transport=transport).get_grade(2024, 1)["code"] == 1005
+    # 每次换主机都会淘汰唯一的连接池，其计数仍然保留
+    assert transport.stats() == {"connections": 3, "requests": 3}
+
+    async def fetch():
+        async with AsyncClient(base_url=upstream.base_url, transport=transport) as stu:
+            for _ in range(2):
+                assert (await stu.get_grade(2024, 1))["code"] == 1005
+        await transport.aclose()
+
+    asyncio.run(fetch())
+    assert transport.stats() == {"connections": 4, "requests": 5}
+
+
+def make_response(body, content_type="text/html;charset=utf-8", url="http://jw/x.html"):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = content_type
+    response.encoding = "utf-8"
+    response.url = url
+    response._content = body.encode()
+    return response
+
+
+def test_is_session_expired():
+    login_page = "<html><body><h5>用户登录</h5></body></html>"
+    assert Client.is_session_expired(make_response(login_page))
+    assert not Client.is_session_expired(make_response('{"h5": "用户登录"}'))
+    assert not Client.is_session_expired(make_response("null", content_type="text/html"))
+    assert not Client.is_session_expired(make_response("<p>用户登录</p>"))
+    redirected = make_response("", url="http://jw/xtgl/login_slogin.html")
+    redirected.history = [make_response("")]
+    assert Client.is_session_expired(redirected)
+
+
+def test_response_cache_hits_and_invalidation(upstream, tmp_path):
+    upstream.route("cjcx/cjcx_cxXsgrcj.html", {"items": [{"xh": "2101", "xm": "张三"}]})
+    for backend in (MemoryBackend(maxsize=8), SQLiteBackend(str(tmp_path / "cache.db"))):
+        upstream.hits.clear()
+        cache = ResponseCache(backend=backend)
+        client = Client(base_url=upstream.base_url, sid="2101", cache=cache)
+        first = client.get_grade(2024, 1)
+        assert client.get_grade(2024, term=1) == first
+        assert len(upstream.hits) == 1
+        client.invalidate_cache("get_grade")
+        client.get_grade(2024, 1)
+        assert len(upstream.hits) == 2
+        assert cache.stats()["endpoints"]["get_grade"] == {"hits": 1, "misses": 2}
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from pathlib import Path
+
+from zfn_api import AsyncClient, CircuitBreaker, Client, RetryPolicy
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+GRADE_PATH = "cjcx/cjcx_cxXsgrcj.html"
+INFO_PATH = "xsxxxggl/xsgrxxwh_cxXsgrxx.html"
+DETAILS_PATH = "xszbbgl/xszbbgl_cxXszbbsqIndex.html"
+
+
+def slow(body, delay):
+    def reply(form):
+        time.sleep(delay)
+        return body
+
+    return reply
+
+
+def test_deadline_bounds_multi_request_call(upstream):
+    html = "text/html;charset=utf-8"
+    upstream.route(INFO_PATH, slow((FIXTURES / "info.html").read_text(encoding="utf-8"), 0.15), content_type=html)
+    upstream.route(DETAILS_PATH, slow((FIXTURES / "info_details.html").read_text(encoding="utf-8"), 0.15), content_type=html)
+    stu = Client(base_url=upstream.base_url)
+    assert stu._get_info()["code"] == 1000
+    assert upstream.hits == [INFO_PATH, DETAILS_PATH]
+
+    start = time.monotonic()
+    result = stu._get_info(deadline=0.25)
+    assert result == {"code": 1003, "msg": "获取个人信息超时"}
+    assert time.monotonic() - start < 0.35
+    assert upstream.hits[2:] == [INFO_PATH, DETAILS_PATH]
+
+
+def test_exhausted_deadline_skips_request(upstream):
+    stu = Client(base_url=upstream.base_url, deadline=0)
+    assert stu.get_grade(2024, 1)["code"] == 1003
+    assert stu.get_grade(2024, 1, deadline=None)["code"] != 1003
+    assert upstream.hits == [GRADE_PATH]
+
+
+def test_deadline_stops_retries_and_applies_to_async(upstream):
+    upstream.route(GRADE_PATH, slow("upstream error", 0.05))
+    stu = Client(base_url=upstream.base_url, retry=RetryPolicy(attempts=5, backoff=1.0, max_backoff=1.0))
+    start = time.monotonic()
+    result = stu.get_grade(2024, 1, deadline=0.15)
+    assert result["code"] in (1003, 2333)
+    assert time.monotonic() - start < 0.3
+
+    upstream.route(GRADE_PATH, slow({"items": []}, 0.5))
+
+    async def fetch():
+        async with AsyncClient(base_url=upstream.base_url) as client:
+            return await client.get_grade(2024, 1, deadline=0.1)
+
+    start = time.monotonic()
+    assert asyncio.run(fetch())["code"] == 1003
+    assert time.monotonic() - start < 0.4
+
+
+def test_deadline_timeouts_do_not_trip_shared_breaker(upstream):
+    breaker = CircuitBreaker(min_calls=2, window=4)
+    retry = RetryPolicy(attempts=3, backoff=0)
+    tight = Client(base_url=upstream.base_url, circuit_breaker=breaker, retry=retry)
+    for _ in range(3):
+        assert tight.get_grade(2024, 1, deadline=1e-9)["code"] == 1003
+    assert upstream.hits == []
+
+    upstream.route(GRADE_PATH, slow({"items": []}, 0.2))
+    assert tight.get_grade(2024, 1, deadline=0.05)["code"] == 1003
+    assert upstream.hits == [GRADE_PATH]
+    assert breaker.state == "closed"
+
+    healthy = Client(base_url=upstream.base_url, circuit_breaker=breaker)
+    assert healthy.get_grade(2024, 1)["code"] != 2333
+    assert upstream.hits == [GRADE_PATH, GRADE_PATH]
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from zfn_api import AsyncClient, Client, HedgePolicy
+
+GRADE_PATH = "cjcx/cjcx_cxXsgrcj.html"
+GRADES = {"items": [{"xh": "2101", "xm": "张三", "kch_id": "A1", "kcmc": "高数", "xf": "4", "cj": "95", "jd": "4.5"}]}
+
+
+def first_slow(delay):
+    """第一次请求卡住 delay 秒，之后立即返回"""
+    calls = []
+
+    def reply(form):
+        calls.append(form)
+        if len(calls) == 1:
+            time.sleep(delay)
+        return GRADES
+
+    return reply
+
+
+def test_hedge_answers_from_faster_copy(upstream):
+    upstream.route(GRADE_PATH, first_slow(0.6))
+    hedge = HedgePolicy(initial_delay=0.05, budget=1.0, burst=1)
+    stu = Client(base_url=upstream.base_url, hedge=hedge)
+    start = time.monotonic()
+    assert stu.get_grade(2024, 1)["code"] == 1000
+    assert time.monotonic() - start < 0.4
+    assert upstream.hits.count(GRADE_PATH) == 2
+    assert hedge.stats()["hedges"] == 1
+
+
+def test_hedge_budget_caps_extra_load(upstream):
+    upstream.route(GRADE_PATH, first_slow(0.3))
+    hedge = HedgePolicy(initial_delay=0.05, budget=0.0)
+    stu = Client(base_url=upstream.base_url, hedge=hedge)
+    start = time.monotonic()
+    assert stu.get_grade(2024, 1)["code"] == 1000
+    assert time.monotonic() - start >= 0.3
+    assert upstream.hits.count(GRADE_PATH) == 1
+    assert hedge.stats() == {"requests": 1, "hedges": 0, "ratio": 0.0}
+
+    hedge = HedgePolicy(budget=0.1, burst=3)
+    granted = 0
+    for _ in range(100):
+        hedge.delay("get_grade")
+        granted += hedge.try_hedge()
+    assert granted == 10
+
+
+def test_hedge_delay_follows_observed_latency():
+    hedge = HedgePolicy(quantile=0.9, min_samples=10, initial_delay=2.0, min_delay=0.01)
+    assert hedge.delay("get_grade") == 2.0
+    for ms in range(1, 101):
+        hedge.observe("get_grade", ms / 1000)
+    assert abs(hedge.delay("get_grade") - 0.091) < 1e-9
+    assert hedge.delay("get_schedule") == 2.0
+    assert not hedge.hedges_endpoint("select_course")
+
+
+def test_async_hedge(upstream):
+    upstream.route(GRADE_PATH, first_slow(0.6))
+    hedge = HedgePolicy(initial_delay=0.05, budget=1.0, burst=1)
+
+    async def fetch():
+        async with AsyncClient(base_url=upstream.base_url, hedge=hedge) as stu:
+            return await stu.get_grade(2024, 1)
+
+    start = time.monotonic()
+    assert asyncio.run(fetch())["code"] == 1000
+    assert time.monotonic() - start < 0.4
+    assert hedge.stats()["hedges"] == 1
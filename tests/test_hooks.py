@@ -0,0 +1,120 @@
+import asyncio
+import time
+from pathlib import Path
+
+from zfn_api import AsyncClient, Client, MetricsCollector, ResponseCache
+
+GRADE_PATH = "cjcx/cjcx_cxXsgrcj.html"
+GRADES = {
+    "items": [
+        {"xh": "2101", "xm": "张三", "kch_id": "A1", "kcmc": "高数", "xf": "4", "cj": "95", "jd": "4.5"},
+    ],
+    "totalPage": 1,
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, event):
+        self.events.append(("before", event.endpoint, event.path, event.status))
+
+    def after_request(self, event):
+        self.events.append(("after", event.endpoint, event.path, event.status, event.bytes))
+
+    def after_parse(self, event):
+        self.events.append(("parse", event.endpoint, event.code, len(event.requests)))
+        assert 0 <= event.parse <= event.elapsed
+
+
+def test_hooks_see_requests_and_results(upstream):
+    upstream.route(GRADE_PATH, GRADES)
+    recorder = Recorder()
+    stu = Client(base_url=upstream.base_url, hooks=[recorder])
+    assert stu.get_grade(2024, 1)["code"] == 1000
+    assert list(stu.iter_grade(2024, 1))
+    size = len(upstream.routes[GRADE_PATH][2])
+    path = "/" + GRADE_PATH
+    assert recorder.events == [
+        ("before", "get_grade", path, None),
+        ("after", "get_grade", path, 200, size),
+        ("parse", "get_grade", 1000, 1),
+        ("before", "iter_grade", path, None),
+        ("after", "iter_grade", path, 200, size),
+        ("parse", "iter_grade", 1000, 1),
+    ]
+
+
+def test_async_hooks_match_sync(upstream):
+    upstream.route(GRADE_PATH, GRADES)
+    sync, concurrent = Recorder(), Recorder()
+    Client(base_url=upstream.base_url, hooks=[sync]).get_grade(2024, 1)
+
+    async def fetch():
+        async with AsyncClient(base_url=upstream.base_url, hooks=[concurrent]) as stu:
+            return await stu.get_grade(2024, 1)
+
+    asyncio.run(fetch())
+    assert concurrent.events == sync.events
+
+
+def test_metrics_collector_prometheus_text(upstream):
+    upstream.route(GRADE_PATH, GRADES)
+    upstream.route("xtgl/index_cxDbsy.html", lambda form: time.sleep(0.3) or "{}")
+    metrics = MetricsCollector()
+    stu = Client(base_url=upstream.base_url, timeout=0.1)
+    stu.add_hook(metrics)
+    stu.get_grade(2024, 1)
+    stu.get_grade(2024, 1)
+    upstream.route(GRADE_PATH, "<h5>用户登录</h5>", content_type="text/html;charset=utf-8")
+    stu.get_grade(2024, 1)
+    stu.get_notifications()
+    text = metrics.render()
+    path = "/" + GRADE_PATH
+    assert "# TYPE zfn_api_upstream_requests_total counter" in text
+    assert "# TYPE zfn_api_call_duration_seconds histogram" in text
+    assert f'zfn_api_upstream_requests_total{{endpoint="get_grade",method="POST",path="{path}",status="200"}} 3' in text
+    assert 'zfn_api_calls_total{endpoint="get_grade",code="1000"} 2' in text
+    assert 'zfn_api_calls_total{endpoint="get_grade",code="1006"} 1' in text
+    assert 'zfn_api_calls_total{endpoint="get_notifications",code="1003"} 1' in text
+    assert ',status="ReadTimeout"} 1' in text
+    assert 'zfn_api_call_duration_seconds_bucket{endpoint="get_grade",le="+Inf"} 3' in text
+    assert 'zfn_api_call_duration_seconds_count{endpoint="get_grade"} 3' in text
+    assert text.endswith("\n")
+
+
+def test_no_hooks_keeps_flow_unwrapped(upstream):
+    upstream.route(GRADE_PATH, GRADES)
+    stu = Client(base_url=upstream.base_url)
+    flow = stu.get_grade.flow(stu, 2024, 1)
+    assert stu._trace(flow) == (None, flow)
+
+
+def test_profile_breakdown_per_call_and_per_client(upstream):
+    upstream.route(GRADE_PATH, GRADES)
+    upstream.route(
+        "xsxxxggl/xsgrxxwh_cxXsgrxx.html",
+        (Path(__file__).parent / "fixtures" / "info.html").read_text(encoding="utf-8"),
+        content_type="text/html;charset=utf-8",
+    )
+    stu = Client(base_url=upstream.base_url, cache=ResponseCache(), sid="2101")
+    assert "profile" not in stu._get_info()
+    profile = stu._get_info(profile=True)["profile"]
+    assert profile["request_count"] == 1
+    assert profile["requests"][0]["status"] == 200
+    assert profile["requests"][0]["path"] == "/xsxxxggl/xsgrxxwh_cxXsgrxx.html"
+    assert profile["phases"]["html_parse"]["count"] == 1
+    assert set(profile["phases"]) == {"html_parse", "transform"}
+    parts = profile["network_ms"] + profile["cpu_ms"]
+    assert abs(parts - profile["elapsed_ms"]) < 0.01
+    assert profile["cpu_ms"] >= profile["phases"]["html_parse"]["ms"]
+
+    # 开启 profile 的调用不读写缓存
+    profiled = Client(base_url=upstream.base_url, cache=stu.cache, sid="2101", profile=True)
+    stu.get_grade(2024, 1)
+    hits = len(upstream.hits)
+    assert profiled.get_grade(2024, 1)["profile"]["request_count"] == 1
+    assert len(upstream.hits) == hits + 1
+    assert "profile" not in stu.get_grade(2024, 1)
+    assert "profile" not in profiled.get_grade(2024, 1, profile=False)
@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from zfn_api import LoadGenerator
+from zfn_api.loadgen import main, parse_mix, percentile
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+from standin import JSON, StandInServer  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def standin():
+    with StandInServer(key_bits=512) as server:
+        yield server
+
+
+def test_parse_mix_and_percentile():
+    assert parse_mix("login=1,get_grade=3") == {"login": 1.0, "get_grade": 3.0}
+    with pytest.raises(ValueError):
+        parse_mix("drop_course=1")
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([], 50) is None
+
+
+def test_loadgen_report(standin):
+    generator = LoadGenerator(standin.base_url, students=4, iterations=5, seed=7)
+    report = generator.run()
+    operations = report["per_operation"]
+    assert report["operations"] == 4 * 6
+    assert report["codes"] == {1000: 24}
+    assert operations["login"]["count"] >= 4
+    assert sum(stat["count"] for stat in operations.values()) == 24
+    assert set(operations) <= {"login", "get_schedule", "get_grade", "get_notifications", "select_course"}
+    assert all(stat["p50_ms"] <= stat["p99_ms"] <= stat["max_ms"] for stat in operations.values())
+    connections = report["connections"]
+    assert connections["connections"] <= 4
+    assert connections["requests_per_connection"] > 1
+    assert "requests per connection" in generator.format(report)
+
+
+def test_loadgen_relogin_after_expiry(standin):
+    standin.session_ttl, ttl = 0.05, standin.session_ttl
+    try:
+        generator = LoadGenerator(
+            standin.base_url, students=1, iterations=3, think=0.1, mix={"get_grade": 1}
+        )
+        report = generator.run()
+    finally:
+        standin.session_ttl = ttl
+    assert report["per_operation"]["get_grade"]["codes"] == {1000: 1, 1006: 1}
+    assert report["per_operation"]["login"]["count"] == 2
+
+
+def test_loadgen_no_relogin_after_upstream_error(standin, monkeypatch):
+    monkeypatch.setitem(standin.routes, "cjcx/cjcx_cxXsgrcj.html", lambda request, session: (500, JSON, {}))
+    generator = LoadGenerator(standin.base_url, students=2, iterations=4, mix={"get_grade": 1})
+    report = generator.run()
+    assert report["per_operation"]["get_grade"]["codes"] == {2333: 8}
+    assert report["per_operation"]["login"]["count"] == 2
+
+
+def test_loadgen_cli_json(standin, capsys):
+    main([standin.base_url, "-n", "2", "-i", "2", "--mix", "get_notifications=1", "--json"])
+    out = capsys.readouterr().out
+    assert '"get_notifications"' in out and '"requests_per_connection"' in out
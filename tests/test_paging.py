@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from zfn_api import ApiError, AsyncClient, Client
+
+GRADE_PATH = "cjcx/cjcx_cxXsgrcj.html"
+
+
+def paged_grades(total):
+    def page(form):
+        size = int(form["queryModel.showCount"][0])
+        current = int(form["queryModel.currentPage"][0])
+        items = [
+            {"kch_id": f"C{n}", "kcmc": f"课程{n}", "cj": str(n)}
+            for n in range((current - 1) * size, min(current * size, total))
+        ]
+        return {"items": items, "totalPage": -(-total // size), "totalResult": total}
+
+    return page
+
+
+def test_iter_grade_follows_total_page(upstream):
+    upstream.route(GRADE_PATH, paged_grades(250))
+    client = Client(base_url=upstream.base_url)
+    grades = list(client.iter_grade(2024, 1, page_size=100, concurrent_pages=2))
+    assert [g["grade"] for g in grades] == list(range(250))
+    assert upstream.hits.count(GRADE_PATH) == 3
+
+
+def test_async_iter_grade_and_errors(upstream):
+    upstream.route(GRADE_PATH, paged_grades(30))
+
+    async def collect():
+        async with AsyncClient(base_url=upstream.base_url) as stu:
+            return [g["course_id"] async for g in stu.iter_grade(2024, page_size=7)]
+
+    assert asyncio.run(collect()) == [f"C{n}" for n in range(30)]
+
+    upstream.route(GRADE_PATH, "<h5>用户登录</h5>", content_type="text/html;charset=utf-8")
+    with pytest.raises(ApiError) as error:
+        list(Client(base_url=upstream.base_url).iter_grade(2024))
+    assert error.value.code == 1006
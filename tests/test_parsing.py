@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import pytest
+
+from zfn_api import Client
+from zfn_api.parsing import PARSERS
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def page(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+CASES = [
+    ("login_page", "login.html"),
+    ("login_page", "login_kaptcha.html"),
+    ("login_tips", "login.html"),
+    ("login_tips", "login_tips.html"),
+    ("hidden_inputs", "block_head.html"),
+    ("hidden_inputs", "block_display.html"),
+    ("block_head", "block_head.html"),
+    ("block_head", "login.html"),
+    ("info_fields", "info.html"),
+    ("detail_fields", "info_details.html"),
+    ("detail_fields", "info_details_denied.html"),
+    ("course_category", "course_category.html"),
+    ("course_category", "login.html"),
+]
+
+
+@pytest.mark.parametrize("method, fixture", CASES)
+def test_lxml_parser_matches_pyquery(method, fixture):
+    html = page(fixture)
+    expected = getattr(PARSERS["pyquery"], method)(html)
+    assert getattr(PARSERS["lxml"], method)(html) == expected
+
+
+def test_parser_fields():
+    lxml = PARSERS["lxml"]
+    token, kaptcha = lxml.login_page(page("login_kaptcha.html"))
+    assert token.startswith("c2e3f1a0") and kaptcha
+    assert lxml.login_page(page("login.html"))[1] is False
+    assert lxml.login_tips(page("login.html")) is None
+    assert lxml.login_tips(page("login_tips.html")) == "用户名或密码不正确，请重新输入！"
+    hidden = lxml.hidden_inputs(page("block_head.html"))
+    assert hidden["xsbj"] == "4294967296" and hidden["iskxk"] == "None"
+    nodata, credits, tabs, head_hidden = lxml.block_head(page("block_head.html"))
+    assert nodata is None and credits[2] == "12.5"
+    assert tabs[0] == "queryCourse(this,'11','ABC1DEF','2024','3')"
+    assert head_hidden == hidden
+    nodata_page = "<div class='nodata'><span>对不起，当前不属于选课阶段</span></div>"
+    assert lxml.block_head(nodata_page)[0] == PARSERS["pyquery"].block_head(nodata_page)[0]
+    assert lxml.block_head(nodata_page)[0] == "对不起，当前不属于选课阶段"
+    info = lxml.info_fields(page("info.html"))
+    assert info["学号："] == "2101010101"
+    assert info["家庭地址："] == "北京市 东城区 某某街道 1号"
+    assert info["曾用名："] == ""
+    assert lxml.detail_fields(page("info_details_denied.html")) == ("无功能权限，", {})
+    assert lxml.course_category(page("course_category.html")) == "通识教育选修课"
+
+
+@pytest.mark.parametrize("parser", ["pyquery", "lxml"])
+def test_get_info_page_with_each_parser(upstream, parser):
+    upstream.route(
+        "xsxxxggl/xsgrxxwh_cxXsgrxx.html",
+        page("info.html"),
+        content_type="text/html;charset=utf-8",
+    )
+    client = Client(base_url=upstream.base_url, parser=parser)
+    assert client.parser.name == parser
+    result = client._get_info()
+    assert result["code"] == 1000
+    assert result["data"]["class_name"] == "软件2101"
+    assert result["data"]["email"] == "zhangsan@example.com"
+
+
+def test_unknown_parser():
+    with pytest.raises(ValueError):
+        Client(parser="bs4")
@@ -0,0 +1,86 @@
+import asyncio
+import io
+
+import pytest
+
+from zfn_api import ApiError, AsyncClient, Client
+
+POLICY_PATH = "kbdy/bjkbdy_cxXnxqsfkz.html"
+PDF_PATH = "kbcx/xskbcx_cxXsShcPdf.html"
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 1024
+
+
+def serve_pdf(upstream, body=PDF, content_type="application/pdf"):
+    upstream.route(POLICY_PATH, "1")
+    upstream.route(PDF_PATH, body, content_type=content_type)
+
+
+def test_schedule_pdf_streams_to_file(upstream, tmp_path):
+    serve_pdf(upstream)
+    client = Client(base_url=upstream.base_url)
+    assert client.get_schedule_pdf(2024, 1)["data"] == PDF
+
+    path = tmp_path / "schedule.pdf"
+    result = client.get_schedule_pdf(2024, 1, file=path, chunk_size=4096)
+    assert result["code"] == 1000
+    assert result["data"]["file"] == str(path)
+    assert result["data"]["bytes"] == len(PDF)
+    assert path.read_bytes() == PDF
+
+    buffer = io.BytesIO()
+    result = client.get_schedule_pdf(2024, 1, file=buffer)
+    assert result["data"]["file"] is None
+    assert buffer.getvalue() == PDF
+
+    chunks = list(client.iter_schedule_pdf(2024, 1, chunk_size=4096))
+    assert len(chunks) > 1
+    assert b"".join(chunks) == PDF
+
+
+def test_schedule_pdf_error_page_is_not_written(upstream, tmp_path):
+    page = "<title>错误提示</title><p class='error_title'>无权访问</p>"
+    serve_pdf(upstream, page, "text/html;charset=utf-8")
+    path = tmp_path / "schedule.pdf"
+    result = Client(base_url=upstream.base_url).get_schedule_pdf(2024, 1, file=path)
+    assert result == {"code": 998, "msg": "无权访问"}
+    assert not path.exists()
+
+
+def test_schedule_pdf_login_page_is_not_success(upstream, tmp_path):
+    page = "<html><head><title>用户登录</title></head><body>请先登录</body></html>"
+    serve_pdf(upstream, page, "text/html;charset=utf-8")
+    client = Client(base_url=upstream.base_url)
+    path = tmp_path / "schedule.pdf"
+    result = client.get_schedule_pdf(2024, 1, file=path)
+    assert result["code"] == 1006
+    assert not path.exists()
+    with pytest.raises(ApiError) as error:
+        list(client.iter_schedule_pdf(2024, 1))
+    assert error.value.result["code"] == 1006
+
+
+def test_schedule_pdf_json_body_is_not_success(upstream, tmp_path):
+    serve_pdf(upstream, '{"flag": "0", "msg": "无数据"}', "application/json;charset=utf-8")
+    client = Client(base_url=upstream.base_url)
+    path = tmp_path / "schedule.pdf"
+    result = client.get_schedule_pdf(2024, 1, file=path)
+    assert result["code"] == 2333
+    assert not path.exists()
+    with pytest.raises(ApiError):
+        list(client.iter_schedule_pdf(2024, 1))
+
+
+def test_async_schedule_pdf_streams(upstream, tmp_path):
+    serve_pdf(upstream)
+    path = tmp_path / "schedule.pdf"
+
+    async def download():
+        async with AsyncClient(base_url=upstream.base_url) as stu:
+            result = await stu.get_schedule_pdf(2024, 1, file=path)
+            chunks = [chunk async for chunk in stu.iter_schedule_pdf(2024, 1)]
+            return result, b"".join(chunks)
+
+    result, body = asyncio.run(download())
+    assert result["data"]["bytes"] == len(PDF)
+    assert path.read_bytes() == PDF
+    assert body == PDF
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+from zfn_api import AsyncClient, CircuitBreaker, Client, RetryPolicy
+
+GRADE_PATH = "cjcx/cjcx_cxXsgrcj.html"
+GRADES = {"items": [{"xh": "2101", "xm": "张三", "kch_id": "A1", "kcmc": "高数", "xf": "4", "cj": "95", "jd": "4.5"}]}
+
+
+def flaky(failures):
+    """前 failures 次返回无法解析的页面（2333），之后返回成绩"""
+    calls = []
+
+    def body(form):
+        calls.append(form)
+        return "upstream error" if len(calls) <= failures else GRADES
+
+    return body
+
+
+def test_retry_policy_retries_reads_only(upstream):
+    upstream.route(GRADE_PATH, flaky(2))
+    stu = Client(base_url=upstream.base_url, retry=RetryPolicy(attempts=3, backoff=0.01))
+    assert stu.get_grade(2024, 1)["code"] == 1000
+    assert upstream.hits.count(GRADE_PATH) == 3
+
+    upstream.route(GRADE_PATH, flaky(5))
+    assert stu.get_grade(2024, 1)["code"] == 2333
+    assert upstream.hits.count(GRADE_PATH) == 6
+
+    select_path = "xsxk/zzxkyzb_xkBcZyZzxkYzb.html"
+    upstream.route(select_path, "upstream error")
+    assert stu.select_course("2101010101", "A1", "D1", "01", 2024, 1)["code"] == 2333
+    assert upstream.hits.count(select_path) == 1
+
+
+def test_retry_delays_are_jittered_and_capped():
+    policy = RetryPolicy(attempts=5, backoff=1.0, max_backoff=3.0)
+    delays = list(policy.delays("get_grade"))
+    assert delays[0] == 0.0 and len(delays) == 5
+    assert all(0 <= d <= cap for d, cap in zip(delays[1:], (1.0, 2.0, 3.0, 3.0)))
+    assert list(policy.delays("select_course")) == [0.0]
+
+
+def test_circuit_breaker_opens_and_recovers(upstream):
+    upstream.route(GRADE_PATH, "upstream error")
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=2, reset_timeout=0.2)
+    stu = Client(base_url=upstream.base_url, circuit_breaker=breaker)
+    other = Client(base_url=upstream.base_url, circuit_breaker=breaker)
+    assert stu.get_grade(2024, 1)["code"] == 2333
+    assert other.get_grade(2024, 1)["code"] == 2333
+    assert breaker.state == "open"
+    hits = len(upstream.hits)
+    rejected = stu.get_grade(2024, 1)
+    assert rejected["code"] == 2333 and "暂停" in rejected["msg"]
+    assert len(upstream.hits) == hits
+
+    time.sleep(0.25)
+    assert stu.get_grade(2024, 1)["code"] == 2333
+    assert breaker.state == "open"
+
+    time.sleep(0.25)
+    upstream.route(GRADE_PATH, GRADES)
+    assert breaker.allow() and not breaker.allow()
+    breaker.record({"code": 1000})
+    assert breaker.state == "closed"
+    assert other.get_grade(2024, 1)["code"] == 1000
+
+
+def test_shared_breaker_per_base_url_and_async_retry(upstream):
+    a = Client(base_url=upstream.base_url, circuit_breaker=True)
+    b = Client(base_url=upstream.base_url, circuit_breaker=True)
+    assert a.circuit_breaker is b.circuit_breaker
+    assert Client(base_url="http://other.example/", circuit_breaker=True).circuit_breaker is not a.circuit_breaker
+    assert Client(base_url=upstream.base_url).circuit_breaker is None
+
+    upstream.route(GRADE_PATH, flaky(1))
+
+    async def fetch():
+        async with AsyncClient(base_url=upstream.base_url, retry=RetryPolicy(backoff=0.01)) as stu:
+            return await stu.get_grade(2024, 1)
+
+    assert asyncio.run(fetch())["code"] == 1000
+    assert upstream.hits.count(GRADE_PATH) == 2
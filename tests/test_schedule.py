@@ -0,0 +1,146 @@
+import copy
+import random
+import re
+
+import pytest
+
+from zfn_api import Client
+
+
+def legacy_split_merge_display(cls, schedule):
+    """split_merge_display as originally written, kept as the reference."""
+    repetIndex = []
+    count = 0
+    for items in schedule["courses"]:
+        for index in range(len(schedule["courses"])):
+            if (schedule["courses"]).index(items) == count:
+                continue
+            elif (
+                items["course_id"] == schedule["courses"][index]["course_id"]
+                and items["weekday"] == schedule["courses"][index]["weekday"]
+                and items["weeks"] == schedule["courses"][index]["weeks"]
+            ):
+                repetIndex.append(index)
+        count += 1
+    if len(repetIndex) % 2 != 0:
+        return schedule
+    for r in range(0, len(repetIndex), 2):
+        fir = repetIndex[r]
+        sec = repetIndex[r + 1]
+        if len(re.findall(r"(\d+)", schedule["courses"][fir]["sessions"])) == 4:
+            numbers = re.findall(r"(\d+)", schedule["courses"][fir]["sessions"])
+            schedule["courses"][fir]["sessions"] = numbers[0] + "-" + numbers[1] + "节"
+            schedule["courses"][fir]["list_sessions"] = cls.list_sessions(
+                schedule["courses"][fir]["sessions"]
+            )
+            schedule["courses"][fir]["time"] = cls.display_course_time(
+                schedule["courses"][fir]["sessions"]
+            )
+            numbers = re.findall(r"(\d+)", schedule["courses"][sec]["sessions"])
+            schedule["courses"][sec]["sessions"] = numbers[2] + "-" + numbers[3] + "节"
+            schedule["courses"][sec]["list_sessions"] = cls.list_sessions(
+                schedule["courses"][sec]["sessions"]
+            )
+            schedule["courses"][sec]["time"] = cls.display_course_time(
+                schedule["courses"][sec]["sessions"]
+            )
+    return schedule
+
+
+def random_schedule(rng, size):
+    courses = []
+    for _ in range(size):
+        if courses and rng.random() < 0.2:
+            courses.append(copy.deepcopy(rng.choice(courses)))
+            continue
+        courses.append(
+            {
+                "course_id": rng.choice("ABC"),
+                "weekday": rng.randint(1, 2),
+                "weeks": rng.choice(["1-16周", "1-8周"]),
+                "sessions": rng.choice(["1-2节", "3-4节", "1-2,3-4节", "5-6,7-8节"]),
+                "place": rng.choice(["A101", "B202"]),
+            }
+        )
+    return {"courses": courses}
+
+
+def run(split, cls, schedule):
+    try:
+        return split(cls, schedule)
+    except Exception as e:
+        return type(e)
+
+
+def test_split_merge_display_matches_original():
+    cls = Client()
+    rng = random.Random(7)
+    for case in range(2000):
+        schedule = random_schedule(rng, rng.randint(0, 12))
+        expected = run(legacy_split_merge_display, type(cls), copy.deepcopy(schedule))
+        actual = run(lambda c, s: c.split_merge_display(s), type(cls), schedule)
+        assert actual == expected, case
+
+
+def test_split_merge_display_splits_duplicated_course():
+    Client()
+    course = {"course_id": "A", "weekday": 1, "weeks": "1-16周", "sessions": "1-2,3-4节"}
+    schedule = {"courses": [dict(course), dict(course)]}
+    result = Client.split_merge_display(schedule)["courses"]
+    assert [c["sessions"] for c in result] == ["1-2节", "3-4节"]
+    assert result[1]["list_sessions"] == [3, 4]
+    with pytest.raises(IndexError):
+        short = dict(course, sessions="1-2节")
+        Client.split_merge_display({"courses": [short, dict(course), dict(course), dict(short)]})
+
+
+def legacy_list_weeks(weeks):
+    args = re.findall(r"[^,]+", weeks)
+    week_list = []
+    for item in args:
+        pair = re.findall(r"(\d+)", item)
+        if "-" in item:
+            if len(pair) != 2:
+                continue
+            weeks_range = range(int(pair[0]), int(pair[1]) + 1)
+            if "单" in item:
+                week_list += [i for i in weeks_range if i % 2 == 1]
+            elif "双" in item:
+                week_list += [i for i in weeks_range if i % 2 == 0]
+            else:
+                week_list += list(weeks_range)
+        elif len(pair) == 1:
+            week_list.append(int(pair[0]))
+    return week_list
+
+
+@pytest.mark.parametrize(
+    "weeks",
+    ["1-16周", "1-15周(单)", "2-16周(双)", "1-4周,6周,9-12周", "9-16周,1-8周", "3周", ",,5周,", "1-2-3周"],
+)
+def test_list_weeks_and_week_mask(weeks):
+    assert Client.list_weeks(weeks) == legacy_list_weeks(weeks)
+    assert Client.list_weeks(weeks) is not Client.list_weeks(weeks)
+    assert Client.mask_to_list(Client.week_mask(weeks)) == sorted(set(legacy_list_weeks(weeks)))
+
+
+def test_courses_conflict_and_schedule_masks(upstream):
+    assert Client.week_mask("1-5周(单)") == 0b101010
+    assert Client.session_mask("3-4节") == 0b11000
+    assert Client.week_mask(None) == 0 and Client.mask_to_list(0) == []
+    a = {"weekday": 1, "weeks": "1-8周", "sessions": "1-2节"}
+    assert Client.courses_conflict(a, {"weekday": 1, "weeks": "8-16周", "sessions": "2-3节"})
+    assert not Client.courses_conflict(a, {"weekday": 1, "weeks": "9-16周", "sessions": "1-2节"})
+    assert not Client.courses_conflict(a, {"weekday": 2, "weeks": "1-8周", "sessions": "1-2节"})
+
+    upstream.route(
+        "kbcx/xskbcx_cxXsKb.html",
+        {
+            "xsxx": {"XH": "2101", "XM": "张三"},
+            "kbList": [{"kch_id": "A", "xqj": "1", "jc": "3-4节", "zcd": "2-16周(双)"}],
+            "sjkList": [],
+        },
+    )
+    course = Client(base_url=upstream.base_url).get_schedule(2024, 1, bitmask=True)["data"]["courses"][0]
+    assert Client.mask_to_list(course["week_mask"]) == course["list_weeks"]
+    assert Client.mask_to_list(course["session_mask"]) == course["list_sessions"] == [3, 4]
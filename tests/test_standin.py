@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from zfn_api import Client
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+from standin import StandInServer  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def standin():
+    with StandInServer(key_bits=512) as server:
+        yield server
+
+
+def test_standin_login_session_lifecycle(standin):
+    client = Client(base_url=standin.base_url)
+    assert Client(base_url=standin.base_url).login("2101", "wrong")["code"] == 1002
+    assert client.login("2101010101", "123456")["code"] == 1000
+    assert set(client.cookies) == {"JSESSIONID", "route"}
+    grade = client.get_grade(2023, 1)
+    assert grade["code"] == 1000 and grade["data"]["sid"] == "2101010101"
+    assert len(list(client.iter_grade(2023, 1, page_size=15))) == 40
+
+    other_node = Client(base_url=standin.base_url, cookies={**client.cookies, "route": "x"})
+    assert other_node.get_schedule(2024, 1)["code"] == 1006
+    standin.expire("2101010101")
+    assert client.get_schedule(2024, 1)["code"] == 1006
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda c: c.get_schedule(2024, 1),
+        lambda c: c.get_academia(),
+        lambda c: c.get_block_courses(2024, 1, 1),
+        lambda c: c._get_info(),
+        lambda c: c.get_notifications(),
+        lambda c: c.get_selected_courses(2024, 1),
+    ],
+)
+def test_standin_endpoints(standin, call):
+    client = Client(base_url=standin.base_url)
+    client.login("2101010102", "123456")
+    assert call(client)["code"] == 1000
+
+
+def test_standin_fault_injection(standin):
+    client = Client(base_url=standin.base_url, timeout=0.5)
+    client.login("2101010103", "123456")
+    standin.error_rate = 1.0
+    try:
+        assert client.get_grade(2023, 1)["code"] == 2333
+    finally:
+        standin.error_rate = 0.0
+    standin.timeout_rate, standin.hang = 1.0, 1.0
+    try:
+        assert client.get_grade(2023, 1)["code"] == 1003
+    finally:
+        standin.timeout_rate = 0.0
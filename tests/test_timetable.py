@@ -0,0 +1,70 @@
+import datetime
+import json
+from pathlib import Path
+
+from zfn_api import Client, Timetable
+from zfn_api.constants import RASPIANIE
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+SCHEDULE = {
+    "code": 1000,
+    "data": {
+        "courses": [
+            {"title": "高数", "weekday": 1, "sessions": "1-2节", "weeks": "1-16周"},
+            {"title": "英语", "weekday": 1, "sessions": "3-4节", "weeks": "1-15周(单)"},
+            {"title": "体育", "weekday": 3, "sessions": "6-7节", "weeks": "2-8周"},
+            {"title": "网课", "weekday": 5, "sessions": None, "weeks": "1-16周"},
+        ]
+    },
+}
+
+
+def test_timetable_lookups():
+    # 2024-09-04 is a Wednesday: the term starts on Monday 2024-09-02
+    timetable = Timetable(SCHEDULE, term_start=datetime.date(2024, 9, 4), raspisanie=RASPIANIE)
+    assert timetable.term_start == datetime.date(2024, 9, 2)
+    assert timetable.week_of(datetime.date(2024, 9, 9)) == 2
+
+    monday = datetime.datetime(2024, 9, 2, 8, 30)
+    assert [o.course["title"] for o in timetable.current(monday)] == ["高数"]
+    upcoming = timetable.next(monday)
+    assert upcoming.course["title"] == "英语"
+    assert upcoming.start == datetime.datetime(2024, 9, 2, 9, 30)
+    assert upcoming.end == datetime.datetime(2024, 9, 2, 11, 10)
+    assert timetable.current(datetime.datetime(2024, 9, 2, 12, 0)) == []
+
+    # week 2: no English on Monday, PE on Wednesday afternoon
+    week2 = timetable.on(datetime.date(2024, 9, 9))
+    assert [o.course["title"] for o in week2] == ["高数"]
+    assert timetable.next(datetime.datetime(2024, 9, 9, 10, 0)).course["title"] == "体育"
+    assert timetable.free_sessions(datetime.date(2024, 9, 11)) == [1, 2, 3, 4, 5, 8, 9, 10, 11, 12, 13]
+    assert not timetable.is_free(datetime.date(2024, 9, 2), 4)
+    assert timetable.is_free(datetime.date(2024, 9, 9), 4)
+    assert [c["title"] for c in timetable.courses_at(3, 1, 3)] == ["英语"]
+
+    first_week = list(timetable.between(datetime.date(2024, 9, 2), datetime.date(2024, 9, 9)))
+    assert [o.course["title"] for o in first_week] == ["高数", "英语"]
+    assert len(list(timetable.between(datetime.date(2024, 9, 2), datetime.date(2025, 1, 1)))) == 16 + 8 + 7
+    assert timetable.next(datetime.datetime(2025, 1, 1)) is None
+
+
+def test_timetable_slots_match_course_time(upstream):
+    upstream.route(
+        "kbcx/xskbcx_cxXsKb.html", json.loads((FIXTURES / "schedule.json").read_text(encoding="utf-8"))
+    )
+    shifted = [[f"{int(start[:-3]) + 1}{start[-3:]}", f"{int(end[:-3]) + 1}{end[-3:]}"] for start, end in RASPIANIE]
+    for raspisanie, first in ((RASPIANIE, "8:00~9:25"), (shifted, "9:00~10:25")):
+        client = Client(base_url=upstream.base_url, raspisanie=raspisanie)
+        schedule = client.get_schedule(2024, 1)
+        courses = schedule["data"]["courses"]
+        assert next(c for c in courses if c["sessions"] == "1-2节")["time"] == first
+
+        timetable = client.timetable(schedule, term_start=datetime.date(2024, 9, 2))
+        assert timetable.occurrences
+        for occurrence in timetable.occurrences:
+            start, end = (
+                datetime.datetime.strptime(value, "%H:%M").time()
+                for value in occurrence.course["time"].split("~")
+            )
+            assert (start, end) == (occurrence.start.time(), occurrence.end.time())
@@ -0,0 +1,148 @@
+import bisect
+import datetime
+
+from .schedule import ScheduleMixin
+
+
+class Occurrence:
+    """One meeting of a course on a concrete date."""
+
+    __slots__ = ("week", "weekday", "sessions", "start", "end", "course")
+
+    def __init__(self, week, weekday, sessions, start, end, course):
+        self.week = week
+        self.weekday = weekday
+        self.sessions = sessions
+        self.start = start
+        self.end = end
+        self.course = course
+
+    @property
+    def date(self):
+        return self.start.date()
+
+    def __repr__(self):
+        return f"<Occurrence {self.course.get('title')} {self.start:%Y-%m-%d %H:%M}~{self.end:%H:%M}>"
+
+
+class Timetable:
+    """Index over a ``get_schedule`` result for "now / next / on date" queries.
+
+    The courses are expanded once into a week × weekday × session grid and a
+    time-sorted list of occurrences, so later lookups are dictionary hits or
+    binary searches instead of scans over ``courses``::
+
+        timetable = stu.timetable(stu.get_schedule(2024, 1), term_start=datetime.date(2024, 9, 2))
+        timetable.current(datetime.datetime.now())
+        timetable.next(datetime.datetime.now())
+
+    :param schedule: ``get_schedule`` result or its ``data``
+    :param term_start: any date in the first teaching week
+    :param raspisanie: ``[start, end]`` of each session, session 1 first;
+        required so that it is always the table the course ``time`` strings
+        were built from (``client.timetable`` passes the client's own)
+    """
+
+    def __init__(self, schedule, term_start, raspisanie):
+        if "courses" not in schedule:
+            schedule = schedule.get("data") or {}
+        if isinstance(term_start, datetime.datetime):
+            term_start = term_start.date()
+        self.term_start = term_start - datetime.timedelta(days=term_start.weekday())
+        self.raspisanie = [
+            (self._parse_time(start), self._parse_time(end))
+            for start, end in raspisanie
+        ]
+        self.slots = {}
+        self.busy = {}
+        self.weeks = 0
+        occurrences = []
+        for course in schedule.get("courses") or []:
+            weekday = course.get("weekday")
+            weeks = ScheduleMixin.list_weeks(course.get("weeks"))
+            sessions = ScheduleMixin.list_sessions(course.get("sessions"))
+            if not weekday or not weeks or not sessions:
+                continue
+            session_mask = ScheduleMixin.session_mask(course.get("sessions"))
+            timed = 1 <= sessions[0] and sessions[-1] <= len(self.raspisanie)
+            for week in weeks:
+                self.weeks = max(self.weeks, week)
+                self.busy[(week, weekday)] = self.busy.get((week, weekday), 0) | session_mask
+                for session in sessions:
+                    self.slots.setdefault((week, weekday, session), []).append(course)
+                if timed:
+                    day = self.date_of(week, weekday)
+                    occurrences.append(
+                        Occurrence(
+                            week,
+                            weekday,
+                            sessions,
+                            datetime.datetime.combine(day, self.raspisanie[sessions[0] - 1][0]),
+                            datetime.datetime.combine(day, self.raspisanie[sessions[-1] - 1][1]),
+                            course,
+                        )
+                    )
+        occurrences.sort(key=lambda o: (o.start, o.end))
+        self.occurrences = occurrences
+        self._starts = [o.start for o in occurrences]
+        self._longest = max((o.end - o.start for o in occurrences), default=datetime.timedelta(0))
+
+    @staticmethod
+    def _parse_time(value):
+        hour, minute = value.split(":")
+        return datetime.time(int(hour), int(minute))
+
+    def week_of(self, day):
+        """某日期所在的教学周（第一周为 1，开学前为 0 或负数）"""
+        if isinstance(day, datetime.datetime):
+            day = day.date()
+        return (day - self.term_start).days // 7 + 1
+
+    def date_of(self, week, weekday):
+        """第 week 周星期 weekday 的日期"""
+        return self.term_start + datetime.timedelta(weeks=week - 1, days=weekday - 1)
+
+    def courses_at(self, week, weekday, session):
+        """某周某天某节的课程"""
+        return list(self.slots.get((week, weekday, session), ()))
+
+    def is_free(self, day, session):
+        """某日期的第 session 节是否没课"""
+        key = (self.week_of(day), day.isoweekday())
+        return not self.busy.get(key, 0) >> session & 1
+
+    def free_sessions(self, day):
+        """某日期没课的节次"""
+        busy = self.busy.get((self.week_of(day), day.isoweekday()), 0)
+        return [n for n in range(1, len(self.raspisanie) + 1) if not busy >> n & 1]
+
+    def current(self, when):
+        """正在上的课（按开始时间排序）"""
+        first = bisect.bisect_left(self._starts, when - self._longest)
+        last = bisect.bisect_right(self._starts, when)
+        return [o for o in self.occurrences[first:last] if o.end > when]
+
+    def next(self, when):
+        """when 之后最先开始的一节课，没有则为 None"""
+        index = bisect.bisect_right(self._starts, when)
+        return self.occurrences[index] if index < len(self.occurrences) else None
+
+    def between(self, start, end):
+        """逐个产出 [start, end) 内开始的课程；日期参数按当天零点计"""
+        start, end = self._as_datetime(start), self._as_datetime(end)
+        index = bisect.bisect_left(self._starts, start)
+        while index < len(self.occurrences) and self._starts[index] < end:
+            yield self.occurrences[index]
+            index += 1
+
+    def on(self, day):
+        """某日期的全部课程"""
+        if isinstance(day, datetime.datetime):
+            day = day.date()
+        return list(self.between(day, day + datetime.timedelta(days=1)))
+
+    @staticmethod
+    def _as_datetime(value):
+        if isinstance(value, datetime.datetime):
+            return value
+        return datetime.datetime.combine(value, datetime.time())
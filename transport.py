@@ -0,0 +1,113 @@
+import threading
+
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class SharedTransport:
+    """Size-bounded keep-alive connection pool shared by many clients.
+
+    Each :class:`Client` still owns its ``requests.Session`` and therefore its
+    own cookie jar; only the underlying urllib3 pools (one per host) are
+    shared through a common ``HTTPAdapter``. :class:`AsyncClient` instances
+    share one ``aiohttp.TCPConnector`` the same way::
+
+        transport = SharedTransport(max_connections=50)
+        students = [Client(base_url=base_url, transport=transport) for _ in sids]
+
+    :param max_hosts: number of per-host pools kept alive
+    :param max_connections: connections kept (sync) or allowed (async) per host
+    :param block: wait for a free connection instead of opening an extra,
+        non-pooled one when a host pool is exhausted; the wait is not bounded
+        by the request ``timeout``, so it is off by default
+    :param keepalive_timeout: idle seconds before the async connector drops a
+        connection (urllib3 keeps them until the server closes)
+    """
+
+    def __init__(self, max_hosts=10, max_connections=100, block=False, keepalive_timeout=30):
+        self.max_hosts = max_hosts
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.adapter = HTTPAdapter(
+            pool_connections=max_hosts,
+            pool_maxsize=max_connections,
+            pool_block=block,
+        )
+        self._connector = None
+        self._async_connections = 0
+        self._async_requests = 0
+        # 被淘汰或关闭的同步连接池的累计数，stats() 不因池被回收而丢失计数
+        self._retired_connections = 0
+        self._retired_requests = 0
+        self._lock = threading.Lock()
+        pools = self.adapter.poolmanager.pools
+        self._dispose = pools.dispose_func
+        pools.dispose_func = self._retire
+
+    def _retire(self, pool):
+        with self._lock:
+            self._retired_connections += pool.num_connections
+            self._retired_requests += pool.num_requests
+        if self._dispose is not None:
+            self._dispose(pool)
+
+    def mount(self, session):
+        """让 requests 会话使用共享连接池"""
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+        return session
+
+    def connector(self):
+        """返回共享的 aiohttp 连接器（需在事件循环内调用）"""
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.max_hosts * self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+        return self._connector
+
+    def trace_config(self):
+        """aiohttp trace hook counting newly opened connections and requests."""
+        config = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session, context, params):
+            with self._lock:
+                self._async_connections += 1
+
+        async def on_request(session, context, params):
+            # 与 urllib3 一致：重定向的每一跳都算一次请求
+            with self._lock:
+                self._async_requests += 1
+
+        config.on_connection_create_end.append(on_connection_create_end)
+        config.on_request_start.append(on_request)
+        config.on_request_redirect.append(on_request)
+        return config
+
+    def stats(self):
+        """新建连接数（即 TCP/TLS 握手次数）与请求数，同步与异步客户端合计"""
+        container = self.adapter.poolmanager.pools
+        pools = [p for p in map(container.get, container.keys()) if p is not None]
+        with self._lock:
+            return {
+                "connections": sum(p.num_connections for p in pools)
+                + self._retired_connections
+                + self._async_connections,
+                "requests": sum(p.num_requests for p in pools)
+                + self._retired_requests
+                + self._async_requests,
+            }
+
+    def close(self):
+        self.adapter.close()
+
+    async def aclose(self):
+        self.close()
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
@@ -1,7 +1,55 @@
 import base64
 import binascii
+import functools
+import json
+import os
+import re
+import time
+import traceback
 import unicodedata
 import rsa
+from pyquery import PyQuery as pq
+from requests import exceptions
+
+from .flow import Emit, Request
+
+# 响应体开头即可判定为 JSON（或 PDF）时无需再按 HTML 解析
+_NOT_HTML_START = re.compile(rb"\s*(?:[\[{\"]|null|true|false|-?\d|%PDF)")
+
+
+@functools.lru_cache(maxsize=64)
+def _public_key(n, e):
+    """由 base64 编码的模数与指数构造 RSA 公钥，同一公钥只解析一次"""
+    rsa_n = binascii.b2a_hex(binascii.a2b_base64(n))
+    rsa_e = binascii.b2a_hex(binascii.a2b_base64(e))
+    return rsa.PublicKey(int(rsa_n, 16), int(rsa_e, 16))
+
+
+class _FileSink:
+    """Writes downloaded chunks to a path (opened on the first chunk) or a file object."""
+
+    def __init__(self, file):
+        self.file = file
+        self.owned = isinstance(file, (str, os.PathLike))
+        self.fp = None if self.owned else file
+        self.bytes = 0
+
+    def __call__(self, chunk):
+        if self.fp is None:
+            self.fp = open(self.file, "wb")
+        self.fp.write(chunk)
+        self.bytes += len(chunk)
+
+    def close(self, keep=True):
+        if not self.owned:
+            return
+        if self.fp is None:
+            if keep:
+                open(self.file, "wb").close()
+            return
+        self.fp.close()
+        if not keep:
+            os.remove(self.file)
 
 
 class UtilsMixin:
@@ -11,13 +59,121 @@ class UtilsMixin:
     def encrypt_password(pwd, n, e):
         """Encode password using RSA and base64."""
         message = str(pwd).encode()
-        rsa_n = binascii.b2a_hex(binascii.a2b_base64(n))
-        rsa_e = binascii.b2a_hex(binascii.a2b_base64(e))
-        key = rsa.PublicKey(int(rsa_n, 16), int(rsa_e, 16))
+        key = _public_key(n, e)
         encropy_pwd = rsa.encrypt(message, key)
         result = binascii.b2a_base64(encropy_pwd)
         return result
 
+    @staticmethod
+    def is_html(response):
+        """粗判响应是否为 HTML 页面：只看 Content-Type 与开头几个字节"""
+        content_type = response.headers.get("Content-Type", "")
+        if "json" in content_type or "pdf" in content_type:
+            return False
+        return _NOT_HTML_START.match(response.content) is None
+
+    @classmethod
+    def is_session_expired(cls, response, doc=None):
+        """判断会话是否失效（被重定向到或直接返回了登录页）
+
+        JSON 响应只需嗅探开头字节即可排除，仅当响应确实是包含“用户登录”的
+        HTML 时才解析页面；已解析的页面可通过 ``doc`` 传入以免重复解析。
+        """
+        if response.history and "login_slogin" in response.url:
+            return True
+        if doc is None:
+            if not cls.is_html(response) or "用户登录" not in response.text:
+                return False
+            doc = pq(response.text)
+        return doc("h5").text() == "用户登录"
+
+    @classmethod
+    def _download_error(cls, response):
+        """流式下载时被整体缓冲的 HTML/JSON 响应（错误页、登录页等）对应的错误结果"""
+        doc = pq(response.text) if cls.is_html(response) else None
+        if cls.is_session_expired(response, doc) or (
+            doc is not None and "用户登录" in doc("title").text()
+        ):
+            return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
+        if response.status_code != 200:
+            return {"code": 2333, "msg": "教务系统挂了"}
+        if doc is not None:
+            error = doc("p.error_title").text() or doc("title").text()
+            if error:
+                return {"code": 998, "msg": error}
+        return {"code": 2333, "msg": "请重试，若多次失败可能是系统错误维护或需更新接口"}
+
+    def _iter_pages(self, url, data, page_size, concurrent_pages, parse_item, name):
+        """按 queryModel 分页查询，每收到一页就 ``Emit`` 解析后的记录
+
+        第一页返回后按服务器给出的 ``totalPage`` 继续翻页，
+        ``concurrent_pages`` 大于 1 时每次并发请求多页（仍按页序产出）。
+        """
+
+        def page_request(page):
+            page_data = {
+                **data,
+                "nd": int(time.time() * 1000),
+                "queryModel.showCount": str(page_size),
+                "queryModel.currentPage": str(page),
+            }
+            return Request(
+                "POST",
+                url,
+                headers=self.headers,
+                data=page_data,
+                cookies=self.cookies,
+                timeout=self.timeout,
+            )
+
+        try:
+            req_pages = [(yield page_request(1))]
+            total_page = None
+            next_page = 2
+            while req_pages:
+                for req_page in req_pages:
+                    if req_page.status_code != 200:
+                        return {"code": 2333, "msg": "教务系统挂了"}
+                    if self.is_session_expired(req_page):
+                        return {"code": 1006, "msg": "未登录或已过期，请重新登录"}
+                    page = req_page.json()
+                    if total_page is None:
+                        total_page = int(page.get("totalPage") or 1)
+                    yield Emit([parse_item(i) for i in page.get("items") or []])
+                pages = range(next_page, min(next_page + max(1, concurrent_pages), total_page + 1))
+                next_page = pages.stop
+                req_pages = (yield [page_request(page) for page in pages]) if pages else []
+            return {"code": 1000, "msg": f"获取{name}成功"}
+        except exceptions.Timeout:
+            return {"code": 1003, "msg": f"获取{name}超时"}
+        except (
+            exceptions.RequestException,
+            json.decoder.JSONDecodeError,
+            AttributeError,
+        ):
+            traceback.print_exc()
+            return {"code": 2333, "msg": "请重试，若多次失败可能是系统错误维护或需更新接口"}
+        except Exception as e:
+            traceback.print_exc()
+            return {"code": 999, "msg": f"获取{name}时未记录的错误：{str(e)}"}
+
+    def _save_pdf(self, flow, file, chunk_size):
+        """把 flow 下载的 pdf 边下载边写入 file，结果中返回文件、字节数与耗时"""
+        sink = _FileSink(file)
+        start = time.perf_counter()
+        result = None
+        try:
+            result = yield from flow(sink, chunk_size)
+        finally:
+            sink.close(keep=result is not None and result["code"] == 1000)
+        if result["code"] == 1000:
+            result["data"] = {
+                "file": os.fspath(file) if sink.owned else None,
+                "bytes": sink.bytes,
+                "elapsed": round(time.perf_counter() - start, 3),
+            }
+        return result
+
     @staticmethod
     def parse_int(digits):
         if not digits: